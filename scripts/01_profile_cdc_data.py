@@ -4,20 +4,25 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(PROJECT_ROOT))
 
+import argparse
 import json
-from pathlib import Path
-
-import pandas as pd
 
-from src.data_cdc import CDCQuery, fetch_cdc_rows
+from src.cdc_cache import ResponseCache
 
 
 def main():
+    # The fetch path loads pandas; import it only once the stage runs.
+    from src.data_cdc import CDCQuery, fetch_cdc_rows
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--refresh", action="store_true", help="Bypass the local response cache.")
+    args = parser.parse_args()
+
     Path("reports").mkdir(parents=True, exist_ok=True)
     Path("data").mkdir(parents=True, exist_ok=True)
 
     q = CDCQuery(limit=4000)
-    df = fetch_cdc_rows(q)
+    df = fetch_cdc_rows(q, cache=ResponseCache(), refresh=args.refresh)
 
     print("\n=== STAGE 01: DATA PROFILE ===")
     print("Rows:", len(df))
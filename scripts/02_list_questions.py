@@ -4,14 +4,24 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(PROJECT_ROOT))
 
-from src.data_cdc import CDCQuery, fetch_cdc_rows
+import argparse
+
+from src.cdc_cache import ResponseCache
 
 
 def main():
-    q = CDCQuery(limit=70000)
-    df = fetch_cdc_rows(q)
+    # The fetch path loads pandas; import it only once the stage runs.
+    from src.data_cdc import CDCQuery, fetch_cdc_rows, value_counts_query
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--refresh", action="store_true", help="Bypass the local response cache.")
+    args = parser.parse_args()
+
+    # Counted server-side: one row per question instead of every survey row.
+    q = value_counts_query(CDCQuery(limit=30), "question")
+    df = fetch_cdc_rows(q, cache=ResponseCache(), refresh=args.refresh)
 
-    counts = df["question"].value_counts(dropna=True).head(30)
+    counts = df.set_index("question")["n"].astype(int)
 
     print("\n=== STAGE 02A: TOP QUESTIONS (by row count) ===")
     for question, n in counts.items():
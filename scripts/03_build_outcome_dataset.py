@@ -1,12 +1,16 @@
+import argparse
 import sys
 from pathlib import Path
 
-import pandas as pd
-
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(PROJECT_ROOT))
 
-from src.data_cdc import CDCQuery, fetch_cdc_rows
+from src.cdc_cache import ResponseCache
+from src.cdc_sync import RawStore, sync_cdc_rows
+from src.column_store import MODELING_STORE, source_fingerprint, write_store
+from src.data_cdc import CDCQuery, fetch_cdc_rows, select_columns
+from src.pivot import pivot_mean
+from src.schema import CDC_SCHEMA, MODELING_SCHEMA, SCHEMA_VERSION, apply_schema
 
 
 def _find_col(cols, required_substrings):
@@ -19,6 +23,15 @@ def _find_col(cols, required_substrings):
 
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--refresh", action="store_true", help="Bypass the local response cache.")
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Fetch only rows changed since the last sync into data/raw_store/ and build from there.",
+    )
+    args = parser.parse_args()
+
     Path("data").mkdir(exist_ok=True)
 
     where = (
@@ -33,10 +46,8 @@ def main():
         ")"
     )
 
-    q = CDCQuery(limit=100000, where=where)
-    df = fetch_cdc_rows(q)
-
-    df = df[
+    q = select_columns(
+        CDCQuery(limit=100000, where=where),
         [
             "yearstart",
             "locationabbr",
@@ -44,11 +55,25 @@ def main():
             "stratification1",
             "question",
             "data_value",
-        ]
-    ].copy()
-
-    df["data_value"] = pd.to_numeric(df["data_value"], errors="coerce")
-    df["yearstart"] = pd.to_numeric(df["yearstart"], errors="coerce")
+        ],
+    )
+    if args.sync:
+        store = RawStore("obesity_overweight")
+        result = sync_cdc_rows(q, store)
+        print(
+            f"Synced raw store: {result.fetched} fetched, {result.inserted} new, "
+            f"{result.updated} updated, {result.total} total"
+        )
+        df = store.load()
+        if df.empty:
+            raise SystemExit(
+                f"Raw store {store.rows_path} has no rows: the CDC query matched nothing. "
+                "Check the filter, or build without --sync."
+            )
+    else:
+        df = fetch_cdc_rows(
+            q, cache=ResponseCache(), refresh=args.refresh, schema=CDC_SCHEMA
+        )
 
     df = df.dropna(
         subset=[
@@ -60,9 +85,10 @@ def main():
             "question",
         ]
     )
-    df["yearstart"] = df["yearstart"].astype(int)
+    df["yearstart"] = df["yearstart"].astype("int16")
 
-    wide = df.pivot_table(
+    wide = pivot_mean(
+        df,
         index=[
             "yearstart",
             "locationabbr",
@@ -71,8 +97,7 @@ def main():
         ],
         columns="question",
         values="data_value",
-        aggfunc="mean",
-    ).reset_index()
+    )
 
     base_cols = {
         "yearstart",
@@ -108,9 +133,16 @@ def main():
 
     wide["obesity_high_risk"] = (wide["obesity_value"] >= obesity_median).astype(int)
     wide["overweight_high_risk"] = (wide["overweight_value"] >= overweight_median).astype(int)
+    wide = apply_schema(wide, MODELING_SCHEMA)
 
     out_path = Path("data") / "obesity_overweight_modeling.csv"
     wide.to_csv(out_path, index=False)
+    write_store(
+        wide,
+        MODELING_STORE,
+        source=source_fingerprint(out_path),
+        schema_version=SCHEMA_VERSION,
+    )
 
     print("\n=== STAGE 03: BUILD OUTCOME DATASET ===")
     print("Rows:", len(wide))
@@ -121,6 +153,7 @@ def main():
     print("Obesity high-risk rate:", round(wide["obesity_high_risk"].mean(), 3))
     print("Overweight high-risk rate:", round(wide["overweight_high_risk"].mean(), 3))
     print("Saved:", out_path)
+    print("Saved:", MODELING_STORE)
 
 
 if __name__ == "__main__":
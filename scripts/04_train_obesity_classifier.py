@@ -1,26 +1,35 @@
+import argparse
 import sys
 from pathlib import Path
 
-import joblib
-import matplotlib.pyplot as plt
-import pandas as pd
-from sklearn.compose import ColumnTransformer
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import (
-    accuracy_score,
-    confusion_matrix,
-    roc_auc_score,
-    roc_curve,
-)
-from sklearn.model_selection import train_test_split
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import OneHotEncoder
-
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(PROJECT_ROOT))
 
+from src.startup import lazy_import
+
+joblib = lazy_import("joblib")
+
+
+def train_for_label(df, label_col: str, model_out: str, tune: bool = False, solver: str = "lbfgs", figures: bool = True):
+    from sklearn.compose import ColumnTransformer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import (
+        accuracy_score,
+        confusion_matrix,
+        roc_auc_score,
+        roc_curve,
+    )
+    from sklearn.model_selection import train_test_split
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder
+
+    from src.bootstrap import bootstrap_ci
+    from src.design_matrix import load_design_matrix
+    from src.figures import confusion_figure, render_figures, roc_figure
+    from src.model_registry import dataset_fingerprint, preprocessor_params, register_model
+    from src.model_selection import select_C
+    from src.solvers import PICK_CACHE, pick_solver
 
-def train_for_label(df: pd.DataFrame, label_col: str, model_out: str):
     feature_cols = [
         "yearstart",
         "locationabbr",
@@ -54,58 +63,101 @@ def train_for_label(df: pd.DataFrame, label_col: str, model_out: str):
         ]
     )
 
-    pipe.fit(X_train, y_train)
-
-    probs = pipe.predict_proba(X_test)[:, 1]
+    pre.fit(X_train)
+    fingerprint = dataset_fingerprint()
+    design = load_design_matrix(preprocessor_params(pre), df, data_fingerprint=fingerprint)
+
+    if solver == "auto":
+        clf.set_params(solver=pick_solver(design.X[X_train.index], y_train, cache=PICK_CACHE))
+        print("Chosen solver:", clf.solver)
+    else:
+        clf.set_params(solver=solver)
+
+    metrics = {}
+    if tune:
+        selection = select_C(design.X[X_train.index], y_train, solver=clf.solver)
+        clf.set_params(C=selection.best_C)
+        metrics["cv_auroc"] = selection.cv_auroc
+        Path("reports/tables").mkdir(parents=True, exist_ok=True)
+        selection.path.to_csv(f"reports/tables/cv_path_{label_col}.csv", index=False)
+        print("\n=== C SELECTION (cross-validated AUROC) ===")
+        print(selection.summary().round(4).to_string(index=False))
+        print("Chosen C:", selection.best_C)
+
+    clf.fit(design.X[X_train.index], y_train)
+
+    probs = clf.predict_proba(design.X[X_test.index])[:, 1]
     preds = (probs >= 0.5).astype(int)
 
     auc = roc_auc_score(y_test, probs)
     acc = accuracy_score(y_test, preds)
+    ci = bootstrap_ci(y_test, probs)
+    for name, (low, high) in ci.items():
+        metrics[f"{name}_ci_low"] = low
+        metrics[f"{name}_ci_high"] = high
     cm = confusion_matrix(y_test, preds)
 
     Path("models").mkdir(exist_ok=True)
     Path("reports/figures").mkdir(parents=True, exist_ok=True)
 
-    joblib.dump(pipe, Path("models") / model_out)
+    model_path = Path("models") / model_out
+    joblib.dump(pipe, model_path)
+    register_model(
+        pipe,
+        label_col.split("_")[0],
+        "v1",
+        label_col,
+        pipeline_path=model_path,
+        metrics={"auroc": auc, "accuracy": acc, **metrics},
+        data_fingerprint=fingerprint,
+    )
 
     print(f"\n=== TRAIN RESULT: {label_col} ===")
     print("Test AUROC:", round(auc, 4))
     print("Test Accuracy:", round(acc, 4))
+    print("95% bootstrap CI: AUROC [{:.4f}, {:.4f}], Accuracy [{:.4f}, {:.4f}]".format(*ci["auroc"], *ci["accuracy"]))
     print("Confusion Matrix [ [TN FP] [FN TP] ]:")
     print(cm)
     print("Saved model:", f"models/{model_out}")
 
     # ROC curve
     fpr, tpr, _ = roc_curve(y_test, probs)
-    plt.figure()
-    plt.plot(fpr, tpr, label=f"AUROC = {auc:.3f}")
-    plt.plot([0, 1], [0, 1], linestyle="--")
-    plt.xlabel("False Positive Rate")
-    plt.ylabel("True Positive Rate")
-    plt.title(f"ROC Curve — {label_col}")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(f"reports/figures/roc_{label_col}.png")
-    plt.close()
-
-    # Confusion matrix plot
-    plt.figure()
-    plt.imshow(cm)
-    plt.title(f"Confusion Matrix — {label_col}")
-    plt.colorbar()
-    plt.xticks([0, 1], ["Pred 0", "Pred 1"])
-    plt.yticks([0, 1], ["True 0", "True 1"])
-    for i in range(2):
-        for j in range(2):
-            plt.text(j, i, cm[i, j], ha="center", va="center")
-    plt.tight_layout()
-    plt.savefig(f"reports/figures/cm_{label_col}.png")
-    plt.close()
+    render_figures(
+        [
+            roc_figure(
+                f"reports/figures/roc_{label_col}.png",
+                fpr,
+                tpr,
+                auc,
+                f"ROC Curve — {label_col}",
+            ),
+            confusion_figure(
+                f"reports/figures/cm_{label_col}.png",
+                cm,
+                f"Confusion Matrix — {label_col}",
+            ),
+        ],
+        enabled=figures,
+    )
 
 
 def main():
-    df = pd.read_csv("data/obesity_overweight_modeling.csv")
-    train_for_label(df, "obesity_high_risk", "logreg_obesity.joblib")
+    from src.column_store import read_modeling_dataset
+    from src.solvers import SOLVERS
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tune", action="store_true", help="Choose C by cross-validation instead of the default C=1.")
+    parser.add_argument(
+        "--solver",
+        choices=(*SOLVERS, "auto"),
+        default="lbfgs",
+        help="LogisticRegression solver; auto picks the fastest one that converges to the same coefficients.",
+    )
+    parser.add_argument("--no-figures", action="store_true", help="Skip the ROC and confusion-matrix figures.")
+    args = parser.parse_args()
+
+    df = read_modeling_dataset()
+    train_for_label(df, "obesity_high_risk", "logreg_obesity.joblib", tune=args.tune, solver=args.solver, figures=not args.no_figures)
 
 
 if __name__ == "__main__":
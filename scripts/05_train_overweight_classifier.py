@@ -1,27 +1,48 @@
+import argparse
 import sys
 from pathlib import Path
 
-import joblib
-import matplotlib.pyplot as plt
-import pandas as pd
-from sklearn.compose import ColumnTransformer
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import (
-    accuracy_score,
-    confusion_matrix,
-    roc_auc_score,
-    roc_curve,
-)
-from sklearn.model_selection import train_test_split
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import OneHotEncoder
-
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(PROJECT_ROOT))
 
+from src.startup import lazy_import
+
+joblib = lazy_import("joblib")
+
 
 def main():
-    df = pd.read_csv("data/obesity_overweight_modeling.csv")
+    from sklearn.compose import ColumnTransformer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import (
+        accuracy_score,
+        confusion_matrix,
+        roc_auc_score,
+        roc_curve,
+    )
+    from sklearn.model_selection import train_test_split
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder
+
+    from src.bootstrap import bootstrap_ci
+    from src.column_store import read_modeling_dataset
+    from src.design_matrix import load_design_matrix
+    from src.figures import confusion_figure, render_figures, roc_figure
+    from src.model_registry import dataset_fingerprint, preprocessor_params, register_model
+    from src.model_selection import select_C
+    from src.solvers import PICK_CACHE, SOLVERS, pick_solver
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tune", action="store_true", help="Choose C by cross-validation instead of the default C=1.")
+    parser.add_argument(
+        "--solver",
+        choices=(*SOLVERS, "auto"),
+        default="lbfgs",
+        help="LogisticRegression solver; auto picks the fastest one that converges to the same coefficients.",
+    )
+    parser.add_argument("--no-figures", action="store_true", help="Skip the ROC and confusion-matrix figures.")
+    args = parser.parse_args()
+
+    df = read_modeling_dataset()
 
     feature_cols = [
         "yearstart",
@@ -56,53 +77,82 @@ def main():
         ]
     )
 
-    pipe.fit(X_train, y_train)
-
-    probs = pipe.predict_proba(X_test)[:, 1]
+    pre.fit(X_train)
+    fingerprint = dataset_fingerprint()
+    design = load_design_matrix(preprocessor_params(pre), df, data_fingerprint=fingerprint)
+
+    if args.solver == "auto":
+        clf.set_params(solver=pick_solver(design.X[X_train.index], y_train, cache=PICK_CACHE))
+        print("Chosen solver:", clf.solver)
+    else:
+        clf.set_params(solver=args.solver)
+
+    metrics = {}
+    if args.tune:
+        selection = select_C(design.X[X_train.index], y_train, solver=clf.solver)
+        clf.set_params(C=selection.best_C)
+        metrics["cv_auroc"] = selection.cv_auroc
+        Path("reports/tables").mkdir(parents=True, exist_ok=True)
+        selection.path.to_csv("reports/tables/cv_path_overweight_high_risk.csv", index=False)
+        print("\n=== C SELECTION (cross-validated AUROC) ===")
+        print(selection.summary().round(4).to_string(index=False))
+        print("Chosen C:", selection.best_C)
+
+    clf.fit(design.X[X_train.index], y_train)
+
+    probs = clf.predict_proba(design.X[X_test.index])[:, 1]
     preds = (probs >= 0.5).astype(int)
 
     auc = roc_auc_score(y_test, probs)
     acc = accuracy_score(y_test, preds)
+    ci = bootstrap_ci(y_test, probs)
+    for name, (low, high) in ci.items():
+        metrics[f"{name}_ci_low"] = low
+        metrics[f"{name}_ci_high"] = high
     cm = confusion_matrix(y_test, preds)
 
     Path("models").mkdir(exist_ok=True)
     Path("reports/figures").mkdir(parents=True, exist_ok=True)
 
-    joblib.dump(pipe, Path("models") / "logreg_overweight.joblib")
+    model_path = Path("models") / "logreg_overweight.joblib"
+    joblib.dump(pipe, model_path)
+    register_model(
+        pipe,
+        "overweight",
+        "v1",
+        "overweight_high_risk",
+        pipeline_path=model_path,
+        metrics={"auroc": auc, "accuracy": acc, **metrics},
+        data_fingerprint=fingerprint,
+    )
 
     print("\n=== TRAIN RESULT: overweight_high_risk ===")
     print("Test AUROC:", round(auc, 4))
     print("Test Accuracy:", round(acc, 4))
+    print("95% bootstrap CI: AUROC [{:.4f}, {:.4f}], Accuracy [{:.4f}, {:.4f}]".format(*ci["auroc"], *ci["accuracy"]))
     print("Confusion Matrix [ [TN FP] [FN TP] ]:")
     print(cm)
     print("Saved model: models/logreg_overweight.joblib")
 
     # ROC curve
     fpr, tpr, _ = roc_curve(y_test, probs)
-    plt.figure()
-    plt.plot(fpr, tpr, label=f"AUROC = {auc:.3f}")
-    plt.plot([0, 1], [0, 1], linestyle="--")
-    plt.xlabel("False Positive Rate")
-    plt.ylabel("True Positive Rate")
-    plt.title("ROC Curve — overweight_high_risk")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig("reports/figures/roc_overweight_high_risk.png")
-    plt.close()
-
-    # Confusion matrix
-    plt.figure()
-    plt.imshow(cm)
-    plt.title("Confusion Matrix — overweight_high_risk")
-    plt.colorbar()
-    plt.xticks([0, 1], ["Pred 0", "Pred 1"])
-    plt.yticks([0, 1], ["True 0", "True 1"])
-    for i in range(2):
-        for j in range(2):
-            plt.text(j, i, cm[i, j], ha="center", va="center")
-    plt.tight_layout()
-    plt.savefig("reports/figures/cm_overweight_high_risk.png")
-    plt.close()
+    render_figures(
+        [
+            roc_figure(
+                "reports/figures/roc_overweight_high_risk.png",
+                fpr,
+                tpr,
+                auc,
+                "ROC Curve — overweight_high_risk",
+            ),
+            confusion_figure(
+                "reports/figures/cm_overweight_high_risk.png",
+                cm,
+                "Confusion Matrix — overweight_high_risk",
+            ),
+        ],
+        enabled=not args.no_figures,
+    )
 
 
 if __name__ == "__main__":
@@ -1,30 +1,27 @@
+import argparse
 import sys
 from pathlib import Path
 
-import joblib
-import matplotlib.pyplot as plt
 import pandas as pd
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(PROJECT_ROOT))
 
+from src.figures import barh_figure, render_figures
+from src.model_registry import resolve_model
+
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--no-figures", action="store_true", help="Only write the importance table.")
+    args = parser.parse_args()
+
     Path("reports/figures").mkdir(parents=True, exist_ok=True)
     Path("reports/tables").mkdir(parents=True, exist_ok=True)
 
-    pipe = joblib.load("models/logreg_obesity.joblib")
-
-    pre = pipe.named_steps["preprocess"]
-    model = pipe.named_steps["model"]
-
-    cat_encoder = pre.named_transformers_["cat"]
-    cat_features = cat_encoder.get_feature_names_out(
-        ["locationabbr", "stratificationcategory1", "stratification1"]
-    )
-
-    feature_names = list(cat_features) + ["yearstart"]
-    coefs = model.coef_[0]
+    model = resolve_model("obesity", "v1")
+    feature_names = model.feature_names
+    coefs = model.coef
 
     imp = (
         pd.DataFrame(
@@ -41,20 +38,25 @@ def main():
 
     top = imp.head(20)
 
-    plt.figure(figsize=(8, 6))
-    plt.barh(top["feature"], top["coefficient"])
-    plt.gca().invert_yaxis()
-    plt.xlabel("Logistic Regression Coefficient")
-    plt.title("Top Global Drivers — Obesity Risk")
-    plt.tight_layout()
-    plt.savefig("reports/figures/global_importance_obesity.png")
-    plt.close()
+    render_figures(
+        [
+            barh_figure(
+                "reports/figures/global_importance_obesity.png",
+                top["feature"],
+                top["coefficient"],
+                "Top Global Drivers — Obesity Risk",
+                "Logistic Regression Coefficient",
+            )
+        ],
+        enabled=not args.no_figures,
+    )
 
     print("\n=== GLOBAL EXPLAINABILITY: OBESITY ===")
     print(top.head(10).to_string(index=False))
     print("\nSaved:")
     print(" - reports/tables/obesity_global_importance.csv")
-    print(" - reports/figures/global_importance_obesity.png")
+    if not args.no_figures:
+        print(" - reports/figures/global_importance_obesity.png")
 
 
 if __name__ == "__main__":
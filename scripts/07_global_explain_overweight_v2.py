@@ -1,30 +1,29 @@
+import argparse
 import sys
 from pathlib import Path
 
-import joblib
-import matplotlib.pyplot as plt
 import pandas as pd
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(PROJECT_ROOT))
 
+from src.figures import barh_figure, render_figures
+from src.model_registry import resolve_model
+
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--version", default="v2", help="Registry version with v2 (scaled year) features, e.g. v2-sgd.")
+    parser.add_argument("--no-figures", action="store_true", help="Only write the importance table.")
+    args = parser.parse_args()
+    version = args.version
+
     Path("reports/figures").mkdir(parents=True, exist_ok=True)
     Path("reports/tables").mkdir(parents=True, exist_ok=True)
 
-    pipe = joblib.load("models/logreg_overweight_v2.joblib")
-
-    pre = pipe.named_steps["preprocess"]
-    model = pipe.named_steps["model"]
-
-    cat_encoder = pre.named_transformers_["cat"]
-    cat_features = cat_encoder.get_feature_names_out(
-        ["locationabbr", "stratificationcategory1", "stratification1"]
-    )
-
-    feature_names = list(cat_features) + ["yearstart_scaled"]
-    coefs = model.coef_[0]
+    model = resolve_model("overweight", version)
+    feature_names = model.feature_names
+    coefs = model.coef
 
     imp = (
         pd.DataFrame({"feature": feature_names, "coefficient": coefs})
@@ -32,24 +31,29 @@ def main():
         .sort_values("abs_coef", ascending=False)
     )
 
-    imp.to_csv("reports/tables/overweight_global_importance_v2.csv", index=False)
+    imp.to_csv(f"reports/tables/overweight_global_importance_{version}.csv", index=False)
 
     top = imp.head(20)
 
-    plt.figure(figsize=(8, 6))
-    plt.barh(top["feature"], top["coefficient"])
-    plt.gca().invert_yaxis()
-    plt.xlabel("Logistic Regression Coefficient")
-    plt.title("Top Global Drivers — Overweight Risk (v2: scaled year)")
-    plt.tight_layout()
-    plt.savefig("reports/figures/global_importance_overweight_v2.png")
-    plt.close()
+    render_figures(
+        [
+            barh_figure(
+                f"reports/figures/global_importance_overweight_{version}.png",
+                top["feature"],
+                top["coefficient"],
+                f"Top Global Drivers — Overweight Risk ({version}: scaled year)",
+                "Logistic Regression Coefficient",
+            )
+        ],
+        enabled=not args.no_figures,
+    )
 
-    print("\n=== GLOBAL EXPLAINABILITY (V2): OVERWEIGHT ===")
+    print(f"\n=== GLOBAL EXPLAINABILITY ({version.upper()}): OVERWEIGHT ===")
     print(top.head(10).to_string(index=False))
     print("\nSaved:")
-    print(" - reports/tables/overweight_global_importance_v2.csv")
-    print(" - reports/figures/global_importance_overweight_v2.png")
+    print(f" - reports/tables/overweight_global_importance_{version}.csv")
+    if not args.no_figures:
+        print(f" - reports/figures/global_importance_overweight_{version}.png")
 
 
 if __name__ == "__main__":
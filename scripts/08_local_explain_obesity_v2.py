@@ -1,9 +1,8 @@
+import argparse
 import sys
 from pathlib import Path
 
-import joblib
 import numpy as np
-import pandas as pd
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(PROJECT_ROOT))
@@ -14,34 +13,46 @@ def sigmoid(x):
 
 
 def main():
-    pipe = joblib.load("models/logreg_obesity_v2.joblib")
-    pre = pipe.named_steps["preprocess"]
-    model = pipe.named_steps["model"]
+    # These bring in pandas and scipy, which start-up does not need.
+    import pandas as pd
+
+    from src.column_store import sample_modeling_rows
+    from src.design_matrix import load_design_matrix
+    from src.model_registry import resolve_model
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--version", default="v2", help="Registry version with v2 (scaled year) features, e.g. v2-sgd.")
+    parser.add_argument("--all", action="store_true", help="Explain every row and write a top-k .npz instead of one example.")
+    parser.add_argument("--top-k", type=int, default=5, help="Contributions kept per row with --all.")
+    parser.add_argument(
+        "--subgroup",
+        action="append",
+        metavar="COLUMN=VALUE",
+        help="Explain this subgroup from the contribution lookup table (repeat for every feature column).",
+    )
+    args = parser.parse_args()
+    version = args.version
 
-    df = pd.read_csv("data/obesity_overweight_modeling.csv")
+    model = resolve_model("obesity", version)
+    if args.all:
+        from src.local_explain import write_model_explanations
 
-    example = df.sample(1, random_state=7)
+        write_model_explanations(model, "obesity", version, args.top_k)
+        return
+    if args.subgroup:
+        from src.contribution_table import print_subgroup_explanation
 
-    X = example[
-        [
-            "yearstart",
-            "locationabbr",
-            "stratificationcategory1",
-            "stratification1",
-        ]
-    ]
+        print_subgroup_explanation(model, args.subgroup, "obesity", version)
+        return
 
-    Xt = pre.transform(X)
+    example = sample_modeling_rows(1, random_state=7)
 
-    cat_encoder = pre.named_transformers_["cat"]
-    cat_features = cat_encoder.get_feature_names_out(
-        ["locationabbr", "stratificationcategory1", "stratification1"]
-    )
+    Xt = load_design_matrix(model.meta).X[example.index]
 
-    feature_names = list(cat_features) + ["yearstart_scaled"]
+    feature_names = model.feature_names
 
-    coefs = model.coef_[0]
-    intercept = model.intercept_[0]
+    coefs = model.coef
+    intercept = model.intercept
 
     vec = Xt.toarray()[0]
     contributions = vec * coefs
@@ -55,7 +66,7 @@ def main():
     log_odds = intercept + contributions.sum()
     prob = sigmoid(log_odds)
 
-    print("\n=== LOCAL EXPLANATION (V2): OBESITY ===")
+    print(f"\n=== LOCAL EXPLANATION ({version.upper()}): OBESITY ===")
     print("Example subgroup:")
     print(
         example[
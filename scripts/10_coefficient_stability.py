@@ -0,0 +1,52 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import time
+
+from src.column_store import read_modeling_dataset
+from src.model_registry import resolve_model
+
+
+def main():
+    from src.stability import DEFAULT_REPLICATES, TOP_K, model_stability
+
+    parser = argparse.ArgumentParser(description="Refit registered models on resamples and report coefficient/rank stability.")
+    parser.add_argument("--outcomes", default="obesity,overweight")
+    parser.add_argument("--version", default="v2")
+    parser.add_argument("--replicates", type=int, default=DEFAULT_REPLICATES)
+    parser.add_argument("--mode", choices=("bootstrap", "subsample"), default="bootstrap")
+    parser.add_argument("--fraction", type=float, default=0.5, help="Share of training rows per subsample.")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: all CPUs).")
+    args = parser.parse_args()
+
+    Path("reports/tables").mkdir(parents=True, exist_ok=True)
+    suffix = "" if args.version == "v1" else f"_{args.version}"
+    df = read_modeling_dataset()
+
+    for outcome in args.outcomes.split(","):
+        model = resolve_model(outcome, args.version)
+        start = time.perf_counter()
+        table, agreement = model_stability(
+            model, df, args.replicates, args.mode, args.fraction, args.jobs
+        )
+        seconds = time.perf_counter() - start
+        out = f"reports/tables/{outcome}_coef_stability{suffix}.csv"
+        table.to_csv(out, index=False)
+
+        print(f"\n=== COEFFICIENT STABILITY ({args.version.upper()}): {outcome.upper()} ===")
+        print(f"{args.replicates} {args.mode} refits in {seconds:.1f}s")
+        print(
+            f"Mean Spearman rank correlation with the fitted model: {agreement['spearman_mean']:.4f}; "
+            f"mean top-{TOP_K} overlap: {agreement[f'top{TOP_K}_overlap_mean']:.4f}"
+        )
+        cols = ["feature", "coefficient", "coef_ci_low", "coef_ci_high", "sign_stability", "rank", "rank_ci_low", "rank_ci_high"]
+        print(table[cols].head(10).round(4).to_string(index=False))
+        print("Saved:", out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.column_store import read_modeling_dataset
+from src.model_registry import CATEGORICAL, NUMERIC, resolve_model
+from src.scorer import DEFAULT_EXPORT_DIR
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    import numba
+
+    from src.bulk_scorer import BulkScorer, grid_codes
+
+    parser = argparse.ArgumentParser(description="Numba bulk scorer vs the sklearn pipeline on a what-if subgroup grid.")
+    parser.add_argument("--models", default="obesity/v2,overweight/v2")
+    parser.add_argument("--years", default="2011:2031:0.05", help="start:stop:step of the yearstart sweep.")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=None, help="Numba threads (default: all CPUs).")
+    parser.add_argument("--sklearn-rows", type=int, default=2_000_000, help="Grid rows to time the sklearn path on (it scales linearly).")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.threads:
+        numba.set_num_threads(args.threads)
+    start, stop, step = (float(x) for x in args.years.split(":"))
+    years = np.arange(start, stop, step)
+    df = read_modeling_dataset()
+
+    rows = []
+    for name in args.models.split(","):
+        outcome, version = name.split("/")
+        model = resolve_model(outcome, version)
+        artifact = DEFAULT_EXPORT_DIR / f"{outcome}_{version}.json"
+        if not artifact.exists():
+            from src.scorer import export_model
+
+            export_model(model, artifact)
+        bulk = BulkScorer.load(artifact)
+
+        # Every location x every (category, stratum) pair seen in the data x every year step.
+        locations = np.arange(len(bulk.scorer.categories["locationabbr"]))
+        pairs = np.unique(
+            np.column_stack([bulk.encode(c, df[c].tolist()) for c in CATEGORICAL[1:]]), axis=0
+        )
+        codes, numeric = grid_codes([locations, pairs], years)
+        n = len(codes)
+
+        start_jit = time.perf_counter()
+        bulk.score(codes[:1], numeric[:1], args.top_k)
+        first_call = time.perf_counter() - start_jit
+
+        out = bulk.allocate(n, args.top_k)
+        numba_s = best_of(lambda: bulk.score_into(codes, numeric, *out), args.repeat)
+
+        m = min(n, args.sklearn_rows)
+        frame = pd.DataFrame(
+            {col: np.asarray(bulk.scorer.categories[col], dtype=object)[codes[:m, j]] for j, col in enumerate(CATEGORICAL)}
+        )
+        for j, col in enumerate(NUMERIC):
+            frame[col] = numeric[:m, j]
+        pipe = model.pipeline()
+        expected = pipe.predict_proba(frame)[:, 1]
+        sklearn_s = best_of(lambda: pipe.predict_proba(frame), args.repeat) * n / m
+
+        rows.append(
+            {
+                "model": name,
+                "grid_rows": n,
+                "first_call_s": first_call,
+                "numba_s": numba_s,
+                "numba_Mrows_per_s": n / numba_s / 1e6,
+                "sklearn_s": sklearn_s,
+                "speedup": sklearn_s / numba_s,
+                "max_abs_diff": float(np.abs(out[0][:m] - expected).max()),
+            }
+        )
+        print(pd.DataFrame(rows[-1:]).round(4).to_string(index=False), flush=True)
+
+    print(f"\n=== BULK SCORER BENCHMARK ({numba.get_num_threads()} numba threads) ===")
+    print(pd.DataFrame(rows).round(4).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import subprocess
+import time
+import tracemalloc
+
+import pandas as pd
+
+from src.data_cdc import DEFAULT_MAX_WORKERS, DEFAULT_PAGE_SIZE, CDCQuery, CDCSession, fetch_cdc_rows
+from src.schema import CDC_SCHEMA
+
+
+def start_stub(rows: int, latency: float, jitter: float, error_rate: float):
+    # The stub runs in its own process so server-side work and memory
+    # don't show up in the client measurements.
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "src.socrata_stub",
+            "--rows",
+            str(rows),
+            "--latency",
+            str(latency),
+            "--jitter",
+            str(jitter),
+            "--error-rate",
+            str(error_rate),
+        ],
+        cwd=PROJECT_ROOT,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    base_url = proc.stdout.readline().strip()
+    if not base_url:
+        proc.kill()
+        raise SystemExit("Socrata stub failed to start")
+    return proc, base_url
+
+
+def run_once(base_url: str, rows: int, mode: str, page_size: int, workers: int, trace_memory: bool):
+    session = CDCSession(pool_size=workers, backoff_factor=0.01)
+    schema = CDC_SCHEMA if mode == "typed" else None
+
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    df = fetch_cdc_rows(
+        CDCQuery(base_url=base_url, limit=rows),
+        page_size=page_size,
+        max_workers=workers,
+        session=session,
+        schema=schema,
+    )
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    stats = session.stats.summary()
+    session.close()
+    if len(df) != rows:
+        raise SystemExit(f"expected {rows} rows, got {len(df)}")
+    return elapsed, peak, stats, int(df.memory_usage(deep=True).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch/ingest throughput against a local Socrata stub.")
+    parser.add_argument("--rows", default="10000,100000,1000000", help="Comma-separated row counts (up to 10000000).")
+    parser.add_argument("--modes", default="dicts,typed", help="dicts = r.json() + DataFrame(rows); typed = streaming ingest.")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds of injected latency per request.")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run (it roughly doubles runtime).")
+    parser.add_argument("--out", type=Path, help="Optional CSV path for the results table.")
+    args = parser.parse_args()
+
+    results = []
+    for n in [int(x) for x in args.rows.split(",")]:
+        proc, base_url = start_stub(n, args.latency, args.jitter, args.error_rate)
+        try:
+            for mode in args.modes.split(","):
+                elapsed, _, stats, frame_bytes = run_once(
+                    base_url, n, mode, args.page_size, args.workers, trace_memory=False
+                )
+                peak = None
+                if not args.no_memory:
+                    _, peak, _, _ = run_once(
+                        base_url, n, mode, args.page_size, args.workers, trace_memory=True
+                    )
+                results.append(
+                    {
+                        "rows": n,
+                        "mode": mode,
+                        "seconds": round(elapsed, 3),
+                        "rows_per_s": int(n / elapsed),
+                        "peak_mb": None if peak is None else round(peak / 1e6, 1),
+                        "frame_mb": round(frame_bytes / 1e6, 1),
+                        "requests": stats["requests"],
+                        "retries": stats["retries"],
+                        "mb_transferred": round(stats["bytes"] / 1e6, 1),
+                        "p50_page_s": round(stats["p50_latency_s"], 4),
+                        "p99_page_s": round(stats["p99_latency_s"], 4),
+                    }
+                )
+                print(results[-1], flush=True)
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    table = pd.DataFrame(results)
+    print("\n=== FETCH / INGEST BENCHMARK ===")
+    print(table.to_string(index=False))
+    if {"dicts", "typed"} <= set(table["mode"]):
+        seconds = table.groupby(["rows", "mode"])["seconds"].mean().unstack()
+        print("\ntyped vs dicts wall time (typed also converts every column to its schema type):")
+        for n, ratio in (seconds["typed"] / seconds["dicts"]).items():
+            print(f"  {n:>9} rows: {ratio - 1:+.0%}")
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        table.to_csv(args.out, index=False)
+        print("Saved:", args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.pivot import pivot_mean
+from src.schema import LOCATIONS, QUESTIONS, STRATIFICATIONS
+
+INDEX = ["yearstart", "locationabbr", "stratificationcategory1", "stratification1"]
+
+
+def synthetic_long(n: int, dup: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Stage 03-shaped long rows with about `dup` values per output cell.
+
+    Stratification labels are widened with a suffix as `n` grows (as if
+    finer stratifications were added), so the number of cells scales
+    with the row count instead of saturating at the real key space.
+    """
+    rng = np.random.default_rng(seed)
+    n_cells = max(1, n // dup)
+    cell = rng.permutation(n_cells)[rng.integers(0, n_cells, n)] if dup > 1 else rng.permutation(n)
+    n_q, n_loc, n_year = len(QUESTIONS), len(LOCATIONS), 14
+    q, rest = cell % n_q, cell // n_q
+    loc, rest = rest % n_loc, rest // n_loc
+    year, rest = rest % n_year, rest // n_year
+    strat_id = rest
+    base = np.array(STRATIFICATIONS, dtype=object)
+    labels = base[strat_id % len(base)]
+    widen = strat_id // len(base)
+    strat = np.where(widen == 0, labels, labels + " #" + widen.astype(str))
+    category = np.where(
+        pd.Series(labels).str.contains(r"\d - \d|older").to_numpy(), "Age (years)", "Total"
+    )
+    return pd.DataFrame(
+        {
+            "yearstart": 2011 + year,
+            "locationabbr": np.array(LOCATIONS, dtype=object)[loc],
+            "stratificationcategory1": category,
+            "stratification1": strat,
+            "question": np.array(QUESTIONS, dtype=object)[q],
+            "data_value": np.round(rng.uniform(10, 60, n), 1),
+        }
+    )
+
+
+def time_call(fn, repeat: int):
+    best = float("inf")
+    out = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pivot_mean vs DataFrame.pivot_table on Stage 03-shaped data.")
+    parser.add_argument("--rows", default="100000,1000000,10000000")
+    parser.add_argument("--dup", type=int, default=1, help="Average long rows per output cell.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--dtypes", default="object,categorical", help="Key column typing: object strings and/or pandas categoricals.")
+    args = parser.parse_args()
+
+    results = []
+    for n in [int(x) for x in args.rows.split(",")]:
+        base = synthetic_long(n, args.dup)
+        for kind in args.dtypes.split(","):
+            if kind == "categorical":
+                df = base.astype({c: "category" for c in INDEX[1:] + ["question"]})
+            else:
+                df = base
+            t_pt, expected = time_call(
+                lambda: df.pivot_table(
+                    index=INDEX,
+                    columns="question",
+                    values="data_value",
+                    aggfunc="mean",
+                    observed=True,
+                ).reset_index(),
+                args.repeat,
+            )
+            t_pm, got = time_call(
+                lambda: pivot_mean(df, INDEX, "question", "data_value"), args.repeat
+            )
+            pd.testing.assert_frame_equal(expected, got, check_exact=True)
+            results.append(
+                {
+                    "rows": n,
+                    "keys": kind,
+                    "cells": int(got.shape[0] * (got.shape[1] - len(INDEX))),
+                    "pivot_table_s": round(t_pt, 4),
+                    "pivot_mean_s": round(t_pm, 4),
+                    "speedup": round(t_pt / t_pm, 1),
+                }
+            )
+            print(results[-1], flush=True)
+
+    print("\n=== PIVOT BENCHMARK (outputs identical) ===")
+    print(pd.DataFrame(results).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import http.client
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.column_store import read_modeling_dataset
+from src.model_registry import CATEGORICAL, NUMERIC
+from src.service import DEFAULT_CACHE_SIZE, DEFAULT_MAX_BATCH, DEFAULT_MAX_WAIT, ExplanationService, make_server
+
+
+def workload(n: int, distinct: int, seed: int = 0):
+    """`n` queries over `distinct` subgroups from the modeling data, Zipf-skewed so some are hot."""
+    df = read_modeling_dataset()[[*CATEGORICAL, *NUMERIC]].drop_duplicates()
+    rng = np.random.default_rng(seed)
+    pool = df.sample(min(distinct, len(df)), random_state=seed).to_dict("records")
+    ranks = np.minimum(rng.zipf(1.2, n), len(pool)) - 1
+    return [{k: (int(v) if k in NUMERIC else v) for k, v in pool[r].items()} for r in ranks]
+
+
+def run_client(port: int, queries, latencies, lock):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    local = []
+    for query in queries:
+        body = json.dumps(query)
+        start = time.perf_counter()
+        conn.request("POST", "/explain", body, {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        response.read()
+        local.append((response.getheader("X-Cache"), time.perf_counter() - start))
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status}")
+    conn.close()
+    with lock:
+        latencies.extend(local)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the explanation service in-process with concurrent clients.")
+    parser.add_argument("--version", default="v2")
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--distinct", type=int, default=5_000, help="Distinct subgroups in the workload.")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT * 1000)
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE)
+    args = parser.parse_args()
+
+    queries = workload(args.requests, args.distinct)
+    service = ExplanationService.from_registry(
+        args.version, max_batch=args.max_batch, max_wait=args.max_wait_ms / 1000, cache_size=args.cache_size
+    )
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    latencies, lock = [], threading.Lock()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as pool:
+        for future in [
+            pool.submit(run_client, server.server_port, queries[i :: args.clients], latencies, lock)
+            for i in range(args.clients)
+        ]:
+            future.result()
+    seconds = time.perf_counter() - start
+    server.shutdown()
+    server.server_close()
+
+    print("\n=== SERVICE BENCHMARK ===")
+    print(f"{len(latencies)} requests from {args.clients} clients in {seconds:.2f}s ({len(latencies) / seconds:,.0f} req/s)")
+    # X-Cache says whether the service answered from its cache or had to score.
+    for kind in ("all", "hit", "miss"):
+        sample = [t for cache, t in latencies if kind in ("all", cache)]
+        if sample:
+            p50, p99 = np.percentile(sample, [50, 99]) * 1000
+            print(f"client latency ({kind}, {len(sample)} requests): p50 {p50:.2f} ms, p99 {p99:.2f} ms")
+    print(json.dumps(service.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from src.column_store import read_modeling_dataset
+from src.design_matrix import load_design_matrix
+from src.model_registry import resolve_model
+from src.solvers import SOLVERS, compare_solvers, pick_solver, reference_params
+
+
+def synthetic_rows(X: sparse.csr_matrix, params: np.ndarray, n: int, seed: int = 0):
+    """
+    `n` rows resampled from the real design matrix, labelled by drawing
+    from the fitted model's probabilities, so the one-hot structure and
+    the coefficient scale match the real problem at any size.
+    """
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, X.shape[0], n)
+    Xs = X[rows]
+    p = 1.0 / (1.0 + np.exp(-(Xs @ params[1:] + params[0])))
+    return Xs, (rng.random(n) < p).astype(int)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LogisticRegression solvers on the one-hot design matrix.")
+    parser.add_argument(
+        "--models",
+        default="obesity/v2,overweight/v2",
+        help="Registry entries whose preprocessing and label to use. v1 (unscaled year) is slow: "
+        "lbfgs and saga run to --max-iter without converging, for minutes at 10x rows.",
+    )
+    parser.add_argument("--scales", default="1,10", help="Row multiples of the real dataset; 1 is the real data.")
+    parser.add_argument("--solvers", default=",".join(SOLVERS))
+    parser.add_argument("--max-iter", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    df = read_modeling_dataset()
+    solvers = args.solvers.split(",")
+    tables = []
+    for name in args.models.split(","):
+        outcome, version = name.split("/")
+        model = resolve_model(outcome, version)
+        X = load_design_matrix(model.meta, df).X
+        y = df[model.label].astype(int).to_numpy()
+        params = reference_params(X, y)
+
+        for scale in [int(s) for s in args.scales.split(",")]:
+            if scale == 1:
+                Xs, ys = X, y
+            else:
+                Xs, ys = synthetic_rows(X, params, scale * X.shape[0], seed=scale)
+            table = compare_solvers(Xs, ys, solvers, max_iter=args.max_iter, repeat=args.repeat)
+            table.insert(0, "rows", Xs.shape[0])
+            table.insert(0, "model", name)
+            table["picked"] = table["solver"] == pick_solver(Xs, ys, table=table)
+            print(table.round(4).to_string(index=False), flush=True)
+            tables.append(table)
+
+    print("\n=== SOLVER BENCHMARK ===")
+    out = pd.concat(tables, ignore_index=True)
+    print(out.round(4).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
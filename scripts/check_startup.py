@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import json
+import subprocess
+
+from src.pipeline import STAGES
+
+# Packages no pipeline script may import before main() runs.
+DEFERRED = ("matplotlib", "sklearn", "joblib")
+
+# Executes a script's module level (imports, constants) without main().
+PROBE = """
+import json, runpy, sys, time
+start = time.perf_counter()
+runpy.run_path(sys.argv[1], run_name="__startup_check__")
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "loaded": [m for m in sys.argv[2:] if m in sys.modules]}))
+"""
+
+
+def measure(script: Path, repeat: int) -> dict:
+    """Best-of-`repeat` module-level import time, each in a fresh interpreter."""
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE, str(script), *DEFERRED],
+            cwd=PROJECT_ROOT,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {"seconds": min(r["seconds"] for r in runs), "loaded": runs[-1]["loaded"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if a pipeline script's start-up is slow or imports heavy packages eagerly.")
+    parser.add_argument("scripts", nargs="*", help="Scripts to check (default: every pipeline stage).")
+    parser.add_argument("--budget", type=float, default=1.0, help="Seconds allowed for a script's module-level imports.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    scripts = [Path(s) for s in args.scripts] or [PROJECT_ROOT / s.script for s in STAGES]
+    failures = []
+    print(f"{'script':42s} {'import s':>9s}  eager heavy imports")
+    for script in scripts:
+        result = measure(script, args.repeat)
+        over = result["seconds"] > args.budget
+        print(f"{script.name:42s} {result['seconds']:9.3f}  {', '.join(result['loaded']) or '-'}{'  OVER BUDGET' if over else ''}")
+        if over or result["loaded"]:
+            failures.append(script.name)
+
+    if failures:
+        print(f"\nStart-up check failed ({args.budget}s budget, deferred: {', '.join(DEFERRED)}): {', '.join(failures)}")
+        sys.exit(1)
+    print(f"\nAll {len(scripts)} scripts within {args.budget}s and free of eager {', '.join(DEFERRED)} imports.")
+
+
+if __name__ == "__main__":
+    main()
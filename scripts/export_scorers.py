@@ -0,0 +1,162 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import json
+import subprocess
+
+import numpy as np
+import pandas as pd
+
+from src.column_store import read_modeling_dataset
+from src.model_registry import CATEGORICAL, NUMERIC, list_models, resolve_model
+from src.scorer import DEFAULT_EXPORT_DIR, Scorer, export_model, export_pipeline
+
+PARITY_TOL = 1e-12
+
+# Cold start of one scoring worker: imports, load, score one row; fresh interpreter each.
+# Peak memory is VmHWM: ru_maxrss survives exec, so it would report this parent's peak.
+PEAK_RSS = """
+def peak_rss_mb():
+    for line in open("/proc/self/status"):
+        if line.startswith("VmHWM:"):
+            return int(line.split()[1]) / 1024
+"""
+ARTIFACT_PROBE = PEAK_RSS + """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, ".")
+from src.scorer import Scorer
+row = json.loads(sys.argv[2])
+p = Scorer.load(sys.argv[1]).predict_proba({k: [v] for k, v in row.items()})[0]
+print(json.dumps({"seconds": time.perf_counter() - start, "max_rss_mb": peak_rss_mb(), "p": p}))
+"""
+PIPELINE_PROBE = PEAK_RSS + """
+import json, sys, time
+start = time.perf_counter()
+import joblib, pandas as pd
+row = json.loads(sys.argv[2])
+p = joblib.load(sys.argv[1]).predict_proba(pd.DataFrame([row]))[0, 1]
+print(json.dumps({"seconds": time.perf_counter() - start, "max_rss_mb": peak_rss_mb(), "p": float(p)}))
+"""
+
+
+def cold_start(probe: str, path: str, row: dict, repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", probe, path, json.dumps(row)], cwd=PROJECT_ROOT, capture_output=True, text=True
+        )
+        if out.returncode != 0:
+            return {"error": out.stderr.strip().splitlines()[-1]}
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return min(runs, key=lambda r: r["seconds"])
+
+
+def fitted_parity(df: pd.DataFrame, label: str = "obesity_high_risk", n: int = 4000) -> dict:
+    """
+    Fit preprocess + LogisticRegression pipelines in process (standardised
+    and passthrough year), export them and compare `Scorer.predict_proba`
+    with `pipe.predict_proba(X)[:, 1]` on rows that include an unseen
+    location and years outside the training range.
+    """
+    import tempfile
+
+    from sklearn.compose import ColumnTransformer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+    sample = df.sample(min(n, len(df)), random_state=0)
+    X = sample[[*CATEGORICAL, *NUMERIC]].astype({c: object for c in CATEGORICAL})
+    X_eval = X.copy()
+    X_eval.iloc[:50, X_eval.columns.get_loc("locationabbr")] = "ZZ"
+    X_eval.iloc[50:100, X_eval.columns.get_loc("yearstart")] = 2040
+
+    diffs = {}
+    for name, num in (("scaled", StandardScaler()), ("passthrough", "passthrough")):
+        pre = ColumnTransformer(
+            [("cat", OneHotEncoder(handle_unknown="ignore"), CATEGORICAL), ("num", num, NUMERIC)]
+        )
+        pipe = Pipeline([("preprocess", pre), ("model", LogisticRegression(solver="newton-cholesky", max_iter=5000))])
+        pipe.fit(X, sample[label].astype(int))
+        with tempfile.TemporaryDirectory() as tmp:
+            scorer = Scorer.load(export_pipeline(pipe, Path(tmp) / "scorer.json"))
+        p = scorer.predict_proba({c: X_eval[c].tolist() for c in X_eval.columns})
+        diffs[name] = float(np.abs(p - pipe.predict_proba(X_eval)[:, 1]).max())
+    return diffs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export registered models to sklearn-free scoring artifacts and check parity.")
+    parser.add_argument("--models", default=None, help="outcome/version entries (default: every registered model).")
+    parser.add_argument("--out-dir", default=str(DEFAULT_EXPORT_DIR))
+    parser.add_argument("--strict", action="store_true", help="Treat models whose pipeline cannot be checked as failures.")
+    parser.add_argument("--measure", action="store_true", help="Compare worker cold start and peak memory with the joblib pipeline.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.models:
+        models = [resolve_model(*name.split("/")) for name in args.models.split(",")]
+    else:
+        models = list_models()
+    df = read_modeling_dataset()
+    rows = {c: df[c].tolist() for c in (*CATEGORICAL, *NUMERIC)}
+    failures, skipped = [], []
+
+    print("\n=== SCORER PARITY (pipelines fit in process, unseen location, out-of-range years) ===")
+    for name, diff in fitted_parity(df).items():
+        ok = diff <= PARITY_TOL
+        if not ok:
+            failures.append(f"fitted/{name}")
+        print(f"{name:12s} max |p - pipe.predict_proba| = {diff:.2e}{'' if ok else '  PARITY FAILED'}")
+
+    print("\n=== SCORER EXPORT ===")
+    for model in models:
+        name = f"{model.outcome}/{model.version}"
+        path = export_model(model, Path(args.out_dir) / f"{model.outcome}_{model.version}.json")
+        print(f"{name}: {path} ({path.stat().st_size / 1024:.1f} KiB)")
+
+        try:
+            pipe = model.pipeline()
+        except LookupError:
+            reason = "no sklearn pipeline registered"
+        except (AttributeError, ImportError) as exc:  # pickled by an incompatible sklearn
+            reason = f"pipeline does not unpickle ({type(exc).__name__}: {exc})"
+        else:
+            reason = None
+        if reason is not None:
+            skipped.append(name)
+            print(f"  parity SKIPPED: {reason}")
+        else:
+            p = Scorer.load(path).predict_proba(rows)
+            diff = float(np.abs(p - pipe.predict_proba(df[[*CATEGORICAL, *NUMERIC]])[:, 1]).max())
+            ok = diff <= PARITY_TOL
+            if not ok:
+                failures.append(name)
+            print(f"  max |p - pipe.predict_proba| over {len(p)} rows = {diff:.2e}{'' if ok else '  PARITY FAILED'}")
+
+        if args.measure:
+            row = {c: (int(df[c].iloc[0]) if c in NUMERIC else df[c].iloc[0]) for c in (*CATEGORICAL, *NUMERIC)}
+            for kind, probe, target in (
+                ("artifact", ARTIFACT_PROBE, str(path)),
+                ("pipeline", PIPELINE_PROBE, model.meta.get("pipeline") or ""),
+            ):
+                r = cold_start(probe, target, row, args.repeat)
+                if "error" in r:
+                    print(f"  {kind:8s} cold start unavailable: {r['error']}")
+                else:
+                    print(f"  {kind:8s} cold start {r['seconds'] * 1000:7.1f} ms, peak RSS {r['max_rss_mb']:6.1f} MB")
+
+    if skipped:
+        print(f"\nParity not checked (no usable pipeline): {', '.join(skipped)}")
+    if failures or (args.strict and skipped):
+        print(f"\nParity check failed: {', '.join(failures + (skipped if args.strict else []))}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+
+from src.pipeline import DEFAULT_JOBS, STAGES, PipelineRunner, dependencies
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the pipeline stages that are out of date, independent ones in parallel."
+    )
+    parser.add_argument(
+        "targets",
+        nargs="*",
+        help="Stage names or prefixes (e.g. 04, 06_global_explain_obesity_v2); upstream stages are included. Default: all.",
+    )
+    parser.add_argument("--jobs", "-j", type=int, default=DEFAULT_JOBS, help="Stages run at the same time.")
+    parser.add_argument("--force", action="store_true", help="Re-run every selected stage.")
+    parser.add_argument("--refresh", action="store_true", help="Re-fetch from the CDC API (stages 01-03), bypassing the response cache.")
+    parser.add_argument("--dry-run", action="store_true", help="Only report which stages are out of date.")
+    parser.add_argument("--list", action="store_true", help="List stages with their inputs, outputs and upstream stages.")
+    args = parser.parse_args()
+
+    if args.list:
+        deps = dependencies(STAGES)
+        for stage in STAGES:
+            print(stage.name + (" [CDC API]" if stage.external else ""))
+            for label, items in (("after", sorted(deps[stage.name])), ("in", stage.inputs), ("out", stage.outputs)):
+                for item in items:
+                    print(f"    {label:5s} {item}")
+        return
+
+    results = PipelineRunner().run(
+        args.targets,
+        jobs=args.jobs,
+        force=args.force,
+        refresh=args.refresh,
+        dry_run=args.dry_run,
+    )
+
+    print("\n=== PIPELINE ===")
+    for r in results:
+        timing = f"{r.seconds:7.1f}s" if r.status in ("ran", "failed") else ""
+        print(f"{r.status:8s} {timing:>8s}  {r.name}")
+    if any(r.status in ("failed", "blocked") for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
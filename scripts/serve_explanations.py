@@ -0,0 +1,72 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import json
+import signal
+import threading
+
+from src.service import (
+    DEFAULT_CACHE_SIZE,
+    DEFAULT_MAX_BATCH,
+    DEFAULT_MAX_WAIT,
+    DEFAULT_PORT,
+    OUTCOMES,
+    ExplanationService,
+    make_server,
+)
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve subgroup predictions and local explanations over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--version", default="v2", help="Registry version to load for every outcome.")
+    parser.add_argument("--outcomes", default=",".join(OUTCOMES))
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT * 1000, help="Longest a query waits for its batch to fill.")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE, help="Subgroups kept in the LRU cache (0 disables it).")
+    parser.add_argument("--report-every", type=float, default=60.0, help="Seconds between latency reports (0 = only on exit).")
+    args = parser.parse_args()
+
+    service = ExplanationService.from_registry(
+        args.version,
+        args.outcomes.split(","),
+        max_batch=args.max_batch,
+        max_wait=args.max_wait_ms / 1000,
+        cache_size=args.cache_size,
+    )
+    server = make_server(service, args.host, args.port)
+    print(f"Serving {', '.join(service.tables)} ({args.version}) on http://{args.host}:{server.server_port}", flush=True)
+    print("POST /explain with yearstart, locationabbr, stratificationcategory1, stratification1; GET /stats", flush=True)
+
+    # Stop on SIGTERM as on Ctrl-C, so the final stats are printed either way.
+    signal.signal(signal.SIGTERM, _interrupt)
+    stop = threading.Event()
+
+    def report():
+        while not stop.wait(args.report_every):
+            print(json.dumps(service.stats()), flush=True)
+
+    if args.report_every > 0:
+        threading.Thread(target=report, daemon=True).start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+        print("\n=== SERVICE STATS ===")
+        print(json.dumps(service.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
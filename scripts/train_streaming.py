@@ -0,0 +1,43 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+
+from src.model_registry import dataset_fingerprint, register_coefficients
+from src.streaming_train import CHUNK_ROWS, DEFAULT_ALPHA, DEFAULT_EPOCHS, train_streaming
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a v2-style model out of core with SGD over CSV chunks.")
+    parser.add_argument("outcome", choices=("obesity", "overweight"))
+    parser.add_argument("--version", default="v2-sgd", help="Registry version to write.")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--epochs", type=int, default=DEFAULT_EPOCHS)
+    parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA, help="L2 strength of SGDClassifier.")
+    args = parser.parse_args()
+
+    label = f"{args.outcome}_high_risk"
+    model = train_streaming(label, alpha=args.alpha, epochs=args.epochs, chunk_rows=args.chunk_rows)
+    entry = register_coefficients(
+        model.meta,
+        model.coef,
+        args.outcome,
+        args.version,
+        label,
+        metrics=model.metrics,
+        data_fingerprint=dataset_fingerprint(),
+    )
+
+    print(f"\n=== STREAMING TRAIN RESULT: {label} ===")
+    print("Train rows:", model.n_train, " Holdout rows:", model.n_test)
+    print("Epochs:", args.epochs, " Chunk rows:", args.chunk_rows, " Fit seconds:", round(model.fit_s, 3))
+    print("Holdout AUROC:", round(model.metrics["auroc"], 4))
+    print("Holdout Accuracy:", round(model.metrics["accuracy"], 4))
+    print("Registered:", entry.path)
+
+
+if __name__ == "__main__":
+    main()
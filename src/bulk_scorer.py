@@ -0,0 +1,165 @@
+"""
+Numba-compiled bulk scorer for large what-if subgroup grids.
+
+`pre.transform` + `predict_proba` builds a sparse one-hot matrix and
+dense intermediates for every row of a sweep. Here the inputs are
+already integer category codes (one column per categorical feature, -1
+for an unseen category) and the raw numeric values. The kernel then
+scores each row with a few coefficient lookups and writes into
+caller-provided arrays:
+
+    probability      (n,)    float64
+    top_features     (n, k)  int32    feature index, -1 = none
+    top_contrib      (n, k)  float32  largest |contribution| first
+
+Rows run in parallel (`prange`). Each row's top k is kept by insertion
+into its own output slots, with no per-row allocation or sort.
+`cache=True` stores the compiled machine code under `__pycache__`, so
+only the first process on a machine pays the JIT cost.
+
+The coefficients, categories and scaling come from a `Scorer` artifact
+(`src/scorer.py`), so sklearn is not needed here either.
+"""
+from __future__ import annotations
+
+from typing import Dict, Sequence, Tuple
+
+import numba
+import numpy as np
+
+from src.scorer import Scorer
+
+
+@numba.njit(cache=True, inline="always")
+def _insert(top_features, top_contrib, i, feature, value):
+    k = top_features.shape[1]
+    if k == 0 or value == 0.0:
+        return
+    # Compare at the stored (float32) precision so ties stay in column order.
+    magnitude = abs(np.float32(value))
+    if top_features[i, k - 1] >= 0 and abs(top_contrib[i, k - 1]) >= magnitude:
+        return
+    pos = k - 1
+    while pos > 0 and (top_features[i, pos - 1] < 0 or abs(top_contrib[i, pos - 1]) < magnitude):
+        top_features[i, pos] = top_features[i, pos - 1]
+        top_contrib[i, pos] = top_contrib[i, pos - 1]
+        pos -= 1
+    top_features[i, pos] = feature
+    top_contrib[i, pos] = value
+
+
+@numba.njit(parallel=True, cache=True, nogil=True)
+def _score_kernel(
+    codes, numeric, offsets, num_offsets, coef, means, scales, intercept, probability, top_features, top_contrib
+):
+    n = codes.shape[0]
+    for i in numba.prange(n):
+        for r in range(top_features.shape[1]):
+            top_features[i, r] = -1
+            top_contrib[i, r] = 0.0
+        logit = intercept
+        for j in range(codes.shape[1]):
+            code = codes[i, j]
+            if code >= 0:
+                feature = offsets[j] + code
+                value = coef[feature]
+                logit += value
+                _insert(top_features, top_contrib, i, feature, value)
+        for j in range(numeric.shape[1]):
+            feature = num_offsets[j]
+            value = coef[feature] * ((numeric[i, j] - means[j]) / scales[j])
+            logit += value
+            _insert(top_features, top_contrib, i, feature, value)
+        probability[i] = 1.0 / (1.0 + np.exp(-logit))
+
+
+class BulkScorer:
+    """Kernel inputs compiled from a `Scorer`; scores code/value arrays in place."""
+
+    def __init__(self, scorer: Scorer):
+        self.scorer = scorer
+        self.categorical = list(scorer.categories)
+        self.numeric = list(scorer.scaling)
+        sizes = [len(scorer.categories[c]) for c in self.categorical]
+        self._sizes = np.array(sizes, dtype=np.int64)
+        self._offsets = np.r_[0, np.cumsum(sizes)[:-1]].astype(np.int64)
+        self._num_offsets = sum(sizes) + np.arange(len(self.numeric), dtype=np.int64)
+        self._coef = np.ascontiguousarray(scorer.coef, dtype=np.float64)
+        self._means = np.array([scorer.scaling[c][0] for c in self.numeric], dtype=np.float64)
+        self._scales = np.array([scorer.scaling[c][1] for c in self.numeric], dtype=np.float64)
+        self._lookups: Dict[str, Dict[str, int]] = {
+            col: {str(cat): i for i, cat in enumerate(scorer.categories[col])} for col in self.categorical
+        }
+
+    @classmethod
+    def load(cls, path) -> "BulkScorer":
+        return cls(Scorer.load(path))
+
+    def encode(self, column: str, values: Sequence) -> np.ndarray:
+        """Raw category labels -> int32 codes (-1 for labels the model never saw)."""
+        lookup = self._lookups[column]
+        return np.fromiter((lookup.get(str(v), -1) for v in values), dtype=np.int32, count=len(values))
+
+    def allocate(self, n: int, k: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Output arrays for `score_into`: probability, top_features, top_contrib."""
+        return np.empty(n), np.empty((n, k), dtype=np.int32), np.empty((n, k), dtype=np.float32)
+
+    def score_into(
+        self,
+        codes: np.ndarray,
+        numeric: np.ndarray,
+        probability: np.ndarray,
+        top_features: np.ndarray,
+        top_contrib: np.ndarray,
+    ) -> None:
+        """
+        Score `codes` (n, categorical columns) and `numeric` (n, numeric
+        columns, raw values) into the preallocated outputs.
+        """
+        codes = np.ascontiguousarray(codes, dtype=np.int32)
+        numeric = np.ascontiguousarray(numeric, dtype=np.float64)
+        n = len(codes)
+        if codes.shape != (n, len(self.categorical)) or numeric.shape != (n, len(self.numeric)):
+            raise ValueError(
+                f"expected codes of shape (n, {len(self.categorical)}) and numeric of shape (n, {len(self.numeric)})"
+            )
+        if len(probability) != n or len(top_features) != n or top_features.shape != top_contrib.shape:
+            raise ValueError("output arrays do not match the number of rows")
+        if top_contrib.dtype != np.float32 or top_features.dtype != np.int32:
+            raise ValueError("top_contrib must be float32 and top_features int32 (see allocate)")
+        if n and (codes.max(axis=0) >= self._sizes).any():
+            raise ValueError("category code out of range")
+        _score_kernel(
+            codes,
+            numeric,
+            self._offsets,
+            self._num_offsets,
+            self._coef,
+            self._means,
+            self._scales,
+            self.scorer.intercept,
+            probability,
+            top_features,
+            top_contrib,
+        )
+
+    def score(self, codes: np.ndarray, numeric: np.ndarray, k: int = 3):
+        probability, top_features, top_contrib = self.allocate(len(codes), k)
+        self.score_into(codes, numeric, probability, top_features, top_contrib)
+        return probability, top_features, top_contrib
+
+
+def grid_codes(axes: Sequence[np.ndarray], numeric: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cartesian product of code blocks and numeric values, as kernel inputs.
+
+    Each axis is a 1-D array of codes for one categorical column, or an
+    (m, c) block of codes for `c` columns swept jointly (e.g. the
+    stratification category/stratum pairs that actually occur together).
+    `numeric` holds one value (or row of values) per numeric step.
+    """
+    blocks = [np.asarray(a, dtype=np.int32).reshape(len(a), -1) for a in axes]
+    numeric = np.asarray(numeric, dtype=np.float64).reshape(len(numeric), -1)
+    index = np.indices([len(b) for b in blocks] + [len(numeric)]).reshape(len(blocks) + 1, -1)
+    codes = np.hstack([b[index[j]] for j, b in enumerate(blocks)])
+    return codes, numeric[index[-1]]
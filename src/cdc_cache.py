@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_CACHE_DIR = Path("data") / "cache" / "cdc"
+DEFAULT_TTL_S = 7 * 24 * 3600
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def query_key(query) -> str:
+    """
+    Content address of a `CDCQuery` page.
+
+    Built from the base URL plus the exact SoQL parameters sent
+    (`$where`, `$limit`, `$offset`, `$order`, `$select`, ...), so two
+    queries share an entry only if the server would see the same request.
+    """
+    payload = json.dumps(
+        {"base_url": query.base_url, "params": query.params()},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Local cache of gzip-compressed raw Socrata responses.
+
+    Entries expire `ttl_s` seconds after they were written (file mtime).
+    Every hit stamps the file's atime, and when the cache grows past
+    `max_bytes` the least recently used entries are removed first.
+    """
+
+    def __init__(
+        self,
+        root: Path = DEFAULT_CACHE_DIR,
+        ttl_s: Optional[float] = DEFAULT_TTL_S,
+        max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+    ):
+        self.root = Path(root)
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.json.gz"
+
+    def get(self, query) -> Optional[bytes]:
+        path = self._path(query_key(query))
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+
+        now = time.time()
+        if self.ttl_s is not None and now - st.st_mtime > self.ttl_s:
+            path.unlink(missing_ok=True)
+            return None
+
+        try:
+            body = gzip.decompress(path.read_bytes())
+        except (FileNotFoundError, OSError, EOFError):
+            # Evicted by another worker, or a truncated file: treat as a miss.
+            return None
+
+        os.utime(path, (now, st.st_mtime))
+        return body
+
+    def put(self, query, body: bytes) -> None:
+        path = self._path(query_key(query))
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(gzip.compress(body, compresslevel=6))
+        os.replace(tmp, path)
+        self.evict()
+
+    def evict(self) -> None:
+        with self._lock:
+            entries = []
+            now = time.time()
+            for path in self.root.glob("*.json.gz"):
+                try:
+                    st = path.stat()
+                except FileNotFoundError:
+                    continue
+                if self.ttl_s is not None and now - st.st_mtime > self.ttl_s:
+                    path.unlink(missing_ok=True)
+                    continue
+                entries.append((st.st_atime, st.st_size, path))
+
+            if self.max_bytes is None:
+                return
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries, key=lambda e: e[0]):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+
+    def clear(self) -> None:
+        for path in self.root.glob("*.json.gz"):
+            path.unlink(missing_ok=True)
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from itertools import chain, islice
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.schema import KINDS, ColumnSpec
+
+# Column kinds understood by the streaming reader:
+#   "numeric"      -> float64, unparseable / missing values become NaN
+#   "int"          -> nullable Int64
+#   "categorical"  -> pandas categorical (categories sorted)
+#   "string"       -> object column, as pd.DataFrame(rows) would produce
+# A schema maps column names to a kind, or to a `src.schema.ColumnSpec`
+# whose dtype and declared categories are applied while reading
+# (see `src.schema.CDC_SCHEMA`).
+ColumnType = Union[str, ColumnSpec]
+
+_SCAN = json.JSONDecoder().scan_once
+_SKIP = re.compile(r"[ \t\n\r]*").match
+_SEPARATOR = re.compile(r"[ \t\n\r,]*").match
+
+# Chunk boundaries tried by `_decode_complete` before scanning per object.
+FAST_DECODE_ATTEMPTS = 2
+
+# Rows handed to the column buffers at a time.
+BATCH_ROWS = 8192
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[dict]:
+    """
+    Yield the objects of a top-level JSON array from a stream of byte chunks.
+
+    Only the current, not yet decoded tail of the stream is buffered, so the
+    full list of rows never exists in memory at once.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    started = False
+
+    for chunk in chunks:
+        buf = buf[pos:] + decoder.decode(chunk)
+        pos = (_SEPARATOR if started else _SKIP)(buf, 0).end()
+        if not started:
+            if pos >= len(buf):
+                continue
+            if buf[pos] != "[":
+                raise ValueError("expected a JSON array from the Socrata API")
+            started = True
+            pos = _SEPARATOR(buf, pos + 1).end()
+        rows, pos = _decode_complete(buf, pos)
+        yield from rows
+        while pos < len(buf):
+            if buf[pos] == "]":
+                return
+            try:
+                obj, end = _SCAN(buf, pos)
+            except (json.JSONDecodeError, StopIteration):
+                # Object is split across chunks; wait for more input.
+                break
+            pos = _SEPARATOR(buf, end).end()
+            yield obj
+
+    buf = buf[pos:] + decoder.decode(b"", final=True)
+    if buf.strip() not in ("", "]"):
+        raise ValueError("truncated JSON array in Socrata response")
+
+
+def _decode_complete(buf: str, pos: int) -> Tuple[list, int]:
+    """
+    Every complete object of `buf[pos:]` with a single `json.loads`, and
+    the position after them. Rows end at the last `}` that parses; that
+    can be the end of a nested object, so a couple of earlier ones are
+    tried before leaving the rows to the per-object scan.
+    """
+    end = len(buf)
+    for _ in range(FAST_DECODE_ATTEMPTS):
+        end = buf.rfind("}", pos, end)
+        if end < 0:
+            break
+        try:
+            rows = json.loads(f"[{buf[pos:end + 1]}]")
+        except json.JSONDecodeError:
+            continue
+        return rows, _SEPARATOR(buf, end + 1).end()
+    return [], pos
+
+
+def iter_chunks(body: bytes, chunk_size: int = 1 << 20) -> Iterator[bytes]:
+    view = memoryview(body)
+    for start in range(0, len(view), chunk_size):
+        yield view[start:start + chunk_size].tobytes()
+
+
+class _Column:
+    """
+    One output column, converted a batch of rows at a time.
+
+    Each batch of raw values is handed to numpy/pandas in one call, which
+    is far cheaper than converting row by row; `finish` only concatenates
+    the converted parts (and merges category codes).
+    """
+
+    def __init__(self, name: str, column_type: ColumnType, n_missing: int = 0):
+        self.name = name
+        spec = column_type if isinstance(column_type, ColumnSpec) else ColumnSpec(column_type)
+        if spec.kind not in KINDS:
+            raise ValueError(f"unknown column kind: {spec.kind!r}")
+        self.spec = spec
+        self.kind = spec.kind
+        self.parts: list = []
+        if n_missing:
+            self.add([None] * n_missing)
+
+    def add(self, values: list) -> None:
+        if self.kind in ("numeric", "int"):
+            self.parts.append(_to_float64(values))
+        elif self.kind == "categorical":
+            self.parts.append(pd.factorize(np.array(values, dtype=object)))
+        else:
+            self.parts.extend(values)
+
+    def finish(self):
+        spec = self.spec
+        if self.kind in ("numeric", "int"):
+            values = np.concatenate(self.parts) if self.parts else np.empty(0)
+            if self.kind == "numeric":
+                return values.astype(spec.dtype) if spec.dtype else values
+            # Integral values only, as int() would accept them ("2011", "2011.0").
+            mask = ~np.isfinite(values) | (values != np.trunc(values))
+            data = np.where(mask, 0, values).astype(np.int64)
+            values = pd.arrays.IntegerArray(data, mask)
+            return values.astype(spec.dtype.capitalize()) if spec.dtype else values
+        if self.kind == "categorical":
+            seen = set()
+            for _, uniques in self.parts:
+                seen.update(uniques)
+            # Undeclared values are appended in sorted order, so results
+            # don't depend on the order rows arrived in.
+            extra = seen.difference(spec.categories)
+            if extra and spec.closed:
+                # Same warning apply_schema gives for a closed column.
+                spec.convert(pd.Series(sorted(extra), dtype=object, name=self.name))
+            dtype = spec.categorical_dtype(extra)
+            codes = [
+                np.append(dtype.categories.get_indexer(uniques), -1)[part_codes]
+                for part_codes, uniques in self.parts
+            ]
+            codes = np.concatenate(codes) if codes else np.empty(0, dtype=np.intp)
+            return pd.Categorical.from_codes(codes, dtype=dtype)
+        return np.array(self.parts, dtype=object)
+
+
+def _to_float64(values: list) -> np.ndarray:
+    """float64 array of raw JSON values; missing or unparseable ones become NaN."""
+    try:
+        # float() on every element, in C; None becomes NaN.
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        numeric = pd.to_numeric(pd.Series(values, dtype=object), errors="coerce")
+        return numeric.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+class ColumnBuffers:
+    """
+    Accumulates rows into per-column buffers.
+
+    Columns listed in `schema` are converted to their type a batch at a
+    time as rows arrive; any other field is kept as an object column. Fields that
+    first appear part way through (Socrata omits null fields) are
+    back-filled with missing values.
+    """
+
+    def __init__(self, schema: Optional[Dict[str, ColumnType]] = None):
+        self.schema = dict(schema or {})
+        self.columns: Dict[str, _Column] = {}
+        self.n_rows = 0
+
+    def _column(self, key: str) -> _Column:
+        col = self.columns.get(key)
+        if col is None:
+            col = self.columns[key] = _Column(key, self.schema.get(key, "string"), self.n_rows)
+        return col
+
+    def append(self, row: dict) -> None:
+        self.extend([row])
+
+    def extend(self, rows: Iterable[dict], batch_size: int = BATCH_ROWS) -> None:
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return
+            # Every key of the batch, in first-seen order.
+            for key in dict.fromkeys(chain.from_iterable(batch)):
+                self._column(key)
+            for key, col in self.columns.items():
+                col.add([row.get(key) for row in batch])
+            self.n_rows += len(batch)
+
+    def update(self, other: "ColumnBuffers") -> None:
+        """Append the rows collected by `other`, e.g. for a later page."""
+        for key in other.columns:
+            self._column(key)
+        for key, col in self.columns.items():
+            theirs = other.columns.get(key)
+            if theirs is not None:
+                col.parts.extend(theirs.parts)
+            else:
+                col.add([None] * other.n_rows)
+        self.n_rows += other.n_rows
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {name: col.finish() for name, col in self.columns.items()},
+            index=pd.RangeIndex(self.n_rows),
+        )
+
+
+def read_json_rows(
+    chunks: Iterable[bytes],
+    schema: Optional[Dict[str, ColumnType]] = None,
+) -> pd.DataFrame:
+    """Parse a Socrata JSON array into a DataFrame typed by `schema`."""
+    buffers = ColumnBuffers(schema)
+    buffers.extend(iter_json_array(chunks))
+    return buffers.to_frame()
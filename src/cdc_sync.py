@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+
+from src.cdc_ingest import ColumnType
+from src.data_cdc import (
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_PAGE_SIZE,
+    CDCQuery,
+    CDCSession,
+    count_rows,
+    fetch_cdc_rows,
+)
+from src.schema import CDC_SCHEMA, ColumnSpec, apply_schema
+
+DEFAULT_STORE_DIR = Path("data") / "raw_store"
+
+# Socrata system fields: a stable row id and the last-modified timestamp.
+ROW_ID = ":id"
+UPDATED_AT = ":updated_at"
+
+WATERMARKS = ("updated_at", "yearstart")
+
+
+@dataclass
+class SyncState:
+    updated_at: Optional[str] = None
+    yearstart: Optional[int] = None
+    rows: int = 0
+    last_sync: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class SyncResult:
+    fetched: int
+    inserted: int
+    updated: int
+    total: int
+
+
+class RawStore:
+    """
+    Local copy of the raw rows for one CDC query.
+
+    Rows are keyed by the Socrata `:id`, so applying the same delta twice
+    leaves the store unchanged. The high-water marks used to build the
+    next delta query are kept next to the rows in `<name>.state.json`.
+    """
+
+    def __init__(self, name: str, root: Path = DEFAULT_STORE_DIR):
+        self.name = name
+        self.root = Path(root)
+
+    @property
+    def rows_path(self) -> Path:
+        return self.root / f"{self.name}.pkl"
+
+    @property
+    def state_path(self) -> Path:
+        return self.root / f"{self.name}.state.json"
+
+    def load_state(self) -> SyncState:
+        if not self.state_path.exists():
+            return SyncState()
+        return SyncState(**json.loads(self.state_path.read_text()))
+
+    def load(self) -> pd.DataFrame:
+        if not self.rows_path.exists():
+            return pd.DataFrame()
+        return pd.read_pickle(self.rows_path)
+
+    def save(self, df: pd.DataFrame, state: SyncState) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Rows first, then state: a crash in between only re-fetches a delta.
+        tmp = self.rows_path.with_suffix(".pkl.tmp")
+        df.to_pickle(tmp)
+        os.replace(tmp, self.rows_path)
+        self.state_path.write_text(json.dumps(asdict(state), indent=2))
+
+
+def upsert_rows(current: pd.DataFrame, delta: pd.DataFrame, key: str = ROW_ID) -> pd.DataFrame:
+    """Replace rows of `current` whose `key` appears in `delta`, append the rest."""
+    if current.empty:
+        return delta.drop_duplicates(subset=key, keep="last").reset_index(drop=True)
+    if delta.empty:
+        return current
+
+    categorical = [
+        c
+        for c in set(current.columns) | set(delta.columns)
+        if isinstance(current.get(c, pd.Series(dtype=object)).dtype, pd.CategoricalDtype)
+        or isinstance(delta.get(c, pd.Series(dtype=object)).dtype, pd.CategoricalDtype)
+    ]
+    merged = pd.concat([current, delta], ignore_index=True)
+    merged = merged.drop_duplicates(subset=key, keep="last").reset_index(drop=True)
+    for c in categorical:
+        # concat falls back to object when the category sets differ.
+        if not isinstance(merged[c].dtype, pd.CategoricalDtype):
+            merged[c] = merged[c].astype("category")
+    return merged
+
+
+def _delta_where(query: CDCQuery, state: SyncState, watermark: str) -> Optional[str]:
+    clauses = [f"({query.where})"] if query.where else []
+    if watermark == "updated_at" and state.updated_at:
+        clauses.append(f"{UPDATED_AT} > '{state.updated_at}'")
+    elif watermark == "yearstart" and state.yearstart is not None:
+        # >= so revisions to the latest year already seen are picked up too.
+        clauses.append(f"yearstart >= {state.yearstart}")
+    return " AND ".join(clauses) or None
+
+
+def sync_cdc_rows(
+    query: CDCQuery,
+    store: RawStore,
+    watermark: str = "updated_at",
+    schema: Optional[Dict[str, ColumnType]] = CDC_SCHEMA,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    session: Optional[CDCSession] = None,
+) -> SyncResult:
+    """
+    Bring `store` up to date with the rows matching `query`.
+
+    Only rows past the stored high-water mark are requested: newer
+    `:updated_at` (default) or `yearstart` at or above the latest year
+    seen. `query.limit` is ignored; the delta size is counted server-side
+    first. Rows deleted upstream are not removed from the store.
+
+    Pages are ordered by `:updated_at`, so a row changed between the
+    count and the page requests moves past the fetched range instead of
+    shifting an unfetched row into it, and the `:updated_at` mark is
+    taken from the rows actually fetched: anything left out is newer and
+    comes with the next sync. A first sync that matches nothing leaves
+    the store without rows (`RawStore.load` returns an empty frame).
+    """
+    if watermark not in WATERMARKS:
+        raise ValueError(f"watermark must be one of {WATERMARKS}")
+
+    state = store.load_state()
+    select = f"{ROW_ID}, {UPDATED_AT}, " + (query.select or "*")
+    delta_query = replace(
+        query,
+        select=select,
+        where=_delta_where(query, state, watermark),
+        order=f"{UPDATED_AT}, {ROW_ID}",
+        offset=0,
+        group=None,
+    )
+
+    n = count_rows(delta_query, session)
+    if n == 0:
+        return SyncResult(fetched=0, inserted=0, updated=0, total=state.rows)
+
+    delta = fetch_cdc_rows(
+        replace(delta_query, limit=n),
+        page_size=page_size,
+        max_workers=max_workers,
+        session=session,
+        schema=schema,
+    )
+    if delta.empty:  # rows deleted upstream since the count
+        return SyncResult(fetched=0, inserted=0, updated=0, total=state.rows)
+
+    current = store.load()
+    known = set(current[ROW_ID]) if ROW_ID in current.columns else set()
+    updated = int(delta[ROW_ID].isin(known).sum())
+    merged = upsert_rows(current, delta)
+    if schema:
+        # Keep the schema's category order after concat of differing sets.
+        specs = {k: v for k, v in schema.items() if isinstance(v, ColumnSpec)}
+        merged = apply_schema(merged, specs)
+
+    # Advance the marks from the rows fetched now, never past them; the
+    # stored mark stays if it is ahead (e.g. the other watermark's delta).
+    if UPDATED_AT in delta.columns and delta[UPDATED_AT].notna().any():
+        state.updated_at = max(filter(None, [state.updated_at, str(delta[UPDATED_AT].max())]))
+    if "yearstart" in delta.columns and delta["yearstart"].notna().any():
+        fetched_year = int(delta["yearstart"].max())
+        state.yearstart = fetched_year if state.yearstart is None else max(state.yearstart, fetched_year)
+    state.rows = len(merged)
+    state.last_sync = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    store.save(merged, state)
+
+    return SyncResult(
+        fetched=len(delta),
+        inserted=len(delta) - updated,
+        updated=updated,
+        total=len(merged),
+    )
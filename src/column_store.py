@@ -0,0 +1,318 @@
+"""
+Memory-mapped columnar store for the Stage 03 modeling dataset.
+
+A store (e.g. `data/obesity_overweight_modeling.cols/`) is a versioned
+directory (`src.versioned_dir`): a rebuild publishes a new version and
+swaps the `CURRENT` pointer, so the path always names one complete
+store. Each version holds:
+
+    _meta.json     column kinds/dtypes, category dictionaries, partitions
+    <column>.npy   one fixed-width array per column
+    _row.npy       original row position of every stored row
+    _pos.npy       stored position of every original row (inverse of _row)
+
+Rows are stored sorted by the partition columns (`yearstart`,
+`locationabbr` by default), so each partition is a contiguous row range
+listed in `_meta.json`. Opening a store reads the metadata and maps
+every array of one version at once; queries then only touch the ranges
+of partitions that match the filters.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.schema import MODELING_SCHEMA, SCHEMA_VERSION, apply_schema
+from src.versioned_dir import open_current, publish, staging_dir
+
+FORMAT_VERSION = 2
+DEFAULT_PARTITION_BY = ("yearstart", "locationabbr")
+
+MODELING_CSV = Path("data") / "obesity_overweight_modeling.csv"
+MODELING_STORE = Path("data") / "obesity_overweight_modeling.cols"
+
+
+def _code_dtype(n_categories: int) -> np.dtype:
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _to_json_value(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def source_fingerprint(path: Path) -> dict:
+    st = Path(path).stat()
+    return {"path": str(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def write_store(
+    df: pd.DataFrame,
+    path: Path,
+    partition_by: Sequence[str] = DEFAULT_PARTITION_BY,
+    source: Optional[dict] = None,
+    schema_version: Optional[int] = None,
+) -> Path:
+    """
+    Write `df` as a columnar store at `path`, replacing any existing one.
+    If the published store already has this `source` and
+    `schema_version` (a parallel stage just built it), it is kept.
+
+    Categorical columns keep their category order, so a frame typed with
+    `src.schema` round-trips with the same codes; `schema_version` records
+    which schema that was.
+    """
+    path = Path(path)
+    partition_by = [c for c in partition_by if c in df.columns]
+
+    frame = df.reset_index(drop=True)
+    if partition_by:
+        frame = frame.sort_values(partition_by, kind="mergesort")
+    rows = frame.index.to_numpy(dtype=np.int64)
+    frame = frame.reset_index(drop=True)
+
+    tmp = staging_dir(path)
+
+    columns: Dict[str, dict] = {}
+    for name in frame.columns:
+        col = frame[name]
+        if isinstance(col.dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(col.dtype):
+            cat = col if isinstance(col.dtype, pd.CategoricalDtype) else col.astype("category")
+            categories = [_to_json_value(c) for c in cat.cat.categories]
+            codes = cat.cat.codes.to_numpy().astype(_code_dtype(len(categories)))
+            np.save(tmp / f"{name}.npy", codes)
+            columns[name] = {"kind": "categorical", "dtype": codes.dtype.str, "categories": categories}
+        else:
+            values = col.to_numpy()
+            np.save(tmp / f"{name}.npy", values)
+            columns[name] = {"kind": "numeric", "dtype": values.dtype.str}
+    np.save(tmp / "_row.npy", rows)
+    positions = np.empty_like(rows)
+    positions[rows] = np.arange(len(rows))
+    np.save(tmp / "_pos.npy", positions)
+
+    partitions = []
+    if partition_by and len(frame):
+        keys = frame[partition_by]
+        starts = np.flatnonzero(
+            np.r_[True, (keys.iloc[1:].to_numpy() != keys.iloc[:-1].to_numpy()).any(axis=1)]
+        )
+        stops = np.r_[starts[1:], len(frame)]
+        for start, stop in zip(starts, stops):
+            values = {c: _to_json_value(frame[c].iloc[start]) for c in partition_by}
+            partitions.append({"values": values, "start": int(start), "stop": int(stop)})
+    else:
+        partitions.append({"values": {}, "start": 0, "stop": len(frame)})
+
+    meta = {
+        "version": FORMAT_VERSION,
+        "n_rows": len(frame),
+        "column_order": list(df.columns),
+        "columns": columns,
+        "partition_by": partition_by,
+        "partitions": partitions,
+        "source": source,
+        "schema_version": schema_version,
+    }
+    (tmp / "_meta.json").write_text(json.dumps(meta, indent=2))
+
+    keep = None if source is None else (lambda live: _is_current(live, source, schema_version))
+    publish(path, tmp, keep_current=keep)
+    return path
+
+
+def _is_current(version: Path, source: dict, schema_version: Optional[int]) -> bool:
+    try:
+        meta = json.loads((version / "_meta.json").read_text())
+    except (OSError, ValueError):
+        return False
+    return (
+        meta.get("version") == FORMAT_VERSION
+        and meta.get("source") == source
+        and meta.get("schema_version") == schema_version
+    )
+
+
+class ColumnStore:
+    """
+    Read side of a store written by `write_store`, pinned to the version
+    that was live when it was opened.
+    """
+
+    def __init__(self, path: Path):
+        self.root = Path(path)
+        self.path, self.meta, self._arrays = open_current(self.root, _open_version)
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.meta["column_order"])
+
+    @property
+    def n_rows(self) -> int:
+        return int(self.meta["n_rows"])
+
+    @property
+    def partition_by(self) -> List[str]:
+        return list(self.meta["partition_by"])
+
+    def array(self, name: str) -> np.ndarray:
+        """Raw memory-mapped array (category codes for categorical columns)."""
+        return self._arrays[name]
+
+    def partitions(self, filters: Optional[Dict[str, object]] = None) -> List[dict]:
+        """Partitions whose key values satisfy the partition-column filters."""
+        wanted = {}
+        for col, value in (filters or {}).items():
+            if col in self.partition_by:
+                wanted[col] = _as_set(value)
+        return [
+            p
+            for p in self.meta["partitions"]
+            if all(p["values"].get(col) in values for col, values in wanted.items())
+        ]
+
+    def _column(self, name: str, index) -> pd.api.extensions.ExtensionArray:
+        spec = self.meta["columns"][name]
+        data = self.array(name)[index]
+        if spec["kind"] == "categorical":
+            return pd.Categorical.from_codes(np.asarray(data), categories=spec["categories"])
+        return np.asarray(data)
+
+    def _row_filter_mask(self, filters: Dict[str, object], index) -> Optional[np.ndarray]:
+        mask = None
+        for col, value in filters.items():
+            if col in self.partition_by:
+                continue
+            values = _as_set(value)
+            spec = self.meta["columns"][col]
+            data = np.asarray(self.array(col)[index])
+            if spec["kind"] == "categorical":
+                codes = [i for i, c in enumerate(spec["categories"]) if c in values]
+                m = np.isin(data, codes)
+            else:
+                m = np.isin(data, list(values))
+            mask = m if mask is None else mask & m
+        return mask
+
+    def read(
+        self,
+        columns: Optional[Iterable[str]] = None,
+        filters: Optional[Dict[str, object]] = None,
+        original_order: bool = True,
+    ) -> pd.DataFrame:
+        """
+        Load `columns` for rows matching `filters` ({column: value or list}).
+
+        Filters on partition columns prune whole partitions before any data
+        is read; filters on other columns are applied to the surviving rows.
+        With `original_order` rows come back in the order they were written.
+        """
+        columns = list(columns) if columns is not None else self.columns
+        filters = filters or {}
+        parts = self.partitions(filters)
+
+        if len(parts) == len(self.meta["partitions"]):
+            index = slice(0, self.n_rows)
+        elif parts:
+            index = np.concatenate([np.arange(p["start"], p["stop"]) for p in parts])
+        else:
+            index = np.array([], dtype=np.int64)
+
+        mask = self._row_filter_mask(filters, index)
+        if mask is not None:
+            index = np.arange(self.n_rows)[index][mask]
+
+        rows = np.asarray(self.array("_row")[index])
+        if not original_order:
+            order = slice(None)
+        elif isinstance(index, slice):
+            order = np.asarray(self.array("_pos"))
+        else:
+            order = np.argsort(rows, kind="stable")
+        df = pd.DataFrame({name: self._column(name, index) for name in columns})
+        df = df.iloc[order]
+        df.index = pd.Index(rows[order])
+        return df
+
+    def take(self, positions: Sequence[int], columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Rows at the given original positions, indexed by those positions."""
+        positions = np.asarray(positions, dtype=np.int64)
+        stored = np.asarray(self.array("_pos")[positions])
+        columns = list(columns) if columns is not None else self.columns
+        df = pd.DataFrame({name: self._column(name, stored) for name in columns})
+        df.index = pd.Index(positions)
+        return df
+
+
+def _open_version(path: Path):
+    """Metadata and every array of one store version, mapped together."""
+    meta = json.loads((path / "_meta.json").read_text())
+    if meta["version"] != FORMAT_VERSION:
+        raise ValueError(f"unsupported column store version: {meta['version']}")
+    names = [*meta["columns"], "_row", "_pos"]
+    return path, meta, {name: np.load(path / f"{name}.npy", mmap_mode="r") for name in names}
+
+
+def _as_set(value) -> set:
+    if isinstance(value, (list, tuple, set, frozenset, np.ndarray, pd.Index)):
+        return set(_to_json_value(v) for v in value)
+    return {_to_json_value(value)}
+
+
+def open_modeling_store(
+    csv_path: Path = MODELING_CSV,
+    store_path: Path = MODELING_STORE,
+) -> ColumnStore:
+    """
+    Columnar view of the modeling CSV, (re)built when the CSV has changed.
+
+    Stage 03 writes the store directly; this fallback only pays the CSV
+    parse once per CSV version.
+    """
+    fingerprint = source_fingerprint(csv_path)
+    try:
+        store = ColumnStore(store_path)
+    except (FileNotFoundError, ValueError):  # not built yet, or an older format
+        store = None
+    if (
+        store is not None
+        and store.meta.get("source") == fingerprint
+        and store.meta.get("schema_version") == SCHEMA_VERSION
+    ):
+        return store
+    df = apply_schema(pd.read_csv(csv_path), MODELING_SCHEMA)
+    write_store(df, store_path, source=fingerprint, schema_version=SCHEMA_VERSION)
+    return ColumnStore(store_path)
+
+
+def read_modeling_dataset(
+    columns: Optional[Iterable[str]] = None,
+    filters: Optional[Dict[str, object]] = None,
+) -> pd.DataFrame:
+    """
+    Drop-in for `pd.read_csv("data/obesity_overweight_modeling.csv")`, typed
+    by `src.schema.MODELING_SCHEMA` (categorical features, narrow numerics).
+    """
+    df = open_modeling_store().read(columns=columns, filters=filters)
+    return df.reset_index(drop=True)
+
+
+def sample_modeling_rows(
+    n: int = 1,
+    random_state: int = 7,
+    columns: Optional[Iterable[str]] = None,
+) -> pd.DataFrame:
+    """
+    Same rows as `read_modeling_dataset().sample(n, random_state=...)`,
+    read without materialising the rest of the dataset.
+    """
+    store = open_modeling_store()
+    # Mirrors DataFrame.sample: RandomState(seed).choice(len, n, replace=False).
+    positions = np.random.RandomState(random_state).choice(store.n_rows, size=n, replace=False)
+    return store.take(positions, columns)
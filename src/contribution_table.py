@@ -0,0 +1,171 @@
+"""
+Per-category contribution lookup table for the logistic models.
+
+With one-hot `locationabbr` / `stratificationcategory1` /
+`stratification1` and a single (possibly standardised) `yearstart`, a
+subgroup's local contribution is:
+
+- for each categorical column, the coefficient of its category's one-hot
+  feature (0 for a category the encoder never saw, as
+  `handle_unknown="ignore"` encodes it as all zeros);
+- for each numeric column, `coef * (value - mean) / scale`.
+
+`ContributionTable` compiles a registry entry or fitted pipeline into
+those dicts once. Explaining any subgroup, including combinations or
+years that are not in the modeling CSV, is then a few lookups, with no
+sklearn transform and no DataFrame.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.model_registry import CATEGORICAL, NUMERIC
+
+
+@dataclass(frozen=True)
+class SubgroupExplanation:
+    contributions: List[Tuple[str, float]]  # (feature, log-odds), largest |value| first
+    intercept: float
+    logit: float
+    probability: float
+
+
+@dataclass(frozen=True)
+class ContributionTable:
+    intercept: float
+    categorical: Dict[str, Dict[str, Tuple[str, float]]]  # column -> category -> (feature, coef)
+    numeric: Dict[str, Tuple[str, float, float, float]]  # column -> (feature, coef, mean, scale)
+
+    @classmethod
+    def from_params(cls, params: dict, coef, intercept: float) -> "ContributionTable":
+        """Compile preprocessing parameters (see `preprocessor_params`) and coefficients."""
+        coef = np.asarray(coef, dtype=np.float64)
+        names = params["feature_names"]
+        categorical, offset = {}, 0
+        for col in CATEGORICAL:
+            categories = params["categories"][col]
+            categorical[col] = {
+                str(cat): (names[offset + i], float(coef[offset + i])) for i, cat in enumerate(categories)
+            }
+            offset += len(categories)
+        numeric = {}
+        for col in NUMERIC:
+            scaling = params["numeric"][col]
+            numeric[col] = (names[offset], float(coef[offset]), float(scaling["mean"]), float(scaling["scale"]))
+            offset += 1
+        return cls(float(intercept), categorical, numeric)
+
+    @classmethod
+    def from_model(cls, model) -> "ContributionTable":
+        """From a `RegisteredModel` (registry metadata + coefficients only)."""
+        return cls.from_params(model.meta, model.coef, model.intercept)
+
+    @classmethod
+    def from_pipeline(cls, pipe) -> "ContributionTable":
+        """From a fitted preprocess + LogisticRegression sklearn Pipeline."""
+        from src.model_registry import _pipeline_meta
+
+        meta, coef = _pipeline_meta(pipe)
+        return cls.from_params(meta, coef, meta["intercept"])
+
+    def contributions(self, subgroup: Mapping[str, object]) -> List[Tuple[str, float]]:
+        """
+        (feature, contribution) for every nonzero term, in design-matrix
+        order. Zero terms (unseen categories, zero coefficients, a year at
+        the mean) are dropped here, by `explain_batch` and by `Scorer.explain`.
+        """
+        terms = []
+        for col, lookup in self.categorical.items():
+            hit = lookup.get(str(subgroup[col]))
+            if hit is not None and hit[1] != 0:
+                terms.append(hit)
+        for col, (feature, coef, mean, scale) in self.numeric.items():
+            contribution = coef * (float(subgroup[col]) - mean) / scale
+            if contribution != 0:
+                terms.append((feature, contribution))
+        return terms
+
+    def logit(self, subgroup: Mapping[str, object]) -> float:
+        return self.intercept + sum(c for _, c in self.contributions(subgroup))
+
+    def predict_proba(self, subgroup: Mapping[str, object]) -> float:
+        return 1 / (1 + math.exp(-self.logit(subgroup)))
+
+    def explain(self, subgroup: Mapping[str, object], k: Optional[int] = None) -> SubgroupExplanation:
+        terms = self.contributions(subgroup)
+        logit = self.intercept + sum(c for _, c in terms)
+        ranked = sorted(terms, key=lambda t: -abs(t[1]))
+        return SubgroupExplanation(
+            contributions=ranked if k is None else ranked[:k],
+            intercept=self.intercept,
+            logit=logit,
+            probability=1 / (1 + math.exp(-logit)),
+        )
+
+    def explain_batch(self, subgroups: Sequence[Mapping[str, object]]) -> List[SubgroupExplanation]:
+        """`explain` for many subgroups, with the arithmetic and ranking vectorized over the batch."""
+        n = len(subgroups)
+        columns = len(self.categorical) + len(self.numeric)
+        values = np.zeros((n, columns))
+        features = np.full((n, columns), None, dtype=object)
+        for j, (col, lookup) in enumerate(self.categorical.items()):
+            for i, subgroup in enumerate(subgroups):
+                hit = lookup.get(str(subgroup[col]))
+                if hit is not None:
+                    features[i, j], values[i, j] = hit
+        for j, (col, (feature, coef, mean, scale)) in enumerate(self.numeric.items(), len(self.categorical)):
+            values[:, j] = coef * (np.array([float(s[col]) for s in subgroups]) - mean) / scale
+            features[:, j] = feature
+
+        logits = self.intercept + values.sum(axis=1)
+        probabilities = 1 / (1 + np.exp(-logits))
+        order = np.argsort(-np.abs(values), axis=1, kind="stable")
+        ranked_values = np.take_along_axis(values, order, axis=1)
+        ranked_features = np.take_along_axis(features, order, axis=1)
+        return [
+            SubgroupExplanation(
+                contributions=[
+                    (f, float(v)) for f, v in zip(ranked_features[i], ranked_values[i]) if f is not None and v != 0
+                ],
+                intercept=self.intercept,
+                logit=float(logits[i]),
+                probability=float(probabilities[i]),
+            )
+            for i in range(n)
+        ]
+
+
+def parse_subgroup(items: Iterable[str]) -> Dict[str, str]:
+    """`["locationabbr=TX", "stratificationcategory1=Sex", "stratification1=Male", "yearstart=2030"]` -> dict."""
+    subgroup = {}
+    for item in items:
+        col, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"expected column=value, got {item!r}")
+        subgroup[col.strip()] = value.strip()
+    missing = [c for c in (*CATEGORICAL, *NUMERIC) if c not in subgroup]
+    if missing:
+        raise ValueError(f"subgroup is missing {', '.join(missing)}")
+    return subgroup
+
+
+def print_subgroup_explanation(model, items: Iterable[str], outcome: str, version: str) -> SubgroupExplanation:
+    """Subgroup mode of the local explain scripts: explain one `column=value` subgroup."""
+    subgroup = parse_subgroup(items)
+    expl = ContributionTable.from_model(model).explain(subgroup)
+
+    print(f"\n=== SUBGROUP EXPLANATION ({version.upper()}): {outcome.upper()} ===")
+    for col in (*CATEGORICAL, *NUMERIC):
+        print(f"{col}: {subgroup[col]}")
+    print("\nContributing features:")
+    width = max((len(f) for f, _ in expl.contributions), default=0)
+    for feature, contribution in expl.contributions:
+        print(f"  {feature:{width}s} {contribution:+.4f}")
+    print("\nBase intercept (log-odds):", round(expl.intercept, 4))
+    print("Sum of contributions:", round(expl.logit - expl.intercept, 4))
+    print("Final predicted probability:", round(expl.probability, 4))
+    return expl
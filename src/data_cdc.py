@@ -1,10 +1,33 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+
+from src.cdc_cache import ResponseCache
+from src.cdc_ingest import ColumnBuffers, ColumnType, iter_chunks, iter_json_array
+
+# Socrata serves large result sets fine when they are split into pages;
+# a single 100k-row response is what used to hit the 30s timeout.
+DEFAULT_PAGE_SIZE = 20000
+DEFAULT_MAX_WORKERS = 4
+
+# Paging is only stable with a total ordering; the row id is always present.
+DEFAULT_ORDER = ":id"
+
+# Socrata answers 429 when throttling and 5xx on transient backend trouble.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Bytes per read when a page body is streamed.
+STREAM_CHUNK = 1 << 18
 
 
 @dataclass(frozen=True)
@@ -15,30 +38,423 @@ class CDCQuery:
     Dataset used (Phase 1):
     - CDC Nutrition, Physical Activity, and Obesity (BRFSS-derived)
     Endpoint: https://data.cdc.gov/resource/hn4x-zwk7.json
+
+    `offset` and `order` map to `$offset` / `$order` and are what
+    `pages()` uses to split a large query into independent requests.
+    `select` and `group` map to `$select` / `$group`, so projections and
+    aggregates run server-side (see `select_columns` / `value_counts_query`).
     """
     base_url: str = "https://data.cdc.gov/resource/hn4x-zwk7.json"
     limit: int = 5000
-    where: Optional[str] = None  
+    where: Optional[str] = None
+    offset: int = 0
+    order: Optional[str] = None
+    select: Optional[str] = None
+    group: Optional[str] = None
+
+    def params(self) -> dict:
+        params = {"$limit": self.limit}
+        if self.select:
+            params["$select"] = self.select
+        if self.where:
+            params["$where"] = self.where
+        if self.group:
+            params["$group"] = self.group
+        if self.offset:
+            params["$offset"] = self.offset
+        if self.order:
+            params["$order"] = self.order
+        return params
+
+    def pages(self, page_size: int = DEFAULT_PAGE_SIZE) -> List["CDCQuery"]:
+        """Split this query into `$offset` pages covering the same rows."""
+        if page_size <= 0:
+            raise ValueError("page_size must be positive")
+        if self.limit <= page_size:
+            return [self]
+
+        # Grouped results have no :id; order by the group keys instead.
+        order = self.order or self.group or DEFAULT_ORDER
+        pages = []
+        for start in range(0, self.limit, page_size):
+            pages.append(
+                replace(
+                    self,
+                    limit=min(page_size, self.limit - start),
+                    offset=self.offset + start,
+                    order=order,
+                )
+            )
+        return pages
+
+
+# pandas aggregation names -> SoQL aggregate functions.
+SOQL_AGGREGATES = {
+    "mean": "avg",
+    "avg": "avg",
+    "sum": "sum",
+    "count": "count",
+    "min": "min",
+    "max": "max",
+}
+
+
+def select_columns(query: CDCQuery, columns: Sequence[str]) -> CDCQuery:
+    """SoQL equivalent of `df[columns]`: only these fields are transferred."""
+    return replace(query, select=", ".join(columns))
+
+
+def value_counts_query(
+    query: CDCQuery,
+    column: str,
+    count_name: str = "n",
+    dropna: bool = True,
+) -> CDCQuery:
+    """SoQL equivalent of `df[column].value_counts(dropna=dropna)`."""
+    where = query.where
+    if dropna:
+        not_null = f"{column} IS NOT NULL"
+        where = f"({where}) AND {not_null}" if where else not_null
+    return replace(
+        query,
+        select=f"{column}, count(*) AS {count_name}",
+        where=where,
+        group=column,
+        order=f"{count_name} DESC, {column}",
+    )
+
+
+def aggregate_query(
+    query: CDCQuery,
+    by: Sequence[str],
+    aggs: Dict[str, Tuple[str, str]],
+) -> CDCQuery:
+    """
+    SoQL equivalent of `df.groupby(by).agg(**aggs)`.
+
+    `aggs` maps output names to `(column, func)` pairs, with `func` one of
+    the pandas names in `SOQL_AGGREGATES` ("mean", "sum", "count", ...).
+    """
+    exprs = list(by)
+    for name, (column, func) in aggs.items():
+        if func not in SOQL_AGGREGATES:
+            raise ValueError(f"unsupported aggregate: {func!r}")
+        target = "*" if func == "count" and column == "*" else column
+        exprs.append(f"{SOQL_AGGREGATES[func]}({target}) AS {name}")
+    return replace(query, select=", ".join(exprs), group=", ".join(by))
+
+
+@dataclass(frozen=True)
+class RequestRecord:
+    url: str
+    status: int
+    attempts: int
+    latency_s: float
+    bytes: int
+
+
+@dataclass
+class RequestStats:
+    """Thread-safe per-request counters collected by a `CDCSession`."""
+    records: List[RequestRecord] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, record: RequestRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.records.clear()
+
+    def summary(self) -> dict:
+        with self._lock:
+            records = list(self.records)
+
+        latencies = sorted(r.latency_s for r in records)
+
+        def pct(p):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        return {
+            "requests": len(records),
+            "retries": sum(r.attempts - 1 for r in records),
+            "bytes": sum(r.bytes for r in records),
+            "total_latency_s": sum(latencies),
+            "p50_latency_s": pct(0.50),
+            "p99_latency_s": pct(0.99),
+            "max_latency_s": latencies[-1] if latencies else 0.0,
+        }
+
+
+class CDCSession:
+    """
+    Reusable HTTP session for the Socrata API.
+
+    Keeps connections alive across pages and calls, retries 429/5xx and
+    connection errors with exponential backoff (honoring `Retry-After`,
+    both capped at `max_backoff`), and records latency and bytes for
+    every request in `stats`.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_MAX_WORKERS,
+        max_retries: int = 5,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 60.0,
+        timeout: float = 30.0,
+    ):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.stats = RequestStats()
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def __enter__(self) -> "CDCSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._session.close()
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response]) -> float:
+        if response is not None:
+            retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                # A server-chosen delay, capped like our own.
+                return min(retry_after, self.max_backoff)
+        return min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+
+    def _send(self, url: str, params: Optional[dict], stream: bool) -> Tuple[requests.Response, int]:
+        """
+        The response and the number of attempts it took, retrying as
+        configured. The caller records a request that got a response; one
+        that never did is recorded here, with status 0, before the error
+        propagates.
+        """
+        start = time.perf_counter()
+        attempt = 0
+        response = None
+        try:
+            while True:
+                response = None
+                try:
+                    response = self._session.get(url, params=params, timeout=self.timeout, stream=stream)
+                    if response.status_code not in RETRY_STATUSES:
+                        return response, attempt + 1
+                except (requests.ConnectionError, requests.Timeout):
+                    if attempt >= self.max_retries:
+                        raise
+                if response is not None:
+                    if attempt >= self.max_retries:
+                        return response, attempt + 1
+                    response.close()
+                time.sleep(self._backoff(attempt, response))
+                attempt += 1
+        finally:
+            if response is None:
+                self.stats.add(
+                    RequestRecord(
+                        url=url,
+                        status=0,
+                        attempts=attempt + 1,
+                        latency_s=time.perf_counter() - start,
+                        bytes=0,
+                    )
+                )
+
+    def get(self, url: str, params: Optional[dict] = None) -> requests.Response:
+        start = time.perf_counter()
+        response, attempts = self._send(url, params, stream=False)
+        self.stats.add(
+            RequestRecord(
+                url=url,
+                status=response.status_code,
+                attempts=attempts,
+                latency_s=time.perf_counter() - start,
+                bytes=len(response.content),
+            )
+        )
+        response.raise_for_status()
+        return response
+
+    def stream(self, url: str, params: Optional[dict] = None, chunk_size: int = STREAM_CHUNK) -> Iterator[bytes]:
+        """
+        The response body in chunks as it arrives, so callers can parse
+        while the rest downloads. The request is recorded once the body has
+        been read; its latency is time to the last byte.
+        """
+        start = time.perf_counter()
+        response, attempts = self._send(url, params, stream=True)
+        n_bytes = 0
+        try:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size):
+                n_bytes += len(chunk)
+                yield chunk
+        finally:
+            response.close()
+            self.stats.add(
+                RequestRecord(
+                    url=url,
+                    status=response.status_code,
+                    attempts=attempts,
+                    latency_s=time.perf_counter() - start,
+                    bytes=n_bytes,
+                )
+            )
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+_default_session: Optional[CDCSession] = None
+_default_session_lock = threading.Lock()
+
+
+def default_session() -> CDCSession:
+    """Process-wide session shared by `fetch_cdc_rows` calls."""
+    global _default_session
+    with _default_session_lock:
+        if _default_session is None:
+            _default_session = CDCSession()
+        return _default_session
+
+
+def iter_page_body(
+    query: CDCQuery,
+    session: Optional[CDCSession] = None,
+    cache: Optional[ResponseCache] = None,
+    refresh: bool = False,
+) -> Iterator[bytes]:
+    """
+    Raw JSON body for one page in chunks, served from `cache` when
+    possible and otherwise streamed from the API as it downloads.
+    """
+    if cache is not None and not refresh:
+        body = cache.get(query)
+        if body is not None:
+            yield from iter_chunks(body)
+            return
+
+    session = session or default_session()
+    received = []
+    for chunk in session.stream(query.base_url, params=query.params()):
+        if cache is not None:
+            received.append(chunk)
+        yield chunk
+
+    if cache is not None:
+        cache.put(query, b"".join(received))
+
+
+def fetch_page_body(
+    query: CDCQuery,
+    session: Optional[CDCSession] = None,
+    cache: Optional[ResponseCache] = None,
+    refresh: bool = False,
+) -> bytes:
+    """Raw JSON body for one page, served from `cache` when possible."""
+    return b"".join(iter_page_body(query, session, cache, refresh))
+
+
+def count_rows(query: CDCQuery, session: Optional[CDCSession] = None) -> int:
+    """Number of rows matching `query.where`, counted server-side."""
+    q = replace(
+        query,
+        select="count(*) AS n",
+        group=None,
+        order=None,
+        offset=0,
+        limit=1,
+    )
+    rows = json.loads(fetch_page_body(q, session))
+    return int(rows[0]["n"]) if rows else 0
+
+
+def fetch_cdc_rows(
+    query: CDCQuery,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    session: Optional[CDCSession] = None,
+    cache: Optional[ResponseCache] = None,
+    refresh: bool = False,
+    schema: Optional[Dict[str, ColumnType]] = None,
+) -> pd.DataFrame:
+    """
+    Fetch all rows of `query` as a DataFrame.
+
+    With `schema` (column -> kind or `ColumnSpec`, normally
+    `src.schema.CDC_SCHEMA`) each page is parsed into column buffers
+    while it downloads instead of into a list of dicts, and every column
+    is converted to its type once, so the frame arrives already typed.
+    """
+    session = session or default_session()
+    pages = query.pages(page_size)
+
+    if schema is not None:
+        def fetch(page: CDCQuery) -> ColumnBuffers:
+            buffers = ColumnBuffers(schema)
+            buffers.extend(iter_json_array(iter_page_body(page, session, cache, refresh)))
+            return buffers
+    else:
+        def fetch(page: CDCQuery) -> bytes:
+            return fetch_page_body(page, session, cache, refresh)
 
+    if len(pages) == 1:
+        results = iter([fetch(pages[0])])
+        pool = None
+    else:
+        # map() yields results in submission order, so rows come back in
+        # `$order` order no matter which page finishes first.
+        pool = ThreadPoolExecutor(max_workers=min(max_workers, len(pages)))
+        results = pool.map(fetch, pages)
 
-def fetch_cdc_rows(query: CDCQuery) -> pd.DataFrame:
-    params = {"$limit": query.limit}
-    if query.where:
-        params["$where"] = query.where
+    try:
+        if schema is not None:
+            buffers = ColumnBuffers(schema)
+            for page_buffers in results:
+                buffers.update(page_buffers)
+            return buffers.to_frame()
 
-    r = requests.get(query.base_url, params=params, timeout=30)
-    r.raise_for_status()
+        rows = []
+        for body in results:
+            rows.extend(json.loads(body))
+    finally:
+        if pool is not None:
+            pool.shutdown()
 
-    rows = r.json()
     df = pd.DataFrame(rows)
 
     return df
 
 
 if __name__ == "__main__":
-    # Small smoke test
+    # Small smoke test (run as: python -m src.data_cdc)
     q = CDCQuery(limit=10)
     df = fetch_cdc_rows(q)
     print("Rows:", len(df))
     print("Columns:", list(df.columns))
     print(df.head(3).to_string(index=False))
+    print("Requests:", default_session().stats.summary())
@@ -0,0 +1,157 @@
+"""
+Cached sparse design matrix for the modeling dataset.
+
+The "preprocess" step of every model (one-hot `locationabbr`,
+`stratificationcategory1`, `stratification1`, then `yearstart` passed
+through or standardised) is fully described by its fitted parameters, as
+recorded by `src.model_registry.preprocessor_params`. The encoded CSR
+matrix for the whole dataset is stored once per (dataset, parameters)
+under `data/design_cache/<key>/`:
+
+    meta.json                           shape, feature names, parameters
+    data.npy, indices.npy, indptr.npy   CSR arrays (memory-mapped on load)
+
+Rows are in `read_modeling_dataset()` order, so a stage slices out its
+train/test or example rows by position. Models whose preprocessing
+learned the same parameters (e.g. the v1 obesity and overweight models)
+share one entry.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from src.model_registry import CATEGORICAL, NUMERIC, dataset_fingerprint
+
+FORMAT_VERSION = 1
+DEFAULT_CACHE_DIR = Path("data") / "design_cache"
+
+
+@dataclass(frozen=True)
+class DesignMatrix:
+    key: str
+    X: sparse.csr_matrix
+    feature_names: List[str]
+
+
+def design_key(params: dict, data_fingerprint: dict) -> str:
+    payload = {
+        "format": FORMAT_VERSION,
+        "data": data_fingerprint["sha256"],
+        "schema_version": data_fingerprint.get("schema_version"),
+        "categories": params["categories"],
+        "numeric": params["numeric"],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def encode_features(df: pd.DataFrame, params: dict) -> sparse.csr_matrix:
+    """
+    What the fitted ColumnTransformer's `transform` returns, without sklearn.
+
+    Values outside the fitted categories encode as all zeros
+    (`handle_unknown="ignore"`); numeric columns are `(x - mean) / scale`.
+    """
+    n = len(df)
+    cols, vals = [], []
+    offset = 0
+    for name in CATEGORICAL:
+        categories = params["categories"][name]
+        codes = pd.Categorical(df[name], categories=categories).codes.astype(np.int64)
+        cols.append(np.where(codes >= 0, offset + codes, -1))
+        vals.append(np.ones(n))
+        offset += len(categories)
+    for name in NUMERIC:
+        scaling = params["numeric"][name]
+        values = df[name].to_numpy(dtype=np.float64)
+        cols.append(np.full(n, offset))
+        vals.append((values - scaling["mean"]) / scaling["scale"])
+        offset += 1
+
+    cols = np.column_stack(cols)
+    vals = np.column_stack(vals)
+    # Row-major, so column indices come out sorted within each row.
+    present = (cols >= 0) & (vals != 0)
+    indptr = np.r_[0, np.cumsum(present.sum(axis=1))]
+    return sparse.csr_matrix(
+        (vals[present], cols[present].astype(np.int32), indptr.astype(np.int32)),
+        shape=(n, offset),
+    )
+
+
+def _write(path: Path, X: sparse.csr_matrix, meta: dict) -> None:
+    tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    tmp.mkdir(parents=True)
+    np.save(tmp / "data.npy", X.data)
+    np.save(tmp / "indices.npy", X.indices)
+    np.save(tmp / "indptr.npy", X.indptr)
+    (tmp / "meta.json").write_text(json.dumps(meta, indent=2))
+    try:
+        os.replace(tmp, path)
+    except OSError:
+        # Another stage cached the same matrix first; it is identical.
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _read(path: Path) -> DesignMatrix:
+    meta = json.loads((path / "meta.json").read_text())
+    arrays = [np.load(path / f"{name}.npy", mmap_mode="r") for name in ("data", "indices", "indptr")]
+    X = sparse.csr_matrix(tuple(arrays), shape=tuple(meta["shape"]), copy=False)
+    return DesignMatrix(meta["key"], X, list(meta["feature_names"]))
+
+
+def open_cached(key: str, cache_dir: Path = DEFAULT_CACHE_DIR) -> DesignMatrix:
+    """
+    A cache entry by key, memory-mapped. Worker processes use this to
+    share one copy of the matrix through the page cache.
+    """
+    return _read(Path(cache_dir) / key)
+
+
+def load_design_matrix(
+    params: dict,
+    df: Optional[pd.DataFrame] = None,
+    data_fingerprint: Optional[dict] = None,
+    cache_dir: Path = DEFAULT_CACHE_DIR,
+) -> DesignMatrix:
+    """
+    Encoded modeling dataset for preprocessing `params` (a registry entry's
+    meta works too), from the cache or encoded and cached now.
+
+    `df` is only read on a cache miss; by default that is
+    `read_modeling_dataset()`.
+    """
+    fingerprint = data_fingerprint or dataset_fingerprint()
+    key = design_key(params, fingerprint)
+    path = Path(cache_dir) / key
+    if (path / "meta.json").exists():
+        return _read(path)
+
+    if df is None:
+        from src.column_store import read_modeling_dataset
+
+        df = read_modeling_dataset()
+    X = encode_features(df, params)
+    meta = {
+        "format": FORMAT_VERSION,
+        "key": key,
+        "shape": list(X.shape),
+        "feature_names": list(params["feature_names"]),
+        "categories": params["categories"],
+        "numeric": params["numeric"],
+        "data": fingerprint,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _write(path, X, meta)
+    return DesignMatrix(key, X, list(params["feature_names"]))
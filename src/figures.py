@@ -0,0 +1,190 @@
+"""
+Figure rendering for the trainers and explainers.
+
+Scripts describe each figure as a `FigureSpec` (ROC points, a confusion
+matrix, a bar chart of top features) instead of drawing with pyplot.
+`render_figures` then:
+
+- skips a figure whose PNG already carries the same spec hash (stored
+  as a PNG text chunk, so parallel pipeline stages need no shared
+  manifest);
+- renders the rest with the Agg canvas, reusing one `Figure` per size
+  in each process: in this process when fewer than `POOL_MIN_FIGURES`
+  are stale (a worker's start-up costs more than a figure), otherwise in
+  a pool of `spawn`ed workers, which unlike forked ones inherit no
+  threads or locks from the caller;
+- does nothing when disabled (the scripts' `--no-figures`).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import multiprocessing
+import os
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+RENDER_VERSION = 1
+HASH_KEY = "SpecHash"
+DEFAULT_FIGSIZE = (6.4, 4.8)
+POOL_MIN_FIGURES = 4
+
+_figures: Dict[Tuple[float, float], object] = {}
+
+
+@dataclass(frozen=True)
+class FigureSpec:
+    kind: str  # "roc", "confusion" or "barh"
+    path: str
+    title: str
+    arrays: Dict[str, np.ndarray] = field(default_factory=dict)
+    options: Dict[str, object] = field(default_factory=dict)
+    figsize: Tuple[float, float] = DEFAULT_FIGSIZE
+
+    def digest(self) -> str:
+        """Hash of everything drawn, so unchanged figures can be skipped."""
+        h = hashlib.sha256()
+        header = {
+            "version": RENDER_VERSION,
+            "kind": self.kind,
+            "title": self.title,
+            "options": self.options,
+            "figsize": list(self.figsize),
+        }
+        h.update(json.dumps(header, sort_keys=True, default=str).encode())
+        for name in sorted(self.arrays):
+            values = np.asarray(self.arrays[name])
+            h.update(f"{name}:{values.dtype.str}:{values.shape}".encode())
+            h.update(values.tobytes() if values.dtype != object else json.dumps(values.tolist()).encode())
+        return h.hexdigest()
+
+
+def roc_figure(path: str, fpr, tpr, auc: float, title: str) -> FigureSpec:
+    return FigureSpec(
+        "roc", path, title, {"fpr": np.asarray(fpr), "tpr": np.asarray(tpr)}, {"auc": float(auc)}
+    )
+
+
+def confusion_figure(path: str, cm, title: str) -> FigureSpec:
+    return FigureSpec("confusion", path, title, {"cm": np.asarray(cm)})
+
+
+def barh_figure(path: str, labels: Sequence[str], values, title: str, xlabel: str, figsize=(8, 6)) -> FigureSpec:
+    return FigureSpec(
+        "barh",
+        path,
+        title,
+        {"labels": np.asarray(list(labels), dtype=object), "values": np.asarray(values, dtype=np.float64)},
+        {"xlabel": xlabel},
+        tuple(figsize),
+    )
+
+
+def _draw_roc(fig, spec: FigureSpec) -> None:
+    ax = fig.add_subplot()
+    ax.plot(spec.arrays["fpr"], spec.arrays["tpr"], label=f"AUROC = {spec.options['auc']:.3f}")
+    ax.plot([0, 1], [0, 1], linestyle="--")
+    ax.set_xlabel("False Positive Rate")
+    ax.set_ylabel("True Positive Rate")
+    ax.set_title(spec.title)
+    ax.legend()
+
+
+def _draw_confusion(fig, spec: FigureSpec) -> None:
+    cm = spec.arrays["cm"]
+    ax = fig.add_subplot()
+    image = ax.imshow(cm)
+    ax.set_title(spec.title)
+    fig.colorbar(image, ax=ax)
+    ax.set_xticks([0, 1], ["Pred 0", "Pred 1"])
+    ax.set_yticks([0, 1], ["True 0", "True 1"])
+    for i in range(cm.shape[0]):
+        for j in range(cm.shape[1]):
+            ax.text(j, i, cm[i, j], ha="center", va="center")
+
+
+def _draw_barh(fig, spec: FigureSpec) -> None:
+    ax = fig.add_subplot()
+    ax.barh(list(spec.arrays["labels"]), spec.arrays["values"])
+    ax.invert_yaxis()
+    ax.set_xlabel(spec.options["xlabel"])
+    ax.set_title(spec.title)
+
+
+_DRAW = {"roc": _draw_roc, "confusion": _draw_confusion, "barh": _draw_barh}
+
+
+def _render(spec: FigureSpec) -> str:
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = _figures.get(spec.figsize)
+    if fig is None:
+        fig = _figures[spec.figsize] = Figure(figsize=spec.figsize)
+        FigureCanvasAgg(fig)
+    fig.clear()
+    _DRAW[spec.kind](fig, spec)
+    fig.tight_layout()
+    Path(spec.path).parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(spec.path, format="png", metadata={HASH_KEY: spec.digest()})
+    return spec.path
+
+
+def png_text(path: Path) -> Dict[str, str]:
+    """The tEXt chunks of a PNG file ({} if it is missing or unreadable)."""
+    try:
+        data = Path(path).read_bytes()
+    except OSError:
+        return {}
+    if data[:8] != b"\x89PNG\r\n\x1a\n":
+        return {}
+    found = {}
+    pos = 8
+    while pos + 8 <= len(data):
+        length, kind = struct.unpack(">I4s", data[pos : pos + 8])
+        body = data[pos + 8 : pos + 8 + length]
+        if kind == b"tEXt" and b"\0" in body:
+            key, _, value = body.partition(b"\0")
+            found[key.decode("latin-1")] = value.decode("latin-1")
+        elif kind == b"zTXt" and b"\0" in body:
+            key, _, rest = body.partition(b"\0")
+            found[key.decode("latin-1")] = zlib.decompress(rest[1:]).decode("latin-1")
+        elif kind == b"IEND":
+            break
+        pos += 12 + length
+    return found
+
+
+def is_current(spec: FigureSpec) -> bool:
+    return png_text(Path(spec.path)).get(HASH_KEY) == spec.digest()
+
+
+def render_figures(
+    specs: Sequence[FigureSpec],
+    enabled: bool = True,
+    jobs: Optional[int] = None,
+    force: bool = False,
+) -> Dict[str, List[str]]:
+    """
+    Render `specs`, skipping those already on disk with the same hash.
+    Returns the paths "rendered" and "skipped".
+    """
+    if not enabled:
+        return {"rendered": [], "skipped": [s.path for s in specs]}
+    stale = [force or not is_current(s) for s in specs]
+    pending = [s for s, todo in zip(specs, stale) if todo]
+    skipped = [s.path for s, todo in zip(specs, stale) if not todo]
+    jobs = min(jobs or os.cpu_count() or 1, len(pending))
+    if jobs > 1 and len(pending) >= POOL_MIN_FIGURES:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as pool:
+            rendered = list(pool.map(_render, pending))
+    else:
+        rendered = [_render(s) for s in pending]
+    return {"rendered": rendered, "skipped": skipped}
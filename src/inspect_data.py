@@ -1,6 +1,12 @@
+import sys
+from pathlib import Path
+
 import pandas as pd
 
-from data_cdc import CDCQuery, fetch_cdc_rows
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.data_cdc import CDCQuery, fetch_cdc_rows
 
 
 # def main():
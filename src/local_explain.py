@@ -0,0 +1,185 @@
+"""
+Local explanations for every row of the design matrix at once.
+
+For a linear model a row's contribution vector is `x * coef`. On the
+CSR matrix that is `data * coef[indices]` with the matrix's own sparsity,
+so nothing is densified. Each row keeps its `k` largest contributions by
+absolute value. Rows are padded to the widest row (4 nonzeros for the
+one-hot + year design), and `np.argpartition` picks the top k before
+only those k are sorted. Rows are processed in blocks to bound memory.
+
+The result is stored as one `.npz` with, per row: its position in the
+modeling dataset, top-k feature indices (-1 = padding), their
+contributions, the logit and the probability. The intercept and feature
+names are stored once.
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+DEFAULT_TOP_K = 5
+BLOCK_ROWS = 1 << 20
+
+
+@dataclass(frozen=True)
+class LocalExplanations:
+    rows: np.ndarray  # (n,) positions in read_modeling_dataset() order
+    features: np.ndarray  # (n, k) feature indices, -1 where a row has < k nonzeros
+    contributions: np.ndarray  # (n, k) float32, by decreasing |contribution|
+    logit: np.ndarray  # (n,)
+    probability: np.ndarray  # (n,)
+    intercept: float
+    feature_names: List[str]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per (row, rank) with a feature; long format for inspection."""
+        n, k = self.features.shape
+        keep = self.features >= 0
+        names = np.asarray(self.feature_names, dtype=object)
+        return pd.DataFrame(
+            {
+                "row": np.repeat(self.rows, k)[keep.ravel()],
+                "rank": np.tile(np.arange(1, k + 1), n)[keep.ravel()],
+                "feature": names[self.features[keep]],
+                "contribution": self.contributions[keep],
+                "logit": np.repeat(self.logit, k)[keep.ravel()],
+                "probability": np.repeat(self.probability, k)[keep.ravel()],
+            }
+        )
+
+
+def contribution_matrix(X: sparse.csr_matrix, coef: np.ndarray) -> sparse.csr_matrix:
+    """`X` scaled column-wise by `coef`, same sparsity pattern."""
+    coef = np.asarray(coef, dtype=np.float64)
+    return sparse.csr_matrix(
+        (np.asarray(X.data) * coef[np.asarray(X.indices)], X.indices, X.indptr), shape=X.shape
+    )
+
+
+def _top_k_block(C: sparse.csr_matrix, k: int):
+    indptr = np.asarray(C.indptr)
+    lengths = np.diff(indptr)
+    n = len(lengths)
+    width = max(int(lengths.max(initial=0)), 1)
+
+    # Pad each row's nonzeros into a (n, width) block; padding sorts last.
+    slot = np.arange(len(C.data)) - np.repeat(indptr[:-1], lengths)
+    row = np.repeat(np.arange(n), lengths)
+    values = np.zeros((n, width))
+    cols = np.full((n, width), -1, dtype=np.int32)
+    magnitude = np.full((n, width), -1.0)
+    values[row, slot] = C.data
+    cols[row, slot] = C.indices
+    magnitude[row, slot] = np.abs(C.data)
+
+    if k < width:
+        part = np.argpartition(-magnitude, k - 1, axis=1)[:, :k]
+    else:
+        part = np.broadcast_to(np.arange(width), (n, width))
+    order = np.take_along_axis(
+        part, np.argsort(-np.take_along_axis(magnitude, part, axis=1), axis=1, kind="stable"), axis=1
+    )
+    top_cols = np.take_along_axis(cols, order, axis=1)
+    top_vals = np.take_along_axis(values, order, axis=1)
+    if top_cols.shape[1] < k:
+        pad = k - top_cols.shape[1]
+        top_cols = np.pad(top_cols, ((0, 0), (0, pad)), constant_values=-1)
+        top_vals = np.pad(top_vals, ((0, 0), (0, pad)))
+    top_vals[top_cols < 0] = 0.0
+    return top_cols, top_vals.astype(np.float32), values.sum(axis=1)
+
+
+def explain_rows(
+    X: sparse.csr_matrix,
+    coef: np.ndarray,
+    intercept: float,
+    feature_names: List[str],
+    k: int = DEFAULT_TOP_K,
+    rows: Optional[np.ndarray] = None,
+    block_rows: int = BLOCK_ROWS,
+) -> LocalExplanations:
+    """Top-`k` contributions, logit and probability for every row of `X`."""
+    n = X.shape[0]
+    features = np.empty((n, k), dtype=np.int32)
+    contributions = np.empty((n, k), dtype=np.float32)
+    logit = np.empty(n)
+    for start in range(0, n, block_rows):
+        stop = min(start + block_rows, n)
+        C = contribution_matrix(X[start:stop], coef)
+        features[start:stop], contributions[start:stop], sums = _top_k_block(C, k)
+        logit[start:stop] = intercept + sums
+    return LocalExplanations(
+        rows=np.arange(n) if rows is None else np.asarray(rows),
+        features=features,
+        contributions=contributions,
+        logit=logit,
+        probability=1 / (1 + np.exp(-logit)),
+        intercept=float(intercept),
+        feature_names=list(feature_names),
+    )
+
+
+def save_explanations(expl: LocalExplanations, path: Path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    index_dtype = np.int16 if len(expl.feature_names) < np.iinfo(np.int16).max else np.int32
+    with open(path, "wb") as f:
+        np.savez(
+            f,
+            rows=expl.rows.astype(np.int64),
+            features=expl.features.astype(index_dtype),
+            contributions=expl.contributions,
+            logit=expl.logit.astype(np.float32),
+            probability=expl.probability.astype(np.float32),
+            intercept=np.float64(expl.intercept),
+            feature_names=np.frombuffer(json.dumps(expl.feature_names).encode(), dtype=np.uint8),
+        )
+    return path
+
+
+def load_explanations(path: Path) -> LocalExplanations:
+    with np.load(path) as z:
+        return LocalExplanations(
+            rows=z["rows"],
+            features=z["features"].astype(np.int32),
+            contributions=z["contributions"],
+            logit=z["logit"],
+            probability=z["probability"],
+            intercept=float(z["intercept"]),
+            feature_names=json.loads(z["feature_names"].tobytes().decode()),
+        )
+
+
+def explain_model(model, k: int = DEFAULT_TOP_K, df: Optional[pd.DataFrame] = None) -> LocalExplanations:
+    """Explanations of every modeling-dataset row for a `RegisteredModel`."""
+    from src.design_matrix import load_design_matrix
+
+    X = load_design_matrix(model.meta, df).X
+    return explain_rows(X, np.asarray(model.coef), model.intercept, model.feature_names, k)
+
+
+def write_model_explanations(model, outcome: str, version: str, k: int = DEFAULT_TOP_K) -> Path:
+    """Batch mode of the local explain scripts: explain every row, save and summarize."""
+    import time
+
+    start = time.perf_counter()
+    expl = explain_model(model, k)
+    seconds = time.perf_counter() - start
+    suffix = "" if version == "v1" else f"_{version}"
+    out = save_explanations(expl, Path(f"reports/tables/{outcome}_local_explanations{suffix}.npz"))
+
+    print(f"\n=== BATCH LOCAL EXPLANATIONS ({version.upper()}): {outcome.upper()} ===")
+    print(f"{len(expl)} rows, top {k} contributions each, in {seconds:.2f}s ({len(expl) / max(seconds, 1e-9) * 60:,.0f} rows/min)")
+    print(expl.to_frame().head(2 * k).round(4).to_string(index=False))
+    print("Saved:", out)
+    return out
@@ -0,0 +1,329 @@
+"""
+Registry of trained models, keyed by outcome and version.
+
+Each entry (e.g. `models/registry/obesity/v2/`) is a versioned
+directory (`src.versioned_dir`): re-registering publishes a new version
+and swaps the entry's `CURRENT` pointer, so a reader never sees a
+missing or half-written model. A version holds:
+
+    meta.json   label, feature names, encoder categories, year scaling,
+                intercept, metrics, data fingerprint, pipeline path
+    coef.npy    coefficient vector, aligned with the feature names
+
+Models trained outside sklearn's Pipeline (the streaming SGD trainer)
+are registered from their coefficients and have no pipeline path.
+
+Explanations only need the coefficients and feature names, so those are
+read from the registry (`coef.npy` is memory-mapped) and the pickled
+sklearn Pipeline is only unpickled when a caller asks for it.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.column_store import MODELING_CSV, source_fingerprint
+from src.schema import SCHEMA_VERSION
+from src.versioned_dir import POINTER, open_current, publish, staging_dir
+
+DEFAULT_REGISTRY = Path("models") / "registry"
+
+# Last sha256 of each fingerprinted file, with the size and mtime it had.
+FINGERPRINT_CACHE = Path("data") / "design_cache" / "fingerprints.json"
+
+CATEGORICAL = ["locationabbr", "stratificationcategory1", "stratification1"]
+NUMERIC = ["yearstart"]
+
+# Models trained before the registry existed: (outcome, version) -> joblib.
+LEGACY_MODELS = {
+    ("obesity", "v1"): ("obesity_high_risk", Path("models") / "logreg_obesity.joblib"),
+    ("obesity", "v2"): ("obesity_high_risk", Path("models") / "logreg_obesity_v2.joblib"),
+    ("overweight", "v1"): ("overweight_high_risk", Path("models") / "logreg_overweight.joblib"),
+    ("overweight", "v2"): ("overweight_high_risk", Path("models") / "logreg_overweight_v2.joblib"),
+}
+
+
+def _version_key(version: str):
+    digits = version.lstrip("v")
+    return (0, int(digits), "") if digits.isdigit() else (1, 0, version)
+
+
+def _is_release(version: str) -> bool:
+    """Plain `vN` versions; variants such as `v2-sgd` are only resolved by name."""
+    return version.startswith("v") and version[1:].isdigit()
+
+
+def _read_fingerprints(path: Path) -> dict:
+    try:
+        return json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def dataset_fingerprint(path: Path = MODELING_CSV, cache: Optional[Path] = FINGERPRINT_CACHE) -> dict:
+    """
+    Content hash of the training data plus the schema it was typed with.
+
+    Hashing reads the whole file, so the digest is kept in `cache` with
+    the file's size and mtime and only recomputed when either changes.
+    """
+    stat = source_fingerprint(path)
+    known = _read_fingerprints(cache).get(str(path), {}) if cache is not None else {}
+    if known.get("size") == stat["size"] and known.get("mtime_ns") == stat["mtime_ns"]:
+        digest = known["sha256"]
+    else:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        digest = h.hexdigest()
+        if cache is not None:
+            entries = {**_read_fingerprints(cache), str(path): {**stat, "sha256": digest}}
+            cache = Path(cache)
+            cache.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache.with_name(f".{cache.name}.tmp-{os.getpid()}")
+            tmp.write_text(json.dumps(entries, indent=2, sort_keys=True) + "\n")
+            os.replace(tmp, cache)
+    return {"path": str(path), "sha256": digest, "schema_version": SCHEMA_VERSION}
+
+
+def _open_entry(path: Path) -> Tuple[dict, np.ndarray]:
+    meta = json.loads((path / "meta.json").read_text())
+    return meta, np.load(path / "coef.npy", mmap_mode="r")
+
+
+class RegisteredModel:
+    """
+    One registry entry. Metadata and coefficients are loaded together, from
+    the version live at first use; the pipeline only when asked for.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._loaded: Optional[Tuple[dict, np.ndarray]] = None
+
+    def _load(self) -> Tuple[dict, np.ndarray]:
+        if self._loaded is None:
+            self._loaded = open_current(self.path, _open_entry)
+        return self._loaded
+
+    def __repr__(self) -> str:
+        return f"RegisteredModel({self.outcome!r}, {self.version!r})"
+
+    @property
+    def meta(self) -> dict:
+        return self._load()[0]
+
+    @property
+    def outcome(self) -> str:
+        return self.meta["outcome"]
+
+    @property
+    def version(self) -> str:
+        return self.meta["version"]
+
+    @property
+    def label(self) -> str:
+        return self.meta["label"]
+
+    @property
+    def feature_names(self) -> List[str]:
+        return list(self.meta["feature_names"])
+
+    @property
+    def metrics(self) -> Dict[str, float]:
+        return dict(self.meta.get("metrics") or {})
+
+    @property
+    def intercept(self) -> float:
+        return float(self.meta["intercept"])
+
+    @property
+    def coef(self) -> np.ndarray:
+        """Read-only, memory-mapped coefficient vector."""
+        return self._load()[1]
+
+    def pipeline(self):
+        """The full fitted sklearn Pipeline (unpickled on every call)."""
+        import joblib
+
+        if self.meta.get("pipeline") is None:
+            raise LookupError(f"{self!r} was trained without an sklearn Pipeline")
+        return joblib.load(self.meta["pipeline"])
+
+
+def preprocessor_params(pre) -> dict:
+    """
+    Everything a fitted "preprocess" ColumnTransformer learned: one-hot
+    categories per column and the (mean, scale) applied to each numeric
+    column (0 and 1 for passthrough), plus the resulting feature names.
+    """
+    encoder = pre.named_transformers_["cat"]
+    scaler = pre.named_transformers_["num"]
+
+    scaled = hasattr(scaler, "scale_")
+    feature_names = list(encoder.get_feature_names_out(CATEGORICAL))
+    feature_names += [f"{c}_scaled" if scaled else c for c in NUMERIC]
+    return {
+        "feature_names": feature_names,
+        "categories": {
+            col: [c.item() if isinstance(c, np.generic) else c for c in cats]
+            for col, cats in zip(CATEGORICAL, encoder.categories_)
+        },
+        "numeric": {
+            col: {
+                "mean": float(scaler.mean_[i]) if scaled else 0.0,
+                "scale": float(scaler.scale_[i]) if scaled else 1.0,
+            }
+            for i, col in enumerate(NUMERIC)
+        },
+    }
+
+
+def _pipeline_meta(pipe) -> Tuple[dict, np.ndarray]:
+    model = pipe.named_steps["model"]
+    meta = preprocessor_params(pipe.named_steps["preprocess"])
+    meta["C"] = float(model.C)
+    meta["solver"] = model.solver
+    meta["intercept"] = float(model.intercept_[0])
+    return meta, np.asarray(model.coef_[0], dtype=np.float64)
+
+
+def register_model(
+    pipe,
+    outcome: str,
+    version: str,
+    label: str,
+    pipeline_path: Path,
+    metrics: Optional[Dict[str, float]] = None,
+    data_fingerprint: Optional[dict] = None,
+    root: Path = DEFAULT_REGISTRY,
+) -> RegisteredModel:
+    """
+    Record a fitted preprocess+LogisticRegression Pipeline saved at
+    `pipeline_path`, replacing any entry for the same outcome/version.
+    """
+    meta, coef = _pipeline_meta(pipe)
+    return register_coefficients(
+        meta,
+        coef,
+        outcome,
+        version,
+        label,
+        pipeline_path=pipeline_path,
+        metrics=metrics,
+        data_fingerprint=data_fingerprint,
+        root=root,
+    )
+
+
+def register_coefficients(
+    meta: dict,
+    coef: np.ndarray,
+    outcome: str,
+    version: str,
+    label: str,
+    pipeline_path: Optional[Path] = None,
+    metrics: Optional[Dict[str, float]] = None,
+    data_fingerprint: Optional[dict] = None,
+    root: Path = DEFAULT_REGISTRY,
+) -> RegisteredModel:
+    """
+    Record a linear model given as `preprocessor_params`-style `meta` (plus
+    "intercept" and any model settings) and its coefficient vector. Models
+    trained without an sklearn Pipeline have no `pipeline_path`.
+    """
+    meta = {
+        "outcome": outcome,
+        "version": version,
+        "label": label,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        **meta,
+        "metrics": {k: float(v) for k, v in (metrics or {}).items()},
+        "data": data_fingerprint,
+        "pipeline": str(pipeline_path) if pipeline_path is not None else None,
+    }
+
+    path = Path(root) / outcome / version
+    tmp = staging_dir(path)
+    np.save(tmp / "coef.npy", np.asarray(coef, dtype=np.float64))
+    (tmp / "meta.json").write_text(json.dumps(meta, indent=2))
+    publish(path, tmp)
+    return RegisteredModel(path)
+
+
+def list_models(outcome: Optional[str] = None, root: Path = DEFAULT_REGISTRY) -> List[RegisteredModel]:
+    """Registered models, by outcome then version."""
+    root = Path(root)
+    if not root.exists():
+        return []
+    found = []
+    for outcome_dir in sorted(p for p in root.iterdir() if p.is_dir()):
+        if outcome is not None and outcome_dir.name != outcome:
+            continue
+        versions = [p for p in outcome_dir.iterdir() if (p / POINTER).exists()]
+        for version_dir in sorted(versions, key=lambda p: _version_key(p.name)):
+            found.append(RegisteredModel(version_dir))
+    return found
+
+
+def resolve_model(
+    outcome: str,
+    version: Optional[str] = None,
+    root: Path = DEFAULT_REGISTRY,
+) -> RegisteredModel:
+    """
+    The model for `outcome` at `version`. If None, the latest plain `vN`
+    version; variants like `v2-sgd` must be asked for by name.
+    """
+    candidates = list_models(outcome, root)
+    if version is not None:
+        candidates = [m for m in candidates if m.path.name == version]
+    else:
+        candidates = [m for m in candidates if _is_release(m.path.name)]
+    if not candidates:
+        wanted = f"{outcome} {version}" if version else outcome
+        raise LookupError(f"no registered model for {wanted} under {root}")
+    return candidates[-1]
+
+
+def import_legacy_models(root: Path = DEFAULT_REGISTRY) -> List[RegisteredModel]:
+    """Register the pre-registry joblib files in `models/` (no metrics)."""
+    import joblib
+
+    fingerprint = dataset_fingerprint() if MODELING_CSV.exists() else None
+    registered = []
+    for (outcome, version), (label, path) in LEGACY_MODELS.items():
+        if path.exists():
+            registered.append(
+                register_model(
+                    joblib.load(path),
+                    outcome,
+                    version,
+                    label,
+                    pipeline_path=path,
+                    data_fingerprint=fingerprint,
+                    root=root,
+                )
+            )
+    return registered
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="List registered models.")
+    parser.add_argument("--import-legacy", action="store_true", help="Register the joblib models in models/ first.")
+    args = parser.parse_args()
+
+    if args.import_legacy:
+        import_legacy_models()
+    for m in list_models():
+        metrics = ", ".join(f"{k}={v:.4f}" for k, v in m.metrics.items()) or "no metrics"
+        print(f"{m.outcome:12s} {m.version:4s} {len(m.coef):4d} features  {metrics}  ({m.meta['pipeline'] or 'no pipeline'})")
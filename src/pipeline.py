@@ -0,0 +1,380 @@
+"""
+Dependency-aware runner for the numbered pipeline scripts.
+
+Each stage declares the files it reads and writes. A stage is skipped
+when its code (the script plus every `src` module it imports), its
+inputs and its outputs all hash the same as after its last successful
+run. Stage order comes from matching inputs to outputs, so independent
+branches (obesity vs overweight, v1 vs v2) run side by side, each script
+in its own process.
+
+Stages that read from the CDC API have no input files; they are treated
+as up to date once run, until `refresh=True` re-runs them (with the
+scripts' own `--refresh`, bypassing the response cache).
+"""
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+DEFAULT_STATE_DIR = Path("reports") / "pipeline"
+DEFAULT_JOBS = min(4, os.cpu_count() or 1)
+
+MODELING_CSV = "data/obesity_overweight_modeling.csv"
+
+
+@dataclass(frozen=True)
+class Stage:
+    script: str
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    external: bool = False  # reads from the CDC API
+
+    @property
+    def name(self) -> str:
+        return Path(self.script).stem
+
+
+def _registry(outcome: str, version: str) -> Tuple[str, ...]:
+    # The entry's CURRENT pointer names a new version on every re-registration.
+    return (f"models/registry/{outcome}/{version}/CURRENT",)
+
+
+def _train(script: str, model: str, label: str, outcome: str, version: str) -> Stage:
+    return Stage(
+        script,
+        inputs=(MODELING_CSV,),
+        outputs=(
+            f"models/{model}.joblib",
+            *_registry(outcome, version),
+            f"reports/figures/roc_{label}.png",
+            f"reports/figures/cm_{label}.png",
+        ),
+    )
+
+
+def _global(script: str, outcome: str, version: str) -> Stage:
+    suffix = "" if version == "v1" else f"_{version}"
+    return Stage(
+        script,
+        inputs=_registry(outcome, version),
+        outputs=(
+            f"reports/tables/{outcome}_global_importance{suffix}.csv",
+            f"reports/figures/global_importance_{outcome}{suffix}.png",
+        ),
+    )
+
+
+def _local(script: str, outcome: str, version: str) -> Stage:
+    # Local explanations only print; their captured log is the artifact.
+    return Stage(script, inputs=(*_registry(outcome, version), MODELING_CSV))
+
+
+STAGES: Tuple[Stage, ...] = (
+    Stage(
+        "scripts/01_profile_cdc_data.py",
+        outputs=("data/cdc_sample_raw.csv", "reports/stage01_profile_summary.json"),
+        external=True,
+    ),
+    Stage("scripts/02_list_questions.py", external=True),
+    Stage("scripts/03_build_outcome_dataset.py", outputs=(MODELING_CSV,), external=True),
+    _train("scripts/04_train_obesity_classifier.py", "logreg_obesity", "obesity_high_risk", "obesity", "v1"),
+    _train(
+        "scripts/04_train_obesity_classifier_v2.py",
+        "logreg_obesity_v2",
+        "obesity_high_risk_v2",
+        "obesity",
+        "v2",
+    ),
+    _train(
+        "scripts/05_train_overweight_classifier.py",
+        "logreg_overweight",
+        "overweight_high_risk",
+        "overweight",
+        "v1",
+    ),
+    _train(
+        "scripts/05_train_overweight_classifier_v2.py",
+        "logreg_overweight_v2",
+        "overweight_high_risk_v2",
+        "overweight",
+        "v2",
+    ),
+    _global("scripts/06_global_explain_obesity.py", "obesity", "v1"),
+    _global("scripts/06_global_explain_obesity_v2.py", "obesity", "v2"),
+    _global("scripts/07_global_explain_overweight.py", "overweight", "v1"),
+    _global("scripts/07_global_explain_overweight_v2.py", "overweight", "v2"),
+    _local("scripts/08_local_explain_obesity.py", "obesity", "v1"),
+    _local("scripts/08_local_explain_obesity_v2.py", "obesity", "v2"),
+    _local("scripts/09_local_explain_overweight_v2.py", "overweight", "v2"),
+    Stage(
+        "scripts/10_coefficient_stability.py",
+        inputs=(*_registry("obesity", "v2"), *_registry("overweight", "v2"), MODELING_CSV),
+        outputs=(
+            "reports/tables/obesity_coef_stability_v2.csv",
+            "reports/tables/overweight_coef_stability_v2.csv",
+        ),
+    ),
+)
+
+
+def code_files(script: Path, root: Path = PROJECT_ROOT) -> List[Path]:
+    """`script` plus the `src` modules it imports, transitively."""
+    seen: Dict[Path, None] = {}
+    pending = [Path(script)]
+    while pending:
+        path = pending.pop()
+        if path in seen or not path.exists():
+            continue
+        seen[path] = None
+        for node in ast.walk(ast.parse(path.read_text(), filename=str(path))):
+            if isinstance(node, ast.ImportFrom) and node.module:
+                names = [node.module]
+            elif isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            else:
+                continue
+            for name in names:
+                parts = name.split(".")
+                if parts[0] == "src" and len(parts) > 1:
+                    pending.append(root.joinpath(*parts).with_suffix(".py"))
+    return sorted(seen)
+
+
+class FileHasher:
+    """
+    sha256 of file contents, memoised on (size, mtime_ns).
+
+    The memo is persisted with the pipeline state, so an unchanged
+    artifact is only read once across runs.
+    """
+
+    def __init__(self, memo: Optional[Dict[str, dict]] = None):
+        self.memo = dict(memo or {})
+        self._lock = threading.Lock()
+
+    def __call__(self, path: Path) -> Optional[str]:
+        path = Path(path)
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        key = str(path)
+        with self._lock:
+            entry = self.memo.get(key)
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            return entry["sha256"]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        digest = h.hexdigest()
+        with self._lock:
+            self.memo[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+        return digest
+
+
+def dependencies(stages: Sequence[Stage]) -> Dict[str, Set[str]]:
+    """Stage name -> names of the stages producing its inputs."""
+    producer = {out: s.name for s in stages for out in s.outputs}
+    return {
+        s.name: {producer[i] for i in s.inputs if i in producer and producer[i] != s.name}
+        for s in stages
+    }
+
+
+def select_stages(stages: Sequence[Stage], targets: Iterable[str] = ()) -> List[Stage]:
+    """
+    Stages matching `targets` (name or name prefix, e.g. "04" or
+    "06_global_explain_obesity_v2") plus everything upstream of them.
+    """
+    targets = list(targets)
+    if not targets:
+        return list(stages)
+    deps = dependencies(stages)
+    wanted: Set[str] = set()
+    for target in targets:
+        matches = [s.name for s in stages if s.name == target or s.name.startswith(target)]
+        if not matches:
+            raise ValueError(f"no pipeline stage matches {target!r}")
+        wanted.update(matches)
+    pending = list(wanted)
+    while pending:
+        for dep in deps[pending.pop()]:
+            if dep not in wanted:
+                wanted.add(dep)
+                pending.append(dep)
+    return [s for s in stages if s.name in wanted]
+
+
+@dataclass(frozen=True)
+class StageResult:
+    name: str
+    status: str  # "ran", "skipped", "failed", "blocked", "stale" (dry run)
+    seconds: float = 0.0
+
+
+class PipelineRunner:
+    """Runs a set of stages in dependency order, skipping up-to-date ones."""
+
+    def __init__(
+        self,
+        stages: Sequence[Stage] = STAGES,
+        root: Path = PROJECT_ROOT,
+        state_dir: Path = DEFAULT_STATE_DIR,
+    ):
+        self.stages = list(stages)
+        self.root = Path(root)
+        self.state_dir = self.root / state_dir
+        self.state_path = self.state_dir / "state.json"
+        state = json.loads(self.state_path.read_text()) if self.state_path.exists() else {}
+        self.records: Dict[str, dict] = state.get("stages", {})
+        self.hasher = FileHasher(state.get("files"))
+        self._lock = threading.Lock()
+
+    def log_path(self, stage: Stage) -> Path:
+        return self.state_dir / f"{stage.name}.log"
+
+    def fingerprint(self, stage: Stage) -> dict:
+        """Hashes of everything that decides whether `stage` must re-run."""
+        code = code_files(self.root / stage.script, self.root)
+        return {
+            "code": {str(p.relative_to(self.root)): self.hasher(p) for p in code},
+            "inputs": {i: self.hasher(self.root / i) for i in stage.inputs},
+        }
+
+    def output_hashes(self, stage: Stage) -> Dict[str, Optional[str]]:
+        # A stage that writes no files is tracked through its captured log.
+        paths = stage.outputs or (str(self.log_path(stage).relative_to(self.root)),)
+        return {o: self.hasher(self.root / o) for o in paths}
+
+    def is_current(self, stage: Stage) -> bool:
+        fingerprint = self.fingerprint(stage)
+        outputs = self.output_hashes(stage)
+        if None in fingerprint["inputs"].values() or None in outputs.values():
+            return False
+        record = self.records.get(stage.name)
+        if record is None:
+            if stage.external and stage.outputs:
+                # Adopt API pulls made before the runner existed instead of
+                # fetching them again; `refresh` still re-runs them.
+                with self._lock:
+                    self.records[stage.name] = {"fingerprint": fingerprint, "outputs": outputs}
+                    self._save_state()
+                return True
+            return False
+        return record["fingerprint"] == fingerprint and record["outputs"] == outputs
+
+    def _save_state(self) -> None:
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps({"stages": self.records, "files": self.hasher.memo}, indent=2))
+        os.replace(tmp, self.state_path)
+
+    def _run_stage(self, stage: Stage, refresh: bool) -> StageResult:
+        args = [sys.executable, str(self.root / stage.script)]
+        if refresh and stage.external:
+            args.append("--refresh")
+        env = dict(os.environ, MPLBACKEND="Agg", PYTHONUNBUFFERED="1")
+        start = time.perf_counter()
+        proc = subprocess.run(
+            args, cwd=self.root, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+        )
+        seconds = time.perf_counter() - start
+
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.log_path(stage).write_bytes(proc.stdout)
+        missing = [o for o in stage.outputs if not (self.root / o).exists()]
+        if proc.returncode != 0 or missing:
+            if proc.returncode == 0:
+                print(f"[pipeline] {stage.name} did not write {missing}", flush=True)
+            with self._lock:
+                self.records.pop(stage.name, None)
+                self._save_state()
+            return StageResult(stage.name, "failed", seconds)
+
+        record = {"fingerprint": self.fingerprint(stage), "outputs": self.output_hashes(stage)}
+        with self._lock:
+            self.records[stage.name] = record
+            self._save_state()
+        return StageResult(stage.name, "ran", seconds)
+
+    def run(
+        self,
+        targets: Iterable[str] = (),
+        jobs: int = DEFAULT_JOBS,
+        force: bool = False,
+        refresh: bool = False,
+        dry_run: bool = False,
+    ) -> List[StageResult]:
+        """
+        Bring the selected stages up to date.
+
+        A stage becomes ready once every stage it depends on has finished,
+        and is only checked for staleness then, so a re-run that reproduces
+        byte-identical outputs does not invalidate what comes after it.
+        Dependents of a failed stage are reported as "blocked".
+        """
+        stages = select_stages(self.stages, targets)
+        by_name = {s.name: s for s in stages}
+        deps = {name: d & set(by_name) for name, d in dependencies(stages).items()}
+
+        results: Dict[str, StageResult] = {}
+        would_run: Set[str] = set()
+
+        def decide(stage: Stage) -> Optional[StageResult]:
+            """A result if `stage` needs no run, else None."""
+            if any(results[d].status in ("failed", "blocked") for d in deps[stage.name]):
+                return StageResult(stage.name, "blocked")
+            if force or (refresh and stage.external):
+                return None
+            if dry_run and deps[stage.name] & would_run:
+                return None
+            if self.is_current(stage):
+                return StageResult(stage.name, "skipped")
+            return None
+
+        pending = dict(by_name)
+        running = {}
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+            while pending or running:
+                ready = [s for s in pending.values() if deps[s.name] <= set(results)]
+                for stage in ready:
+                    del pending[stage.name]
+                    result = decide(stage)
+                    if result is None and dry_run:
+                        would_run.add(stage.name)
+                        result = StageResult(stage.name, "stale")
+                    if result is not None:
+                        results[stage.name] = result
+                        print(f"[pipeline] {result.status:7s} {stage.name}", flush=True)
+                        continue
+                    print(f"[pipeline] start   {stage.name}", flush=True)
+                    running[pool.submit(self._run_stage, stage, refresh)] = stage
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    result = future.result()
+                    results[stage.name] = result
+                    print(
+                        f"[pipeline] {result.status:7s} {stage.name} ({result.seconds:.1f}s)",
+                        flush=True,
+                    )
+                    if result.status == "failed":
+                        sys.stdout.write(self.log_path(stage).read_text(errors="replace"))
+
+        return [results[s.name] for s in stages]
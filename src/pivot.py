@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _factorize(values: pd.Series) -> Tuple[np.ndarray, object]:
+    """Sorted integer codes (-1 for missing) plus what to decode them with."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Category order is the sort order pivot_table uses for categoricals.
+        return values.cat.codes.to_numpy(dtype=np.int64), values.dtype
+    codes, uniques = pd.factorize(values, sort=True)
+    return codes.astype(np.int64, copy=False), uniques
+
+
+def _decode(codes: np.ndarray, decoder, name: str, dtype) -> pd.Series:
+    if isinstance(decoder, pd.CategoricalDtype):
+        return pd.Series(pd.Categorical.from_codes(codes, dtype=decoder), name=name)
+    return pd.Series(decoder.take(codes), name=name).astype(dtype, copy=False)
+
+
+def _dense_unique(ids: np.ndarray, space: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    `np.unique(ids, return_inverse=True)` for non-negative ids below `space`.
+
+    When the id space is not much larger than the data this is a bincount
+    and a lookup table instead of an O(n log n) sort.
+    """
+    if space > 4 * len(ids) + 1024:
+        return np.unique(ids, return_inverse=True)
+    present = np.bincount(ids, minlength=space) > 0
+    uniques = np.flatnonzero(present)
+    lookup = np.cumsum(present) - 1
+    return uniques, lookup[ids]
+
+
+def pivot_mean(
+    df: pd.DataFrame,
+    index: Sequence[str],
+    columns: str,
+    values: str,
+) -> pd.DataFrame:
+    """
+    Mean-per-cell pivot computed with integer codes and bincount.
+
+    Same result as
+        df.pivot_table(index=index, columns=columns, values=values,
+                       aggfunc="mean", observed=True).reset_index()
+    but each key column is factorized once, the index keys are combined
+    into a single group id, and cell sums/counts are bincount calls over
+    a dense (groups x columns) grid. Cells holding more than two values
+    are averaged by pandas' own groupby mean (the kernel pivot_table
+    runs, with its compensated summation) keyed on the integer cell ids,
+    so the means match it exactly and duplicate-heavy input costs no more
+    than pivot_table's own aggregation.
+    """
+    index = list(index)
+    value = pd.to_numeric(df[values]).to_numpy(dtype=np.float64)
+    key_codes: List[np.ndarray] = []
+    decoders = []
+    for name in index:
+        codes, decoder = _factorize(df[name])
+        key_codes.append(codes)
+        decoders.append(decoder)
+    col_codes, col_decoder = _factorize(df[columns])
+
+    # Rows with a missing key or value never reach a cell (pivot_table
+    # drops NaN keys and skips NaN values in the mean).
+    keep = ~np.isnan(value) & (col_codes >= 0)
+    for codes in key_codes:
+        keep &= codes >= 0
+    value = value[keep]
+    col_codes = col_codes[keep]
+    key_codes = [codes[keep] for codes in key_codes]
+
+    # Mixed-radix group id: lexicographic in the per-key codes, so sorting
+    # the ids sorts groups exactly as pivot_table orders its index.
+    radices = [int(codes.max()) + 1 if len(codes) else 1 for codes in key_codes]
+    group = np.zeros(len(value), dtype=np.int64)
+    for codes, radix in zip(key_codes, radices):
+        group = group * radix + codes
+    group_ids, row = _dense_unique(group, int(np.prod(radices, dtype=np.float64)))
+
+    # Only columns with at least one value survive, as with dropna=True.
+    used_cols, col = _dense_unique(col_codes, int(col_codes.max()) + 1 if len(col_codes) else 0)
+    n_rows, n_cols = len(group_ids), len(used_cols)
+
+    cell = row * n_cols + col
+    counts = np.bincount(cell, minlength=n_rows * n_cols)
+    # With at most two values per cell a plain sum rounds exactly like
+    # pandas' compensated one; only rows of busier cells need pandas.
+    sums = np.bincount(cell, weights=value, minlength=n_rows * n_cols)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    busy = counts[cell] > 2
+    if busy.any():
+        busy_means = pd.Series(value[busy]).groupby(cell[busy], sort=False).mean()
+        means[busy_means.index.to_numpy()] = busy_means.to_numpy()
+    means = means.reshape(n_rows, n_cols)
+
+    # pivot_table drops cells whose mean is NaN (inf and -inf in one cell)
+    # and then any row or column left without a value.
+    filled = ~np.isnan(means)
+    rows_kept, cols_kept = filled.any(axis=1), filled.any(axis=0)
+    if not (rows_kept.all() and cols_kept.all()):
+        means = means[rows_kept][:, cols_kept]
+        group_ids, used_cols = group_ids[rows_kept], used_cols[cols_kept]
+
+    # Decode each key back out of the group id.
+    out = {}
+    remainder = group_ids
+    for name, radix, decoder in reversed(list(zip(index, radices, decoders))):
+        out[name] = _decode(remainder % radix, decoder, name, df[name].dtype)
+        remainder = remainder // radix
+
+    if isinstance(col_decoder, pd.CategoricalDtype):
+        labels = list(col_decoder.categories.take(used_cols))
+    else:
+        labels = list(col_decoder.take(used_cols))
+
+    result = pd.DataFrame({name: out[name] for name in index})
+    result = pd.concat([result, pd.DataFrame(means, columns=labels)], axis=1)
+    result.columns.name = columns
+    return result
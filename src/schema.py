@@ -0,0 +1,190 @@
+"""
+Shared column schema for the CDC frame, from ingest to modeling.
+
+Categorical columns carry fixed, versioned category lists, so category
+codes mean the same thing in every stage and every run. Numeric columns
+use the narrowest dtype that holds their values exactly. Bump
+`SCHEMA_VERSION` whenever a category list or dtype changes.
+"""
+from __future__ import annotations
+
+import warnings
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+SCHEMA_VERSION = 1
+
+# Kinds match the streaming reader in src/cdc_ingest.py.
+KINDS = ("numeric", "int", "categorical", "string")
+
+
+@dataclass(frozen=True)
+class ColumnSpec:
+    """
+    How one column is typed.
+
+    `categories` is the declared category set (in code order) for
+    categorical columns. Values outside it are appended after the
+    declared ones; for `closed` columns (model features) that also warns,
+    since it changes the feature space the models were trained on.
+    """
+    kind: str
+    dtype: Optional[str] = None
+    categories: Tuple[str, ...] = ()
+    closed: bool = False
+
+    def categorical_dtype(self, extra=()) -> pd.CategoricalDtype:
+        return pd.CategoricalDtype(list(self.categories) + sorted(extra))
+
+    def convert(self, values: pd.Series, strict: bool = False) -> pd.Series:
+        if self.kind == "categorical":
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                seen = values.cat.categories[
+                    np.unique(values.cat.codes[values.cat.codes >= 0])
+                ]
+            else:
+                seen = pd.unique(values.dropna())
+            extra = set(seen) - set(self.categories)
+            if extra:
+                message = (
+                    f"column {values.name!r}: {len(extra)} value(s) outside schema "
+                    f"v{SCHEMA_VERSION} categories, e.g. {sorted(extra)[:3]}"
+                )
+                if strict:
+                    raise ValueError(message)
+                if self.closed:
+                    warnings.warn(message, stacklevel=3)
+            return values.astype(self.categorical_dtype(extra))
+
+        if self.kind == "string":
+            return values
+
+        numeric = pd.to_numeric(values, errors="coerce")
+        if self.kind == "int":
+            info = np.iinfo(self.dtype)
+            if numeric.notna().any() and (numeric.min() < info.min or numeric.max() > info.max):
+                raise ValueError(f"column {values.name!r} does not fit in {self.dtype}")
+            if numeric.isna().any():
+                # Nullable integer, e.g. "int16" -> "Int16".
+                return numeric.astype(self.dtype.capitalize())
+            return numeric.astype(self.dtype)
+        return numeric.astype(self.dtype)
+
+
+LOCATIONS = (
+    "AK", "AL", "AR", "AZ", "CA", "CO", "CT", "DC", "DE", "FL", "GA", "GU",
+    "HI", "IA", "ID", "IL", "IN", "KS", "KY", "LA", "MA", "MD", "ME", "MI",
+    "MN", "MO", "MS", "MT", "NC", "ND", "NE", "NH", "NJ", "NM", "NV", "NY",
+    "OH", "OK", "OR", "PA", "PR", "RI", "SC", "SD", "TN", "TX", "US", "UT",
+    "VA", "VI", "VT", "WA", "WI", "WV", "WY",
+)
+
+STRATIFICATION_CATEGORIES = (
+    "Age (years)",
+    "Education",
+    "Income",
+    "Race/Ethnicity",
+    "Sex",
+    "Total",
+)
+
+STRATIFICATIONS = (
+    "$15,000 - $24,999",
+    "$25,000 - $34,999",
+    "$35,000 - $49,999",
+    "$50,000 - $74,999",
+    "$75,000 or greater",
+    "18 - 24",
+    "2 or more races",
+    "25 - 34",
+    "35 - 44",
+    "45 - 54",
+    "55 - 64",
+    "65 or older",
+    "American Indian/Alaska Native",
+    "Asian",
+    "College graduate",
+    "Data not reported",
+    "Female",
+    "Hawaiian/Pacific Islander",
+    "High school graduate",
+    "Hispanic",
+    "Less than $15,000",
+    "Less than high school",
+    "Male",
+    "Non-Hispanic Black",
+    "Non-Hispanic White",
+    "Other",
+    "Some college or technical school",
+    "Total",
+)
+
+QUESTIONS = (
+    "Percent of adults aged 18 years and older who have an overweight classification",
+    "Percent of adults aged 18 years and older who have obesity",
+    "Percent of adults who achieve at least 150 minutes a week of moderate-intensity "
+    "aerobic physical activity or 75 minutes a week of vigorous-intensity aerobic "
+    "activity (or an equivalent combination)",
+)
+
+# Categories are listed in sorted order so pivots and one-hot encodings
+# order them exactly as they did for plain strings.
+_FEATURE_COLUMNS = {
+    "locationabbr": ColumnSpec("categorical", categories=LOCATIONS, closed=True),
+    "stratificationcategory1": ColumnSpec(
+        "categorical", categories=STRATIFICATION_CATEGORIES, closed=True
+    ),
+    "stratification1": ColumnSpec("categorical", categories=STRATIFICATIONS, closed=True),
+}
+
+# Raw hn4x-zwk7 rows. data_value stays float64: it is averaged and written
+# to the modeling CSV, where float32 rounding would show up (31.3 -> 31.299999).
+CDC_SCHEMA: Dict[str, ColumnSpec] = {
+    "yearstart": ColumnSpec("int", "int16"),
+    "yearend": ColumnSpec("int", "int16"),
+    "data_value": ColumnSpec("numeric", "float64"),
+    "data_value_alt": ColumnSpec("numeric", "float32"),
+    "low_confidence_limit": ColumnSpec("numeric", "float32"),
+    "high_confidence_limit": ColumnSpec("numeric", "float32"),
+    "sample_size": ColumnSpec("numeric", "float32"),
+    **_FEATURE_COLUMNS,
+    "question": ColumnSpec("categorical", categories=QUESTIONS),
+    "locationdesc": ColumnSpec("categorical"),
+    "datasource": ColumnSpec("categorical"),
+    "class": ColumnSpec("categorical"),
+    "topic": ColumnSpec("categorical"),
+    "data_value_type": ColumnSpec("categorical"),
+    "age_years": ColumnSpec("categorical"),
+    "sex": ColumnSpec("categorical"),
+    "race_ethnicity": ColumnSpec("categorical"),
+    "education": ColumnSpec("categorical"),
+    "income": ColumnSpec("categorical"),
+    "total": ColumnSpec("categorical"),
+}
+
+# Stage 03 output (data/obesity_overweight_modeling.csv).
+MODELING_SCHEMA: Dict[str, ColumnSpec] = {
+    "yearstart": ColumnSpec("int", "int16"),
+    **_FEATURE_COLUMNS,
+    "obesity_value": ColumnSpec("numeric", "float64"),
+    "overweight_value": ColumnSpec("numeric", "float64"),
+    "obesity_high_risk": ColumnSpec("int", "int8"),
+    "overweight_high_risk": ColumnSpec("int", "int8"),
+}
+
+
+def apply_schema(
+    df: pd.DataFrame,
+    schema: Dict[str, ColumnSpec] = CDC_SCHEMA,
+    strict: bool = False,
+) -> pd.DataFrame:
+    """Return `df` with every column named in `schema` converted to its declared type."""
+    converted = {
+        name: spec.convert(df[name], strict=strict)
+        for name, spec in schema.items()
+        if name in df.columns
+    }
+    return df.assign(**converted)
@@ -0,0 +1,172 @@
+"""
+Compact, sklearn-free scoring artifacts for the logistic models.
+
+A fitted `Pipeline` (one-hot `preprocess` + `LogisticRegression`) is
+fully described by the encoder categories, the year's mean/scale (0/1
+for passthrough), the coefficients and the intercept. `export_pipeline`
+and `export_model` write these to one versioned JSON file:
+
+    {"format": "logreg-scorer", "format_version": 1,
+     "outcome": ..., "version": ..., "label": ...,
+     "categorical": {column: [categories...]},
+     "numeric": {column: {"mean": ..., "scale": ...}},
+     "feature_names": [...], "coef": [...], "intercept": ...}
+
+Floats are written with `repr`, so they round-trip exactly.
+
+`Scorer` loads such a file with only `json` and NumPy, so a scoring
+worker never imports sklearn, scipy, pandas or joblib. It scores and
+explains rows with the same arithmetic as the pipeline. A category the
+encoder never saw contributes 0, as with `handle_unknown="ignore"`.
+Exporting needs the registry (and sklearn for a live pipeline); this
+module's top level deliberately imports neither.
+"""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+FORMAT = "logreg-scorer"
+FORMAT_VERSION = 1
+DEFAULT_EXPORT_DIR = Path("models") / "scorers"
+
+Rows = Mapping[str, Sequence]  # column -> values, one entry per row
+
+
+def _artifact(params: dict, coef, intercept: float, outcome=None, version=None, label=None) -> dict:
+    coef = np.asarray(coef, dtype=np.float64)
+    if len(coef) != len(params["feature_names"]):
+        raise ValueError(f"{len(coef)} coefficients for {len(params['feature_names'])} features")
+    return {
+        "format": FORMAT,
+        "format_version": FORMAT_VERSION,
+        "outcome": outcome,
+        "version": version,
+        "label": label,
+        "categorical": {col: list(cats) for col, cats in params["categories"].items()},
+        "numeric": {
+            col: {"mean": float(s["mean"]), "scale": float(s["scale"])} for col, s in params["numeric"].items()
+        },
+        "feature_names": list(params["feature_names"]),
+        "coef": [float(c) for c in coef],
+        "intercept": float(intercept),
+    }
+
+
+def _write(artifact: dict, path: Path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp-{os.getpid()}")
+    tmp.write_text(json.dumps(artifact, indent=1) + "\n")
+    os.replace(tmp, path)
+    return path
+
+
+def export_pipeline(pipe, path: Path, outcome: Optional[str] = None, version: Optional[str] = None, label: Optional[str] = None) -> Path:
+    """Write the artifact for a fitted preprocess + LogisticRegression Pipeline."""
+    from src.model_registry import _pipeline_meta
+
+    meta, coef = _pipeline_meta(pipe)
+    return _write(_artifact(meta, coef, meta["intercept"], outcome, version, label), path)
+
+
+def export_model(model, path: Optional[Path] = None) -> Path:
+    """Write the artifact for a `RegisteredModel` (no pipeline unpickling)."""
+    path = path or DEFAULT_EXPORT_DIR / f"{model.outcome}_{model.version}.json"
+    artifact = _artifact(model.meta, model.coef, model.intercept, model.outcome, model.version, model.label)
+    return _write(artifact, path)
+
+
+class Scorer:
+    """Pure-NumPy scorer/explainer over an exported artifact."""
+
+    def __init__(self, artifact: dict):
+        if artifact.get("format") != FORMAT:
+            raise ValueError(f"not a {FORMAT} artifact")
+        if artifact.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"unsupported {FORMAT} version {artifact.get('format_version')} (expected {FORMAT_VERSION})")
+        self.outcome = artifact["outcome"]
+        self.version = artifact["version"]
+        self.label = artifact["label"]
+        self.feature_names: List[str] = artifact["feature_names"]
+        self.coef = np.asarray(artifact["coef"], dtype=np.float64)
+        self.intercept = float(artifact["intercept"])
+        self.categories: Dict[str, List[str]] = {col: list(c) for col, c in artifact["categorical"].items()}
+        self.scaling: Dict[str, Tuple[float, float]] = {
+            col: (s["mean"], s["scale"]) for col, s in artifact["numeric"].items()
+        }
+
+        # column -> (offset of its first feature, {category: position})
+        self._categorical: Dict[str, Tuple[int, Dict[str, int]]] = {}
+        offset = 0
+        for col, categories in artifact["categorical"].items():
+            self._categorical[col] = (offset, {str(c): i for i, c in enumerate(categories)})
+            offset += len(categories)
+        self._numeric: Dict[str, Tuple[int, float, float]] = {}
+        for col, scaling in artifact["numeric"].items():
+            self._numeric[col] = (offset, scaling["mean"], scaling["scale"])
+            offset += 1
+        if offset != len(self.coef):
+            raise ValueError(f"artifact describes {offset} features but has {len(self.coef)} coefficients")
+
+    @classmethod
+    def load(cls, path: Path) -> "Scorer":
+        return cls(json.loads(Path(path).read_text()))
+
+    @property
+    def columns(self) -> List[str]:
+        return [*self._categorical, *self._numeric]
+
+    def contributions(self, rows: Rows) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Per-row (n, columns) contributions and the feature index behind
+        each (-1 for an unseen category), one column per input column.
+        """
+        n = len(rows[self.columns[0]])
+        values = np.zeros((n, len(self.columns)))
+        features = np.full((n, len(self.columns)), -1, dtype=np.int64)
+        for j, (col, (offset, lookup)) in enumerate(self._categorical.items()):
+            codes = np.fromiter((lookup.get(str(v), -1) for v in rows[col]), dtype=np.int64, count=n)
+            known = codes >= 0
+            features[known, j] = offset + codes[known]
+            values[known, j] = self.coef[features[known, j]]
+        for j, (col, (offset, mean, scale)) in enumerate(self._numeric.items(), len(self._categorical)):
+            x = (np.asarray(rows[col], dtype=np.float64) - mean) / scale
+            features[:, j] = offset
+            values[:, j] = self.coef[offset] * x
+        return values, features
+
+    def decision_function(self, rows: Rows) -> np.ndarray:
+        values, _ = self.contributions(rows)
+        return self.intercept + values.sum(axis=1)
+
+    def predict_proba(self, rows: Rows) -> np.ndarray:
+        """P(label = 1) per row (the pipeline's `predict_proba(X)[:, 1]`)."""
+        return 1 / (1 + np.exp(-self.decision_function(rows)))
+
+    def explain(self, rows: Rows, k: Optional[int] = None) -> List[dict]:
+        """Per row: probability, logit and nonzero contributions, largest |value| first."""
+        values, features = self.contributions(rows)
+        logits = self.intercept + values.sum(axis=1)
+        probabilities = 1 / (1 + np.exp(-logits))
+        order = np.argsort(-np.abs(values), axis=1, kind="stable")
+        values = np.take_along_axis(values, order, axis=1)
+        features = np.take_along_axis(features, order, axis=1)
+        out = []
+        for i in range(len(values)):
+            terms = [
+                (self.feature_names[f], float(v)) for f, v in zip(features[i], values[i]) if f >= 0 and v != 0
+            ]
+            out.append(
+                {
+                    "probability": float(probabilities[i]),
+                    "logit": float(logits[i]),
+                    "intercept": self.intercept,
+                    "contributions": terms if k is None else terms[:k],
+                }
+            )
+        return out
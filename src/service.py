@@ -0,0 +1,319 @@
+"""
+Long-running local prediction/explanation service.
+
+Loads the registered obesity and overweight models once, as
+`ContributionTable`s (registry metadata + coefficients; no sklearn,
+joblib or modeling CSV), and answers subgroup queries over HTTP:
+
+    POST /explain   {"yearstart": 2030, "locationabbr": "TX",
+                     "stratificationcategory1": "Income",
+                     "stratification1": "Less than $15,000"}
+                    or a JSON list of such objects
+    GET  /stats     latency percentiles, cache and batching counters
+    GET  /health
+
+Request threads do not score on their own. A subgroup that is not in
+the bounded LRU cache goes onto a queue. One batcher thread drains up to
+`max_batch` queued subgroups, waiting at most `max_wait` seconds for
+the batch to fill, and scores them with `ContributionTable.explain_batch`
+for every outcome at once. A miss for a subgroup that is already queued
+or being scored waits on that subgroup's pending future instead of
+queuing it again, so a burst of identical queries is scored once.
+
+Responses carry `X-Cache: hit` when every query was answered from the
+cache and `X-Cache: miss` otherwise, and `/stats` reports latency for
+both kinds separately.
+"""
+from __future__ import annotations
+
+import json
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.contribution_table import ContributionTable
+from src.model_registry import CATEGORICAL, NUMERIC
+
+OUTCOMES = ("obesity", "overweight")
+DEFAULT_PORT = 8765
+DEFAULT_MAX_BATCH = 64
+DEFAULT_MAX_WAIT = 0.002
+DEFAULT_CACHE_SIZE = 4096
+LATENCY_WINDOW = 10_000
+
+Key = Tuple[object, ...]
+
+
+class BatchError(RuntimeError):
+    """Scoring a batch failed; reported to each of its requests as a 500."""
+
+
+class LRUCache:
+    """Thread-safe bounded mapping that evicts the least recently used key."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Key, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Key) -> Optional[dict]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Key, value: dict) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+class MicroBatcher:
+    """Collects items submitted from many threads and hands them to `fn` in batches."""
+
+    def __init__(self, fn: Callable[[List[Key]], List[dict]], max_batch: int, max_wait: float):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self.items = 0
+        self._queue: "queue.Queue[Tuple[Key, Future]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Key) -> Future:
+        future: Future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self.batches += 1
+            self.items += len(batch)
+            try:
+                results = self.fn([item for item, _ in batch])
+            except Exception as exc:  # surfaced to every waiting request
+                for _, future in batch:
+                    future.set_exception(exc)
+            else:
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+
+
+def subgroup_key(query: dict) -> Key:
+    """Normalized cache/batch key; raises ValueError for a malformed query."""
+    if not isinstance(query, dict):
+        raise ValueError("each query must be a JSON object")
+    missing = [c for c in (*CATEGORICAL, *NUMERIC) if c not in query]
+    if missing:
+        raise ValueError(f"query is missing {', '.join(missing)}")
+    try:
+        numeric = tuple(float(query[c]) for c in NUMERIC)
+    except (TypeError, ValueError):
+        raise ValueError(f"{', '.join(NUMERIC)} must be numeric") from None
+    return tuple(str(query[c]).strip() for c in CATEGORICAL) + numeric
+
+
+def _subgroup(key: Key) -> dict:
+    return dict(zip((*CATEGORICAL, *NUMERIC), key))
+
+
+class ExplanationService:
+    def __init__(
+        self,
+        tables: Dict[str, ContributionTable],
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_wait: float = DEFAULT_MAX_WAIT,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ):
+        self.tables = tables
+        self.cache = LRUCache(cache_size)
+        self.batcher = MicroBatcher(self._score, max_batch, max_wait)
+        self.requests = 0
+        self.coalesced = 0
+        self._latencies: Dict[str, deque] = {kind: deque(maxlen=LATENCY_WINDOW) for kind in ("hit", "miss")}
+        self._inflight: Dict[Key, Future] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_registry(cls, version: str = "v2", outcomes: Sequence[str] = OUTCOMES, **kwargs) -> "ExplanationService":
+        from src.model_registry import resolve_model
+
+        return cls({o: ContributionTable.from_model(resolve_model(o, version)) for o in outcomes}, **kwargs)
+
+    def _score(self, keys: List[Key]) -> List[dict]:
+        # Cached per key, so results hold only model output; the normalized
+        # subgroup is attached per response in `explain`.
+        subgroups = [_subgroup(key) for key in keys]
+        per_outcome = {o: table.explain_batch(subgroups) for o, table in self.tables.items()}
+        results = []
+        for i, subgroup in enumerate(subgroups):
+            result = {}
+            for outcome, table in self.tables.items():
+                expl = asdict(per_outcome[outcome][i])
+                expl["contributions"] = [{"feature": f, "contribution": c} for f, c in expl["contributions"]]
+                expl["unknown"] = [c for c in CATEGORICAL if subgroup[c] not in table.categorical[c]]
+                result[outcome] = expl
+            results.append(result)
+        return results
+
+    def _pending(self, key: Key) -> Future:
+        """The future scoring `key`: the one already in flight, or a newly queued one."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+            future = self._inflight[key] = self.batcher.submit(key)
+        # Outside the lock: the callback runs here if scoring already finished.
+        future.add_done_callback(lambda f: self._settle(key, f))
+        return future
+
+    def _settle(self, key: Key, future: Future) -> None:
+        # Cache first, so a request that no longer finds `key` in flight finds it cached.
+        if future.exception() is None:
+            self.cache.put(key, future.result())
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def answer(self, queries: List[dict], timeout: float = 30.0) -> Tuple[List[dict], bool]:
+        """`explain`, plus whether every query was answered from the cache."""
+        keys = [subgroup_key(q) for q in queries]
+        results: List[Optional[dict]] = [self.cache.get(k) for k in keys]
+        pending = {i: self._pending(k) for i, k in enumerate(keys) if results[i] is None}
+        for i, future in pending.items():
+            try:
+                results[i] = future.result(timeout)
+            except FutureTimeout:
+                raise
+            except Exception as exc:
+                raise BatchError(f"scoring failed: {type(exc).__name__}: {exc}") from exc
+        return [{"subgroup": _subgroup(k), **r} for k, r in zip(keys, results)], not pending
+
+    def explain(self, queries: List[dict], timeout: float = 30.0) -> List[dict]:
+        """
+        Answer queries from the cache, batching the misses together.
+        Raises ValueError for a malformed query, BatchError if scoring
+        failed and FutureTimeout if it did not finish within `timeout`.
+        """
+        return self.answer(queries, timeout)[0]
+
+    def record(self, seconds: float, cached: bool = False) -> None:
+        with self._lock:
+            self.requests += 1
+            self._latencies["hit" if cached else "miss"].append(seconds)
+
+    def stats(self) -> dict:
+        with self._lock:
+            latencies = {kind: np.array(values) for kind, values in self._latencies.items()}
+            coalesced, inflight = self.coalesced, len(self._inflight)
+        return {
+            "requests": self.requests,
+            "latency_ms": {
+                **_percentiles(np.concatenate(list(latencies.values()))),
+                **{kind: _percentiles(values) for kind, values in latencies.items()},
+            },
+            "cache": {"size": len(self.cache), "maxsize": self.cache.maxsize, "hits": self.cache.hits, "misses": self.cache.misses},
+            "inflight": {"pending": inflight, "coalesced": coalesced},
+            "batching": {
+                "batches": self.batcher.batches,
+                "items": self.batcher.items,
+                "mean_batch": self.batcher.items / self.batcher.batches if self.batcher.batches else 0.0,
+                "max_batch": self.batcher.max_batch,
+                "max_wait_ms": self.batcher.max_wait * 1000,
+            },
+        }
+
+
+def _percentiles(latencies: np.ndarray) -> dict:
+    p50, p99 = (float(p) for p in np.percentile(latencies, [50, 99]) * 1000) if len(latencies) else (None, None)
+    return {"p50": p50, "p99": p99, "window": len(latencies)}
+
+
+def make_handler(service: ExplanationService):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # One buffered write per response (flushed by handle_one_request) with
+        # Nagle off; header and body as separate segments stall keep-alive
+        # clients on delayed ACKs (~40 ms per request).
+        wbufsize = -1
+        disable_nagle_algorithm = True
+
+        def _send(self, status: int, payload, headers: Optional[Dict[str, str]] = None) -> None:
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/stats":
+                self._send(200, service.stats())
+            elif self.path == "/health":
+                self._send(200, {"status": "ok", "outcomes": list(service.tables)})
+            else:
+                self._send(404, {"error": f"unknown path {self.path}"})
+
+        def do_POST(self):
+            start = time.perf_counter()
+            if self.path != "/explain":
+                self._send(404, {"error": f"unknown path {self.path}"})
+                return
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"null")
+                single = not isinstance(payload, list)
+                results, cached = service.answer([payload] if single else payload)
+            except ValueError as exc:  # includes JSONDecodeError
+                self._send(400, {"error": str(exc)})
+                return
+            except FutureTimeout:
+                self._send(504, {"error": "timed out waiting for the scoring batch"})
+                return
+            except Exception as exc:  # BatchError or anything else: answer rather than drop the connection
+                self._send(500, {"error": str(exc) if isinstance(exc, BatchError) else f"{type(exc).__name__}: {exc}"})
+                return
+            self._send(200, results[0] if single else results, {"X-Cache": "hit" if cached else "miss"})
+            service.record(time.perf_counter() - start, cached)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def make_server(service: ExplanationService, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    return server
@@ -0,0 +1,523 @@
+"""
+Local stand-in for the Socrata `hn4x-zwk7` endpoint.
+
+Serves recorded rows (e.g. `data/cdc_sample_raw.csv`) or deterministic
+synthetic rows over HTTP and honors the SoQL parameters the fetch layer
+sends: `$limit`, `$offset`, `$order`, `$where`, `$select` and `$group`
+(with count/avg/sum/min/max). Latency and error rates can be injected so
+retry and paging behaviour can be exercised offline.
+
+Run standalone with:  python -m src.socrata_stub --rows 100000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+DATASET_PATH = "/resource/hn4x-zwk7.json"
+
+_LOCATIONS = [
+    "AK", "AL", "AR", "AZ", "CA", "CO", "CT", "DC", "DE", "FL", "GA", "GU",
+    "HI", "IA", "ID", "IL", "IN", "KS", "KY", "LA", "MA", "MD", "ME", "MI",
+    "MN", "MO", "MS", "MT", "NC", "ND", "NE", "NH", "NJ", "NM", "NV", "NY",
+    "OH", "OK", "OR", "PA", "PR", "RI", "SC", "SD", "TN", "TX", "US", "UT",
+    "VA", "VI", "VT", "WA", "WI", "WV", "WY",
+]
+_STRATIFICATIONS = [
+    ("Age (years)", "18 - 24"),
+    ("Age (years)", "25 - 34"),
+    ("Age (years)", "35 - 44"),
+    ("Age (years)", "45 - 54"),
+    ("Age (years)", "55 - 64"),
+    ("Age (years)", "65 or older"),
+    ("Education", "College graduate"),
+    ("Education", "High school graduate"),
+    ("Income", "$15,000 - $24,999"),
+    ("Income", "$75,000 or greater"),
+    ("Sex", "Female"),
+    ("Sex", "Male"),
+    ("Total", "Total"),
+]
+_QUESTIONS = [
+    "Percent of adults aged 18 years and older who have obesity",
+    "Percent of adults aged 18 years and older who have an overweight classification",
+    "Percent of adults who engage in no leisure-time physical activity",
+    "Percent of adults who report consuming fruit less than one time daily",
+]
+
+
+class SyntheticRows:
+    """
+    `n` hn4x-zwk7-shaped rows computed from their index on demand, so a
+    10M-row dataset costs no memory on the serving side.
+    """
+
+    def __init__(self, n: int, seed: int = 0):
+        self.n = n
+        self.seed = seed
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.n))]
+        if i < 0:
+            i += self.n
+        if not 0 <= i < self.n:
+            raise IndexError(i)
+        h = (i * 2654435761 + self.seed) & 0xFFFFFFFF
+        cat, strat = _STRATIFICATIONS[h % len(_STRATIFICATIONS)]
+        return {
+            ":id": f"row-{i:09d}",
+            ":updated_at": f"2024-01-{1 + h % 28:02d}T00:00:00.000Z",
+            "yearstart": str(2011 + (h >> 4) % 14),
+            "yearend": str(2011 + (h >> 4) % 14),
+            "locationabbr": _LOCATIONS[(h >> 8) % len(_LOCATIONS)],
+            "question": _QUESTIONS[(h >> 14) % len(_QUESTIONS)],
+            "data_value": f"{10 + (h >> 16) % 400 / 10:.1f}",
+            "sample_size": str(100 + (h >> 12) % 5000),
+            "stratificationcategory1": cat,
+            "stratification1": strat,
+        }
+
+    def __iter__(self):
+        for i in range(self.n):
+            yield self[i]
+
+
+def load_recorded_rows(path: Path = Path("data") / "cdc_sample_raw.csv") -> List[dict]:
+    """Rows of a saved raw extract, shaped like the JSON API returns them."""
+    df = pd.read_csv(path, dtype=str)
+    rows = []
+    for i, rec in enumerate(df.to_dict("records")):
+        row = {k: v for k, v in rec.items() if isinstance(v, str)}
+        row.setdefault(":id", f"row-{i:09d}")
+        rows.append(row)
+    return rows
+
+
+# --- minimal SoQL ---------------------------------------------------------
+
+_TOKEN = re.compile(
+    r"\s*(?:(?P<str>'(?:[^']|'')*')|(?P<num>-?\d+(?:\.\d+)?)|(?P<op>>=|<=|!=|<>|=|>|<|\(|\)|,|\*)"
+    r"|(?P<word>:?\*|:?[A-Za-z_][A-Za-z0-9_]*))"
+)
+
+
+def _tokenize(text: str) -> List[tuple]:
+    tokens, pos = [], 0
+    text = text.strip()
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if not m or m.end() == pos:
+            raise ValueError(f"cannot parse SoQL near: {text[pos:pos + 20]!r}")
+        pos = m.end()
+        kind = m.lastgroup
+        value = m.group(kind)
+        if kind == "str":
+            value = value[1:-1].replace("''", "'")
+        elif kind == "num":
+            value = float(value)
+        tokens.append((kind, value))
+    return tokens
+
+
+class _WhereParser:
+    def __init__(self, text: str):
+        self.tokens = _tokenize(text)
+        self.i = 0
+
+    def _peek(self, upper=True):
+        if self.i >= len(self.tokens):
+            return None
+        kind, value = self.tokens[self.i]
+        return value.upper() if upper and kind == "word" else value
+
+    def _next(self):
+        tok = self.tokens[self.i]
+        self.i += 1
+        return tok
+
+    def _expect(self, value):
+        kind, got = self._next()
+        if (got.upper() if kind == "word" else got) != value:
+            raise ValueError(f"expected {value!r}, got {got!r}")
+
+    def parse(self) -> Callable[[dict], bool]:
+        pred = self._or()
+        if self.i != len(self.tokens):
+            raise ValueError(f"unexpected token: {self.tokens[self.i][1]!r}")
+        return pred
+
+    def _or(self):
+        parts = [self._and()]
+        while self._peek() == "OR":
+            self._next()
+            parts.append(self._and())
+        return parts[0] if len(parts) == 1 else (lambda r: any(p(r) for p in parts))
+
+    def _and(self):
+        parts = [self._not()]
+        while self._peek() == "AND":
+            self._next()
+            parts.append(self._not())
+        return parts[0] if len(parts) == 1 else (lambda r: all(p(r) for p in parts))
+
+    def _not(self):
+        if self._peek() == "NOT":
+            self._next()
+            inner = self._not()
+            return lambda r: not inner(r)
+        return self._atom()
+
+    def _operand(self) -> Callable[[dict], object]:
+        kind, value = self._next()
+        if kind in ("str", "num"):
+            return lambda r: value
+        if kind != "word":
+            raise ValueError(f"unexpected token: {value!r}")
+        if value.lower() in ("lower", "upper") and self._peek() == "(":
+            self._next()
+            inner = self._operand()
+            self._expect(")")
+            fn = str.lower if value.lower() == "lower" else str.upper
+            return lambda r: None if inner(r) is None else fn(inner(r))
+        return lambda r: r.get(value)
+
+    def _atom(self):
+        if self._peek() == "(":
+            self._next()
+            pred = self._or()
+            self._expect(")")
+            return pred
+
+        left = self._operand()
+        op = self._peek()
+        if op == "IS":
+            self._next()
+            negate = self._peek() == "NOT"
+            if negate:
+                self._next()
+            self._expect("NULL")
+            return (lambda r: left(r) is not None) if negate else (lambda r: left(r) is None)
+        if op == "LIKE":
+            self._next()
+            kind, pattern = self._next()
+            regex = re.compile(
+                "".join(".*" if c == "%" else "." if c == "_" else re.escape(c) for c in pattern),
+                re.DOTALL,
+            )
+            return lambda r: left(r) is not None and regex.fullmatch(left(r)) is not None
+
+        self._next()
+        right = self._operand()
+        compare = {
+            "=": lambda a, b: a == b,
+            "!=": lambda a, b: a != b,
+            "<>": lambda a, b: a != b,
+            ">": lambda a, b: a > b,
+            ">=": lambda a, b: a >= b,
+            "<": lambda a, b: a < b,
+            "<=": lambda a, b: a <= b,
+        }[op]
+
+        def pred(r):
+            a, b = left(r), right(r)
+            if a is None or b is None:
+                return False
+            if isinstance(a, float) or isinstance(b, float):
+                try:
+                    a, b = float(a), float(b)
+                except ValueError:
+                    return False
+            return compare(a, b)
+
+        return pred
+
+
+def parse_where(text: str) -> Callable[[dict], bool]:
+    """Compile a SoQL `$where` expression into a row predicate."""
+    return _WhereParser(text).parse()
+
+
+def _split_top_level(text: str) -> List[str]:
+    parts, depth, start = [], 0, 0
+    for i, c in enumerate(text):
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "," and depth == 0:
+            parts.append(text[start:i].strip())
+            start = i + 1
+    parts.append(text[start:].strip())
+    return [p for p in parts if p]
+
+
+_AGG = re.compile(r"^(count|avg|sum|min|max)\((\*|:?\w+)\)(?:\s+as\s+(\w+))?$", re.IGNORECASE)
+_ALIAS = re.compile(r"^(:?\w+)(?:\s+as\s+(\w+))?$", re.IGNORECASE)
+
+
+def _aggregate(func: str, values: list):
+    if func == "count":
+        return str(len(values))
+    nums = [float(v) for v in values if v is not None]
+    if not nums:
+        return None
+    if func == "avg":
+        out = sum(nums) / len(nums)
+    elif func == "sum":
+        out = sum(nums)
+    else:
+        out = min(nums) if func == "min" else max(nums)
+    return repr(out)
+
+
+def _apply_select(rows: Sequence[dict], select: Optional[str], group: Optional[str]) -> List[dict]:
+    if not select:
+        return list(rows)
+
+    items = _split_top_level(select)
+    aggs, plain = [], []
+    for item in items:
+        m = _AGG.match(item)
+        if m:
+            func, col, alias = m.group(1).lower(), m.group(2), m.group(3)
+            aggs.append((func, col, alias or f"{func}_{col.strip(':*') or 'all'}"))
+        else:
+            plain.append(item)
+
+    if aggs:
+        keys = _split_top_level(group) if group else []
+        buckets = {}
+        for row in rows:
+            buckets.setdefault(tuple(row.get(k) for k in keys), []).append(row)
+        if not keys and not buckets:
+            buckets[()] = []
+        out = []
+        for key, members in buckets.items():
+            rec = {k: v for k, v in zip(keys, key) if v is not None}
+            for func, col, alias in aggs:
+                vals = members if col == "*" else [m.get(col) for m in members if m.get(col) is not None]
+                value = _aggregate(func, vals)
+                if value is not None:
+                    rec[alias] = value
+            out.append(rec)
+        return out
+
+    out = []
+    for row in rows:
+        rec = {}
+        for item in plain:
+            if item == "*":
+                rec.update({k: v for k, v in row.items() if not k.startswith(":")})
+            elif item == ":*":
+                rec.update({k: v for k, v in row.items() if k.startswith(":")})
+            else:
+                m = _ALIAS.match(item)
+                if not m:
+                    raise ValueError(f"unsupported $select item: {item!r}")
+                col, alias = m.group(1), m.group(2) or m.group(1)
+                if row.get(col) is not None:
+                    rec[alias] = row[col]
+        out.append(rec)
+    return out
+
+
+def _sort_key(value):
+    # Socrata sorts nulls last; numeric strings compare as numbers.
+    if value is None:
+        return (2, 0.0, "")
+    try:
+        return (0, float(value), "")
+    except (TypeError, ValueError):
+        return (1, 0.0, str(value))
+
+
+def _apply_order(rows: List[dict], order: Optional[str]) -> List[dict]:
+    if not order or order.strip() == ":id":
+        # Stored rows are already in :id order.
+        return rows
+    for item in reversed(_split_top_level(order)):
+        parts = item.split()
+        desc = len(parts) > 1 and parts[-1].upper() == "DESC"
+        col = parts[0]
+        rows = sorted(rows, key=lambda r: _sort_key(r.get(col)), reverse=desc)
+    return rows
+
+
+def answer(rows: Sequence[dict], params: dict) -> List[dict]:
+    """Evaluate one SoQL request against `rows`, as the API would."""
+    limit = int(params.get("$limit", 1000))
+    offset = int(params.get("$offset", 0))
+    where = params.get("$where")
+    select = params.get("$select")
+    group = params.get("$group")
+    order = params.get("$order")
+
+    is_aggregate = bool(group) or any(_AGG.match(p) for p in _split_top_level(select or ""))
+    simple = not where and not is_aggregate and (not order or order.strip() == ":id")
+
+    if simple:
+        # Fast path for plain paging: touch only the requested slice.
+        selected = rows[offset:offset + limit]
+        return _apply_select(selected, select, None)
+
+    if where:
+        pred = parse_where(where)
+        matched = [r for r in rows if pred(r)]
+    else:
+        matched = rows
+    if is_aggregate:
+        result = _apply_select(matched, select, group)
+        result = _apply_order(result, order)
+    else:
+        result = _apply_order(list(matched), order)
+        result = _apply_select(result[offset:offset + limit], select, None)
+        return result
+    return result[offset:offset + limit]
+
+
+class SocrataStub:
+    """
+    Threaded HTTP server answering SoQL requests from `rows`.
+
+    `latency_s` is added before every response (plus up to `jitter_s` of
+    random extra delay) and `error_rate` of requests fail with
+    `error_status`, carrying `Retry-After: 0` so clients retry at once.
+    """
+
+    def __init__(
+        self,
+        rows: Sequence[dict],
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_s: float = 0.0,
+        jitter_s: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: int = 0,
+    ):
+        self.rows = rows
+        self.latency_s = latency_s
+        self.jitter_s = jitter_s
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                stub._handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}{DATASET_PATH}"
+
+    def _handle(self, handler: BaseHTTPRequestHandler) -> None:
+        with self._lock:
+            self.requests += 1
+            fail = self._rng.random() < self.error_rate
+            delay = self.latency_s + self._rng.random() * self.jitter_s
+            if fail:
+                self.errors += 1
+        if delay:
+            time.sleep(delay)
+
+        url = urlparse(handler.path)
+        if url.path != DATASET_PATH:
+            self._send(handler, 404, b'{"error": "not found"}')
+            return
+        if fail:
+            self._send(handler, self.error_status, b'{"error": "injected"}', {"Retry-After": "0"})
+            return
+
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            body = json.dumps(answer(self.rows, params)).encode("utf-8")
+        except ValueError as e:
+            self._send(handler, 400, json.dumps({"error": str(e)}).encode("utf-8"))
+            return
+        self._send(handler, 200, body)
+
+    @staticmethod
+    def _send(handler, status: int, body: bytes, headers: Optional[dict] = None) -> None:
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            handler.send_header(k, v)
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def start(self) -> "SocrataStub":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "SocrataStub":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000, help="Synthetic row count.")
+    parser.add_argument("--recorded", type=Path, help="Serve a saved raw CSV instead.")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added per request.")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    rows = load_recorded_rows(args.recorded) if args.recorded else SyntheticRows(args.rows)
+    stub = SocrataStub(
+        rows,
+        port=args.port,
+        latency_s=args.latency,
+        jitter_s=args.jitter,
+        error_rate=args.error_rate,
+    )
+    # First stdout line is the endpoint, so callers can spawn this process.
+    print(stub.base_url, flush=True)
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
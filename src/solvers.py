@@ -0,0 +1,168 @@
+"""
+Timing and choice of the LogisticRegression solver on the design matrix.
+
+Every solver except liblinear minimises the same objective (L2 penalty,
+unpenalised intercept), so on a converged fit their coefficients should
+agree. liblinear also penalises the intercept and drifts when the
+intercept is large, as in the v1 models with unscaled `yearstart`. A
+solver is only a candidate when it converges within `max_iter` and its
+coefficients match the exact optimum (a Newton fit run to a tight
+tolerance).
+
+Benchmarking every solver costs several fits, so `pick_solver` can keep
+its answer in a small JSON file keyed by a fingerprint of the training
+matrix, labels and settings; a trainer re-run on unchanged data reads
+the choice back instead of fitting again.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+import warnings
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import sklearn
+from scipy import sparse
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.linear_model import LogisticRegression
+
+SOLVERS = ("lbfgs", "newton-cholesky", "liblinear", "saga")
+DEFAULT_SOLVER = "lbfgs"
+MAX_ITER = 5000
+COEF_RTOL = 0.02
+REFERENCE_TOL = 1e-10
+PICK_CACHE = Path("data") / "design_cache" / "solver_picks.json"
+
+
+def penalized_loss(clf: LogisticRegression, X, y: np.ndarray) -> float:
+    """sklearn's L2 objective: C * summed log-loss + ||coef||^2 / 2."""
+    z = clf.decision_function(X)
+    log_loss = np.logaddexp(0.0, z) - y * z
+    return float(clf.C * log_loss.sum() + 0.5 * np.dot(clf.coef_[0], clf.coef_[0]))
+
+
+def reference_params(X, y, C: float = 1.0) -> np.ndarray:
+    """Intercept and coefficients at the optimum, to within REFERENCE_TOL."""
+    clf = LogisticRegression(C=C, solver="newton-cholesky", tol=REFERENCE_TOL, max_iter=100)
+    clf.fit(X, np.asarray(y))
+    return np.r_[clf.intercept_, clf.coef_[0]]
+
+
+def fit_solver(X, y, solver: str, C: float = 1.0, max_iter: int = MAX_ITER) -> dict:
+    """One timed fit: seconds, iterations, convergence, loss and parameters."""
+    y = np.asarray(y)
+    clf = LogisticRegression(C=C, solver=solver, max_iter=max_iter)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always", ConvergenceWarning)
+        start = time.perf_counter()
+        clf.fit(X, y)
+        fit_s = time.perf_counter() - start
+    return {
+        "solver": solver,
+        "fit_s": fit_s,
+        "n_iter": int(np.max(clf.n_iter_)),
+        "converged": not any(issubclass(w.category, ConvergenceWarning) for w in caught),
+        "loss": penalized_loss(clf, X, y),
+        "params": np.r_[clf.intercept_, clf.coef_[0]],
+    }
+
+
+def compare_solvers(
+    X,
+    y,
+    solvers: Sequence[str] = SOLVERS,
+    C: float = 1.0,
+    max_iter: int = MAX_ITER,
+    repeat: int = 1,
+) -> pd.DataFrame:
+    """
+    Fit each solver on (X, y) and compare it to `reference_params`.
+
+    `max_param_diff` is the largest absolute difference from the reference
+    over intercept and coefficients, and `agrees` holds when that is within
+    `COEF_RTOL` of the reference's largest parameter. `fit_s` is the best
+    of `repeat` fits.
+    """
+    fits = []
+    for solver in solvers:
+        runs = [fit_solver(X, y, solver, C, max_iter) for _ in range(repeat)]
+        fit = runs[-1]
+        fit["fit_s"] = min(r["fit_s"] for r in runs)
+        fits.append(fit)
+
+    reference = reference_params(X, y, C)
+    tol = COEF_RTOL * max(1.0, float(np.abs(reference).max()))
+    rows = []
+    for fit in fits:
+        diff = float(np.abs(fit["params"] - reference).max())
+        rows.append(
+            {
+                "solver": fit["solver"],
+                "fit_s": fit["fit_s"],
+                "n_iter": fit["n_iter"],
+                "converged": fit["converged"],
+                "loss": fit["loss"],
+                "max_param_diff": diff,
+                "agrees": diff <= tol,
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def problem_key(X, y, solvers: Sequence[str] = SOLVERS, C: float = 1.0, max_iter: int = MAX_ITER) -> str:
+    """Fingerprint of a solver choice: training matrix, labels, settings and sklearn version."""
+    h = hashlib.sha256()
+    arrays = (X.data, X.indices, X.indptr) if sparse.issparse(X) else (np.asarray(X),)
+    for a in (*arrays, np.asarray(y)):
+        h.update(np.ascontiguousarray(a).tobytes())
+    settings = {"shape": list(X.shape), "solvers": list(solvers), "C": C, "max_iter": max_iter, "sklearn": sklearn.__version__}
+    h.update(json.dumps(settings, sort_keys=True).encode())
+    return h.hexdigest()[:16]
+
+
+def _read_picks(path: Path) -> dict:
+    try:
+        return json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def pick_solver(
+    X,
+    y,
+    solvers: Sequence[str] = SOLVERS,
+    C: float = 1.0,
+    max_iter: int = MAX_ITER,
+    table: Optional[pd.DataFrame] = None,
+    cache: Optional[Path] = None,
+) -> str:
+    """
+    The fastest solver that converges and agrees with the optimum
+    (`DEFAULT_SOLVER` if none does). Pass a `compare_solvers` table to
+    reuse it instead of fitting again, or a `cache` file (normally
+    `PICK_CACHE`) to remember the choice per `problem_key`.
+    """
+    key = None
+    if table is None and cache is not None:
+        key = problem_key(X, y, solvers, C, max_iter)
+        picked = _read_picks(cache).get(key)
+        if picked is not None:
+            return picked
+    if table is None:
+        table = compare_solvers(X, y, solvers, C, max_iter)
+    ok = table[table["converged"] & table["agrees"]]
+    picked = DEFAULT_SOLVER if ok.empty else str(ok.sort_values("fit_s").iloc[0]["solver"])
+    if key is not None:
+        # Re-read just before writing so parallel trainers mostly keep each other's picks.
+        picks = {**_read_picks(cache), key: picked}
+        cache = Path(cache)
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache.with_name(f".{cache.name}.tmp-{os.getpid()}")
+        tmp.write_text(json.dumps(picks, indent=2, sort_keys=True) + "\n")
+        os.replace(tmp, cache)
+    return picked
@@ -0,0 +1,190 @@
+"""
+Coefficient and ranking stability of a registered model under resampling.
+
+The model's LogisticRegression is refitted on bootstrap (or subsample)
+replicates of its training rows. A replicate is expressed as per-row
+sample weights (draw counts; 0/1 for subsamples), so no rows are copied,
+and each worker warm-starts from its previous replicate. Workers open
+the cached CSR design matrix by key from `data/design_cache/`; its
+arrays are memory-mapped, so all processes share one copy through the
+page cache and only the key and replicate seeds are pickled.
+"""
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+from threadpoolctl import threadpool_limits
+
+from src.design_matrix import DEFAULT_CACHE_DIR, load_design_matrix, open_cached
+from src.solvers import DEFAULT_SOLVER, SOLVERS
+
+DEFAULT_REPLICATES = 200
+DEFAULT_LEVEL = 0.95
+TOP_K = 20
+MAX_ITER = 5000
+
+_worker: dict = {}
+
+
+def training_rows(y: np.ndarray, test_size: float = 0.2, random_state: int = 42) -> np.ndarray:
+    """Row positions of the trainers' training split (same stratified split)."""
+    rows = np.arange(len(y))
+    train, _ = train_test_split(rows, test_size=test_size, random_state=random_state, stratify=y)
+    return np.sort(train)
+
+
+def replicate_weights(rng: np.random.Generator, n: int, mode: str, fraction: float) -> np.ndarray:
+    if mode == "bootstrap":
+        return np.bincount(rng.integers(0, n, n), minlength=n).astype(np.float64)
+    if mode == "subsample":
+        weights = np.zeros(n)
+        weights[rng.choice(n, int(round(fraction * n)), replace=False)] = 1.0
+        return weights
+    raise ValueError(f"unknown resampling mode: {mode!r}")
+
+
+def _init_worker(key: str, cache_dir: str, y: np.ndarray, rows: np.ndarray, model: dict) -> None:
+    # The whole mapped matrix, not X[rows]: indexing would copy it into
+    # every worker. Rows outside `rows` get zero weight instead.
+    _worker["X"] = open_cached(key, Path(cache_dir)).X
+    _worker["y"] = y
+    _worker["rows"] = rows
+    _worker["model"] = model
+
+
+def _refit(task) -> np.ndarray:
+    seeds, mode, fraction = task
+    X, y, rows, model = _worker["X"], _worker["y"], _worker["rows"], _worker["model"]
+    clf = LogisticRegression(max_iter=MAX_ITER, warm_start=True, **model)
+    coefs = np.empty((len(seeds), X.shape[1]))
+    weights = np.zeros(len(y))
+    with threadpool_limits(1):
+        for i, seed in enumerate(seeds):
+            weights[rows] = replicate_weights(np.random.default_rng(seed), len(rows), mode, fraction)
+            clf.fit(X, y, sample_weight=weights)
+            coefs[i] = clf.coef_[0]
+    return coefs
+
+
+def refit_coefficients(
+    key: str,
+    rows: np.ndarray,
+    y: np.ndarray,
+    model: dict,
+    n_replicates: int = DEFAULT_REPLICATES,
+    mode: str = "bootstrap",
+    fraction: float = 0.5,
+    n_jobs: Optional[int] = None,
+    seed: int = 0,
+    cache_dir: Path = DEFAULT_CACHE_DIR,
+) -> np.ndarray:
+    """
+    (n_replicates, n_features) coefficients refitted on resamples of the
+    design-matrix `rows`, with `y` the labels of every row. `model` holds
+    LogisticRegression settings (C, solver).
+    """
+    seeds = np.random.SeedSequence(seed).generate_state(n_replicates)
+    n_jobs = n_jobs or min(os.cpu_count() or 1, n_replicates)
+    batches = [tuple(b) for b in np.array_split(seeds, n_jobs) if len(b)]
+    init = (key, str(cache_dir), y, rows, model)
+    tasks = [(b, mode, fraction) for b in batches]
+    if n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=init) as pool:
+            results = list(pool.map(_refit, tasks))
+    else:
+        _init_worker(*init)
+        results = [_refit(t) for t in tasks]
+    return np.vstack(results)
+
+
+def _abs_ranks(coefs: np.ndarray) -> np.ndarray:
+    """1 = largest |coefficient|, per row."""
+    order = np.argsort(-np.abs(coefs), axis=-1, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(1, coefs.shape[-1] + 1), axis=-1)
+    return ranks
+
+
+def stability_table(
+    feature_names: Sequence[str],
+    coef: np.ndarray,
+    replicates: np.ndarray,
+    level: float = DEFAULT_LEVEL,
+    top_k: int = TOP_K,
+) -> pd.DataFrame:
+    """
+    Per feature: fitted coefficient, replicate mean/std and percentile CI,
+    how often the sign matches the fit, the fitted |coef| rank with its
+    replicate median and CI, and how often the feature is in the top `top_k`.
+    Sorted like the global importance tables (by |coefficient|).
+    """
+    tail = 100 * (1 - level) / 2
+    coef = np.asarray(coef)
+    ranks = _abs_ranks(replicates)
+    table = pd.DataFrame(
+        {
+            "feature": list(feature_names),
+            "coefficient": coef,
+            "coef_mean": replicates.mean(axis=0),
+            "coef_std": replicates.std(axis=0, ddof=1),
+            "coef_ci_low": np.percentile(replicates, tail, axis=0),
+            "coef_ci_high": np.percentile(replicates, 100 - tail, axis=0),
+            "sign_stability": (np.sign(replicates) == np.sign(coef)).mean(axis=0),
+            "rank": _abs_ranks(coef),
+            "rank_median": np.median(ranks, axis=0),
+            "rank_ci_low": np.percentile(ranks, tail, axis=0),
+            "rank_ci_high": np.percentile(ranks, 100 - tail, axis=0),
+            f"top{top_k}_freq": (ranks <= top_k).mean(axis=0),
+        }
+    )
+    return table.sort_values("rank").reset_index(drop=True)
+
+
+def rank_agreement(coef: np.ndarray, replicates: np.ndarray, top_k: int = TOP_K) -> dict:
+    """
+    Summary of how well replicate rankings match the fitted one: mean
+    Spearman correlation of |coef| ranks and mean overlap of the top `top_k`.
+    """
+    ranks = _abs_ranks(replicates).astype(np.float64)
+    base = _abs_ranks(np.asarray(coef)).astype(np.float64)
+    centred = ranks - ranks.mean(axis=1, keepdims=True)
+    base_c = base - base.mean()
+    spearman = centred @ base_c / (np.linalg.norm(centred, axis=1) * np.linalg.norm(base_c))
+    top = base <= top_k
+    overlap = (ranks[:, top] <= top_k).sum(axis=1) / top.sum()
+    return {"spearman_mean": float(spearman.mean()), f"top{top_k}_overlap_mean": float(overlap.mean())}
+
+
+def model_stability(
+    model,
+    df: pd.DataFrame,
+    n_replicates: int = DEFAULT_REPLICATES,
+    mode: str = "bootstrap",
+    fraction: float = 0.5,
+    n_jobs: Optional[int] = None,
+    seed: int = 0,
+):
+    """Stability table and rank summary for a `RegisteredModel`."""
+    solver = model.meta.get("solver", DEFAULT_SOLVER)
+    if solver not in SOLVERS:
+        # e.g. v2-sgd: refitting with LogisticRegression would not reproduce it.
+        raise ValueError(
+            f"{model!r} was not fit by LogisticRegression (solver {solver!r}); "
+            f"stability refits support {', '.join(SOLVERS)}"
+        )
+    design = load_design_matrix(model.meta, df)
+    y = df[model.label].astype(int).to_numpy()
+    rows = training_rows(y)
+    settings = {"C": float(model.meta.get("C", 1.0)), "solver": solver}
+    replicates = refit_coefficients(
+        design.key, rows, y, settings, n_replicates, mode, fraction, n_jobs, seed
+    )
+    coef = np.asarray(model.coef)
+    return stability_table(model.feature_names, coef, replicates), rank_agreement(coef, replicates)
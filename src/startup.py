@@ -0,0 +1,46 @@
+"""
+Shared start-up for the pipeline scripts.
+
+Importing this module forces matplotlib's non-interactive Agg backend
+(the scripts only ever save figures), and `lazy_import` returns a
+module that is imported on first attribute access. Scripts bind heavy
+modules such as `matplotlib.pyplot` this way at the top and keep
+`from sklearn... import ...` inside the functions that fit models, so a
+run only pays for what it uses.
+"""
+from __future__ import annotations
+
+import importlib
+import os
+import sys
+import types
+
+os.environ["MPLBACKEND"] = "Agg"
+if "matplotlib" in sys.modules:
+    sys.modules["matplotlib"].use("Agg")
+
+
+class LazyModule(types.ModuleType):
+    """Stands in for a module until one of its attributes is used."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_name"] = name
+
+    def _load(self) -> types.ModuleType:
+        module = importlib.import_module(self.__dict__["_lazy_name"])
+        # Later lookups hit the copied attributes, not __getattr__.
+        self.__dict__.update(module.__dict__)
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """`import name` deferred until first use (the module itself if already loaded)."""
+    return sys.modules.get(name) or LazyModule(name)
+
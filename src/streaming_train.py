@@ -0,0 +1,239 @@
+"""
+Out-of-core training of the v2-style logistic model.
+
+The modeling CSV is read in chunks of `chunk_rows` and never held in
+memory as a whole. Encoding uses a vocabulary fixed before training: the
+one-hot categories are the closed category lists of `src.schema`, and
+`yearstart` is standardised with a mean and scale from one streaming
+pass over the training rows. Each chunk is encoded with
+`src.design_matrix.encode_features` and fed to
+`SGDClassifier(loss="log_loss").partial_fit`. Memory is bounded by the
+chunk size, plus one float per holdout row for the final AUROC.
+
+`partial_fit` assumes the rows it sees are IID draws from the data, but
+the CSV is sorted by `yearstart` and location, so file order would feed
+SGD one year and region at a time. Each training epoch therefore visits
+blocks of `BLOCK_ROWS` consecutive rows in a fresh random order (found
+through a byte-offset index of the file, built once per fit), assembles
+chunks of about `chunk_rows` rows from those blocks and shuffles the
+rows within each chunk. This assumes no field contains a line break,
+which holds for the modeling CSV.
+
+Rows go to the holdout with probability `test_size`, drawn per block from
+a generator seeded with the seed and block number. The split depends on
+the seed but not on the chunk size or the order blocks are read in.
+"""
+from __future__ import annotations
+
+import io
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import accuracy_score, roc_auc_score
+
+from src.column_store import MODELING_CSV
+from src.design_matrix import encode_features
+from src.model_registry import CATEGORICAL, NUMERIC
+from src.schema import MODELING_SCHEMA, apply_schema
+
+CHUNK_ROWS = 50_000
+DEFAULT_ALPHA = 1e-4
+DEFAULT_EPOCHS = 5
+
+# Rows per block: the unit both of the holdout draw and of the per-epoch
+# shuffle of file order.
+BLOCK_ROWS = 1024
+
+
+def iter_modeling_chunks(
+    columns: Sequence[str],
+    chunk_rows: int = CHUNK_ROWS,
+    csv_path: Path = MODELING_CSV,
+) -> Iterator[pd.DataFrame]:
+    """Schema-typed chunks of the modeling CSV, restricted to `columns`."""
+    schema = {c: MODELING_SCHEMA[c] for c in columns if c in MODELING_SCHEMA}
+    for chunk in pd.read_csv(csv_path, usecols=list(columns), chunksize=chunk_rows):
+        yield apply_schema(chunk, schema)
+
+
+def _holdout(start: int, stop: int, test_size: float, seed: int) -> np.ndarray:
+    """Holdout mask of rows `start:stop` of the CSV (data rows, 0-based)."""
+    first, last = start // BLOCK_ROWS, (stop - 1) // BLOCK_ROWS
+    draws = [np.random.default_rng([seed, b]).random(BLOCK_ROWS) for b in range(first, last + 1)]
+    offset = first * BLOCK_ROWS
+    return np.concatenate(draws)[start - offset:stop - offset] < test_size if draws else np.zeros(0, bool)
+
+
+def _holdout_masks(
+    columns: Sequence[str],
+    chunk_rows: int,
+    csv_path: Path,
+    test_size: float,
+    seed: int,
+) -> Iterator:
+    start = 0
+    for chunk in iter_modeling_chunks(columns, chunk_rows, csv_path):
+        yield chunk, _holdout(start, start + len(chunk), test_size, seed)
+        start += len(chunk)
+
+
+def _block_index(csv_path: Path) -> Tuple[bytes, np.ndarray, int]:
+    """
+    The header line, the byte offset of every block plus the end of the
+    data, and the number of data rows.
+    """
+    offsets = []
+    n_rows = 0
+    with open(csv_path, "rb") as f:
+        header = f.readline()
+        pos = f.tell()
+        for n_rows, line in enumerate(f, start=1):
+            if (n_rows - 1) % BLOCK_ROWS == 0:
+                offsets.append(pos)
+            pos += len(line)
+    offsets.append(pos)
+    return header, np.asarray(offsets, dtype=np.int64), n_rows
+
+
+def _shuffled_chunks(
+    columns: Sequence[str],
+    chunk_rows: int,
+    csv_path: Path,
+    index: Tuple[bytes, np.ndarray, int],
+    rng: np.random.Generator,
+    test_size: float,
+    seed: int,
+) -> Iterator:
+    """`_holdout_masks` for one epoch, with blocks read in a random order."""
+    header, offsets, n_rows = index
+    schema = {c: MODELING_SCHEMA[c] for c in columns if c in MODELING_SCHEMA}
+    n_blocks = len(offsets) - 1
+    per_chunk = max(1, chunk_rows // BLOCK_ROWS)
+    order = rng.permutation(n_blocks)
+    with open(csv_path, "rb") as f:
+        for i in range(0, n_blocks, per_chunk):
+            parts, masks = [header], []
+            for b in order[i:i + per_chunk]:
+                f.seek(offsets[b])
+                block = f.read(offsets[b + 1] - offsets[b])
+                # The last line of the file may lack its newline.
+                parts.append(block if block.endswith(b"\n") else block + b"\n")
+                start = b * BLOCK_ROWS
+                masks.append(_holdout(start, min(start + BLOCK_ROWS, n_rows), test_size, seed))
+            chunk = pd.read_csv(io.BytesIO(b"".join(parts)), usecols=list(columns))
+            yield apply_schema(chunk, schema), np.concatenate(masks)
+
+
+def schema_vocabulary(
+    chunk_rows: int = CHUNK_ROWS,
+    csv_path: Path = MODELING_CSV,
+    test_size: float = 0.2,
+    seed: int = 42,
+) -> dict:
+    """
+    `preprocessor_params`-style encoding parameters: schema categories for
+    the one-hot columns and a StandardScaler-equivalent mean and scale
+    (population std) of each numeric column over the training rows.
+    """
+    n = 0
+    total = np.zeros(len(NUMERIC))
+    total_sq = np.zeros(len(NUMERIC))
+    for chunk, test in _holdout_masks(NUMERIC, chunk_rows, csv_path, test_size, seed):
+        values = chunk.loc[~test, NUMERIC].to_numpy(dtype=np.float64)
+        n += len(values)
+        total += values.sum(axis=0)
+        total_sq += np.square(values).sum(axis=0)
+    mean = total / n
+    scale = np.sqrt(np.maximum(total_sq / n - np.square(mean), 0.0))
+    scale[scale == 0] = 1.0
+
+    categories = {col: list(MODELING_SCHEMA[col].categories) for col in CATEGORICAL}
+    feature_names = [f"{col}_{c}" for col in CATEGORICAL for c in categories[col]]
+    feature_names += [f"{col}_scaled" for col in NUMERIC]
+    return {
+        "feature_names": feature_names,
+        "categories": categories,
+        "numeric": {
+            col: {"mean": float(mean[i]), "scale": float(scale[i])} for i, col in enumerate(NUMERIC)
+        },
+    }
+
+
+@dataclass(frozen=True)
+class StreamedModel:
+    params: dict
+    coef: np.ndarray
+    intercept: float
+    metrics: Dict[str, float]
+    n_train: int
+    n_test: int
+    fit_s: float
+
+    @property
+    def meta(self) -> dict:
+        """Registry meta for `register_coefficients`."""
+        return {**self.params, "solver": "sgd", "intercept": self.intercept}
+
+
+def train_streaming(
+    label: str,
+    alpha: float = DEFAULT_ALPHA,
+    epochs: int = DEFAULT_EPOCHS,
+    chunk_rows: int = CHUNK_ROWS,
+    test_size: float = 0.2,
+    seed: int = 42,
+    csv_path: Path = MODELING_CSV,
+    params: Optional[dict] = None,
+) -> StreamedModel:
+    """
+    Fit an L2 logistic model for `label` with `epochs` streaming passes of
+    `partial_fit`, each over the training rows in a fresh block-shuffled
+    order (see the module docstring), then score the holdout rows in one
+    more pass in file order.
+    """
+    params = params or schema_vocabulary(chunk_rows, csv_path, test_size, seed)
+    columns = CATEGORICAL + NUMERIC + [label]
+    clf = SGDClassifier(loss="log_loss", penalty="l2", alpha=alpha, average=True, random_state=seed)
+    shuffle = np.random.default_rng(seed)
+
+    start = time.perf_counter()
+    index = _block_index(csv_path)
+    n_train = 0
+    for _ in range(epochs):
+        n_train = 0
+        for chunk, test in _shuffled_chunks(columns, chunk_rows, csv_path, index, shuffle, test_size, seed):
+            train = chunk[~test].iloc[shuffle.permutation(int((~test).sum()))]
+            if train.empty:
+                continue
+            X = encode_features(train, params)
+            clf.partial_fit(X, train[label].to_numpy(dtype=np.int64), classes=[0, 1])
+            n_train += len(train)
+    fit_s = time.perf_counter() - start
+
+    scores, labels = [], []
+    for chunk, test in _holdout_masks(columns, chunk_rows, csv_path, test_size, seed):
+        held = chunk[test]
+        if not held.empty:
+            scores.append(clf.decision_function(encode_features(held, params)))
+            labels.append(held[label].to_numpy(dtype=np.int64))
+    scores = np.concatenate(scores)
+    labels = np.concatenate(labels)
+    metrics = {
+        "auroc": roc_auc_score(labels, scores),
+        "accuracy": accuracy_score(labels, (scores >= 0).astype(int)),
+    }
+
+    return StreamedModel(
+        params=params,
+        coef=np.asarray(clf.coef_[0], dtype=np.float64),
+        intercept=float(clf.intercept_[0]),
+        metrics=metrics,
+        n_train=n_train,
+        n_test=len(labels),
+        fit_s=fit_s,
+    )
@@ -0,0 +1,120 @@
+"""
+Directories whose contents are replaced by an atomic pointer swap.
+
+A versioned directory holds one subdirectory per published version and
+a `CURRENT` file naming the live one:
+
+    <root>/CURRENT          e.g. "v-18f3a2c4e1b20c00-4242"
+    <root>/v-.../           every file of that version
+    <root>/.lock            serialises writers
+
+Writers fill a private staging directory (`staging_dir`), then
+`publish` renames it to a fresh version name and replaces `CURRENT` with
+`os.replace`, so `<root>` always names one complete version. Readers go
+through `open_current`, which reads `CURRENT` once and hands that
+version's directory to a loader that opens everything it needs. The
+next publish removes superseded versions; files a reader already opened
+or mapped stay valid, and a reader that loses that race retries with the
+new `CURRENT`.
+"""
+from __future__ import annotations
+
+import fcntl
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, Optional, TypeVar
+
+POINTER = "CURRENT"
+LOCK = ".lock"
+STAGING_PREFIX = ".tmp-"
+STALE_STAGING_S = 3600
+OPEN_ATTEMPTS = 3
+
+T = TypeVar("T")
+
+
+def current(root: Path) -> Optional[Path]:
+    """Directory of the live version, or None if nothing was published."""
+    try:
+        name = (Path(root) / POINTER).read_text().strip()
+    except FileNotFoundError:
+        return None
+    return Path(root) / name
+
+
+def staging_dir(root: Path) -> Path:
+    """A new, empty directory under `root` for one writer to fill."""
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    path = root / f"{STAGING_PREFIX}{os.getpid()}-{time.time_ns():x}"
+    path.mkdir()
+    return path
+
+
+@contextmanager
+def _locked(root: Path) -> Iterator[None]:
+    with open(Path(root) / LOCK, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def publish(root: Path, staged: Path, keep_current: Optional[Callable[[Path], bool]] = None) -> Path:
+    """
+    Make `staged` (from `staging_dir`) the live version of `root` and
+    return its directory. If `keep_current(live)` holds for the version
+    already published, `staged` is discarded and the live one kept.
+    """
+    root = Path(root)
+    with _locked(root):
+        live = current(root)
+        if keep_current is not None and live is not None and live.is_dir() and keep_current(live):
+            shutil.rmtree(staged, ignore_errors=True)
+            return live
+        version = root / f"v-{time.time_ns():016x}-{os.getpid()}"
+        os.replace(staged, version)
+        pointer = root / f".{POINTER}.tmp-{os.getpid()}"
+        pointer.write_text(version.name + "\n")
+        os.replace(pointer, root / POINTER)
+        _collect(root, version)
+    return version
+
+
+def _collect(root: Path, live: Path) -> None:
+    """Remove superseded versions, stale staging dirs and pre-versioning files."""
+    now = time.time()
+    for entry in root.iterdir():
+        if entry.name in (POINTER, LOCK, live.name):
+            continue
+        if entry.name.startswith(STAGING_PREFIX) and now - entry.stat().st_mtime < STALE_STAGING_S:
+            continue  # another writer is still filling it
+        if entry.is_dir() and not entry.is_symlink():
+            shutil.rmtree(entry, ignore_errors=True)
+        else:
+            entry.unlink(missing_ok=True)
+
+
+def open_current(root: Path, load: Callable[[Path], T]) -> T:
+    """
+    `load(directory)` on the live version of `root`, retried if a writer
+    removes that version before `load` has opened its files. Raises
+    FileNotFoundError if nothing was published.
+    """
+    for _ in range(OPEN_ATTEMPTS - 1):
+        try:
+            return load(_live(root))
+        except FileNotFoundError:
+            pass
+    return load(_live(root))
+
+
+def _live(root: Path) -> Path:
+    live = current(root)
+    if live is None:
+        raise FileNotFoundError(f"nothing published under {root}")
+    return live
@@ -1,8 +1,11 @@
-import requests
+from src.data_cdc import CDCSession
 
-url = "https://data.cdc.gov/resource/hn4x-zwk7.json?$limit=5"
-response = requests.get(url)
+url = "https://data.cdc.gov/resource/hn4x-zwk7.json"
 
-print("Status code:", response.status_code)
-print("Data:")
-print(response.json())
+with CDCSession(max_retries=2) as session:
+    response = session.get(url, params={"$limit": 5})
+
+    print("Status code:", response.status_code)
+    print("Data:")
+    print(response.json())
+    print("Request stats:", session.stats.summary())
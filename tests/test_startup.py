@@ -0,0 +1,16 @@
+"""Start-up budget for the pipeline scripts (runs scripts/check_startup.py)."""
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_pipeline_scripts_start_within_budget():
+    result = subprocess.run(
+        [sys.executable, str(PROJECT_ROOT / "scripts" / "check_startup.py")],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr